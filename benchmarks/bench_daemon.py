@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Round trip latency of the calculator daemon compared with in-process
+evaluation and with starting a calculator script per query.
+
+Starts a daemon on a temporary socket, then measures ohm_law, volt_divider
+and lc queries from one client and from several concurrent clients.
+
+Usage: python benchmarks/bench_daemon.py [--requests N] [--clients N]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+
+CALC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'calc')
+sys.path.insert(0, CALC)
+
+QUERIES = [(['10mA', '4k7R'], None), (['10V', '1kR', '4k7R'], None), (['1mH', '1uF'], 'lc')]
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p / 100.0))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=5000, help='Requests per client')
+    parser.add_argument('--clients', type=int, default=4, help='Concurrent clients')
+    args = parser.parse_args()
+
+    from core import client
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, 'calc.sock')
+    server = subprocess.Popen([sys.executable, 'calc.py', '--daemon', '--socket', path], cwd=CALC,
+                              stderr=subprocess.DEVNULL)
+    try:
+        while not os.path.exists(path):
+            time.sleep(0.01)
+
+        for query, command in QUERIES:
+            with client.Client(path, fallback=False) as c:
+                samples = []
+                for _ in range(args.requests):
+                    t = time.perf_counter()
+                    c.evaluate(query, command)
+                    samples.append(time.perf_counter() - t)
+            print('{0:28} daemon round trip  p50 {1:6.1f} us  p99 {2:6.1f} us'.format(
+                ' '.join(query), percentile(samples, 50) * 1e6, percentile(samples, 99) * 1e6))
+
+        local = client.Client(os.path.join(tmp, 'none.sock'))
+        query, command = QUERIES[0]
+        n = args.requests
+        t = min(timeit.repeat(lambda: local.evaluate(query, command), number=n, repeat=3)) / n
+        print('{0:28} in-process         {1:6.1f} us'.format(' '.join(query), t * 1e6))
+
+        script = min(timeit.repeat(lambda: subprocess.run([sys.executable, 'ohm_law.py'] + query, cwd=CALC,
+                                                          stdout=subprocess.DEVNULL), number=1, repeat=5))
+        print('{0:28} ohm_law.py process {1:6.1f} ms'.format(' '.join(query), script * 1e3))
+
+        def worker():
+            with client.Client(path, fallback=False) as c:
+                for _ in range(args.requests):
+                    c.evaluate(query, command)
+        threads = [threading.Thread(target=worker) for _ in range(args.clients)]
+        t = time.perf_counter()
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        t = time.perf_counter() - t
+        print('{0} concurrent clients: {1:.0f} requests/s'.format(args.clients, args.clients * args.requests / t))
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Diode - resistor DC sweeps solved by core/diode.py compared to a per-point
+Python Newton loop and, with --pyspice, to the ngspice DC sweep of the
+playground circuit (playground/diode.py, 1N4148 behind 1 Ω).
+
+Usage: python benchmarks/bench_diode.py [--temperatures 30] [--voltages 700] [--resistances 10] [--pyspice]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'calc'))
+from core import diode, sweep
+
+# The 1N4148 of libraries/1n4148.sub, with its 5.827 GΩ across the diode
+D1N4148 = diode.model(IS=4.352e-9, N=1.906, RS=0.6458, BV=110, IBV=1e-4)
+R_PARALLEL = 5.827e9
+
+
+def python_point(d, voltage, resistance, temperature):
+    """
+    Safeguarded Newton iteration of one point (forward and reverse regions, RS and GMIN).
+    """
+    vt = float(diode.thermal_voltage(temperature))
+    nvt = d.N * vt
+    i_s = float(diode.saturation_current(d, temperature))
+    series = resistance + d.RS
+    low, high = min(voltage, 0.0), max(voltage, 0.0)
+    v = min(max(nvt * math.log1p(max(voltage, 0.0) / (series * i_s)), low), high)
+    for _ in range(diode.MAX_ITERATIONS):
+        if v >= -3 * nvt:
+            e = i_s * math.exp(min(v / nvt, diode.EXP_LIMIT))
+            current, conductance = e - i_s, e / nvt
+        else:
+            cube = (3 * nvt / (math.e * v)) ** 3
+            current, conductance = -i_s * (1 + cube), 3 * i_s * cube / v
+        f = (voltage - v) / series - current - diode.GMIN * v
+        if f > 0:
+            low = v
+        else:
+            high = v
+        step = f / (1 / series + conductance + diode.GMIN)
+        if abs(step) <= diode.TOLERANCE * max(1.0, abs(v)):
+            break
+        v = v + step if low < v + step < high else (low + high) / 2
+    return (voltage - v) / series
+
+
+def diode_circuit():
+    from PySpice.Spice.Netlist import Circuit
+    from core import libindex
+    spice_library = libindex.LibraryIndex(os.path.join(ROOT, 'libraries'))
+    circuit = Circuit('Diode Characteristic Curve')
+    circuit.include(spice_library['1N4148'])
+    circuit.V('input', 'source', circuit.gnd, 10)
+    circuit.R(1, 'source', 'out', 1)
+    circuit.X('D1', '1N4148', 'out', circuit.gnd)
+    return circuit
+
+
+def pyspice(temperatures):
+    simulation = sweep.PySpiceSimulation(diode_circuit, 'dc', {'Vinput': slice(-2, 5, .01)}, probes=['out', 'vinput'])
+    start = time.perf_counter()
+    result = sweep.run(simulation, {'temperature': temperatures})
+    elapsed = time.perf_counter() - start
+    print('ngspice:      {0:8.1f} ms  ({1})'.format(elapsed * 1e3, result.summary().splitlines()[0]))
+    if result.failures:
+        print(result.failures[0].message.strip())
+        return
+    for t in temperatures:
+        p = result.point(temperature=t)
+        s = diode.solve(D1N4148, p['sweep'], 1.0, t, r_parallel=R_PARALLEL)
+        print('  {0:6.1f} °C: max |V diode - V ngspice| {1:.2e} V, max |I - I ngspice| {2:.2e} A'.format(
+            t, np.max(np.abs(s.voltage - p['out'])), np.max(np.abs(s.current + p['vinput']))))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--temperatures', type=int, default=30, help='Temperatures from -40 to 125 °C')
+    parser.add_argument('--voltages', type=int, default=700, help='Source voltages from -120 to 50 V')
+    parser.add_argument('--resistances', type=int, default=10, help='Resistances from 1 mΩ to 1 MΩ')
+    parser.add_argument('--pyspice', action='store_true', help='Compare with ngspice (playground/diode.py)')
+    args = parser.parse_args()
+
+    temperature = np.linspace(-40, 125, args.temperatures)[:, None, None]
+    voltage = np.linspace(-120, 50, args.voltages)[:, None]
+    resistance = np.geomspace(1e-3, 1e6, args.resistances)
+    start = time.perf_counter()
+    s = diode.solve(D1N4148, voltage, resistance, temperature)
+    elapsed = time.perf_counter() - start
+    residual = np.abs((voltage - s.voltage) / resistance - s.current) / (np.abs(voltage) / resistance + 1e-12)
+    print('numpy solve:  {0:8.1f} ms  ({1} points, {2:.1f} iterations mean, {3} max, relative KVL residual '
+          '{4:.1e})'.format(elapsed * 1e3, s.current.size, s.iterations.mean(), s.iterations.max(), residual.max()))
+    # The Python loop without breakdown, on the points above -BV
+    forward = np.broadcast_to(voltage > -100, s.current.shape)
+    points = np.broadcast_arrays(voltage, resistance, temperature)
+    points = [p[forward].tolist() for p in points]
+    model = D1N4148._replace(BV=np.inf)
+    start = time.perf_counter()
+    current = [python_point(model, v, r, t) for v, r, t in zip(*points)]
+    elapsed = time.perf_counter() - start
+    print('python loop:  {0:8.1f} ms  ({1} points, max |I - I numpy| {2:.1e} A)'.format(
+        elapsed * 1e3, len(current), np.max(np.abs(np.array(current) - s.current[forward]))))
+    if args.pyspice:
+        pyspice([0.0, 25.0, 100.0])
+
+
+if __name__ == '__main__':
+    main()
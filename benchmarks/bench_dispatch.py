@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compare the single calc.py entry point with the per-calculator scripts:
+process startup (wall time of one command line invocation) and the in-process
+cost of dispatching through the formula registry.
+
+Usage: python benchmarks/bench_dispatch.py [--runs N]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import timeit
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'calc'))
+CALC = os.path.join(ROOT, 'calc')
+
+
+def startup(cmd, runs):
+    """
+    Returns the best wall time in seconds of running cmd.
+    """
+    def run():
+        subprocess.run([sys.executable] + cmd, cwd=CALC, check=True, stdout=subprocess.DEVNULL)
+    return min(timeit.repeat(run, number=1, repeat=runs))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    print('Startup (best of {0}):'.format(args.runs))
+    for cmd in (['ohm_law.py', '10mA', '1kR'], ['calc.py', 'ohm_law', '10mA', '1kR'], ['calc.py', '10mA', '1kR'],
+                ['lc.py', '1mH', '1uF'], ['calc.py', '1mH', '1uF']):
+        print('  {0:32} {1:8.1f} ms'.format(' '.join(cmd), startup(cmd, args.runs) * 1e3))
+
+    from core import registry
+    from core import units
+    import ohm_law
+    quantities = [units.parse('10mA'), units.parse('1kR')]
+    n = 100000
+    direct = min(timeit.repeat(lambda: ohm_law.play_with_power(*quantities), number=n, repeat=3)) / n
+    dispatched = min(timeit.repeat(lambda: registry.evaluate(quantities), number=n, repeat=3)) / n
+    print('Dispatch (per call):')
+    print('  {0:32} {1:8.2f} us'.format('ohm_law.play_with_power', direct * 1e6))
+    print('  {0:32} {1:8.2f} us'.format('registry.evaluate', dispatched * 1e6))
+
+
+if __name__ == '__main__':
+    main()
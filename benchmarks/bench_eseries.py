@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+E-series divider search (core/eseries.py) compared to brute force nested loops.
+
+Usage: python benchmarks/bench_eseries.py [--series E96] [--ratio 0.4137]
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'calc'))
+from core import eseries
+
+
+def brute_force(ratio, values):
+    return min(itertools.product(values, values), key=lambda p: abs(p[1] / (p[0] + p[1]) / ratio - 1))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--series', default='E96', choices=list(eseries.SERIES))
+    parser.add_argument('--ratio', type=float, default=0.4137)
+    args = parser.parse_args()
+
+    values = eseries.values(args.series, 'R').tolist()
+    start = time.perf_counter()
+    r1, r2 = brute_force(args.ratio, values)
+    print('brute force singles: {0:8.1f} ms  R1 {1:g} R2 {2:g}'.format((time.perf_counter() - start) * 1e3, r1, r2))
+    for pairs in (False, True):
+        start = time.perf_counter()
+        eseries.table(args.series, 'R', None, pairs)
+        built = time.perf_counter()
+        best = eseries.divider(args.ratio, args.series, n=10, pairs=pairs)[0]
+        done = time.perf_counter()
+        print('solver {0:7}:      {1:8.1f} ms  (+{2:.1f} ms table, {3} values)  error {4:+.2e}'.format(
+            'pairs' if pairs else 'singles', (done - built) * 1e3, (built - start) * 1e3,
+            len(eseries.table(args.series, 'R', None, pairs)), best.error))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Impedance sweep (core/impedance.py) compared to a per-point Python loop.
+
+Usage: python benchmarks/bench_impedance.py [--points 1000000] [--network "10R + 1mH + (100nF | 1kR)"]
+"""
+import argparse
+import cmath
+import math
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'calc'))
+from core import impedance
+
+
+def python_loop(frequencies):
+    # 10R + 1mH + (100nF | 1kR), the default network
+    res = []
+    for f in frequencies:
+        w = 2 * math.pi * f
+        zc = 1 / (1j * w * 100e-9)
+        res.append(10 + 1j * w * 1e-3 + zc * 1e3 / (zc + 1e3))
+    return [abs(z) for z in res], [math.degrees(cmath.phase(z)) for z in res]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--points', type=int, default=10**6)
+    parser.add_argument('--network', default='10R + 1mH + (100nF | 1kR)')
+    args = parser.parse_args()
+
+    network = impedance.parse(args.network)
+    start = time.perf_counter()
+    response = impedance.sweep(network, 10, 1e7, args.points)
+    magnitude, phase = response.magnitude, response.phase
+    swept = time.perf_counter()
+    resonances = response.resonances()
+    done = time.perf_counter()
+    print('numpy sweep:  {0:8.1f} ms  ({1} points, |Z| and phase)'.format((swept - start) * 1e3, magnitude.size))
+    print('resonances:   {0:8.1f} ms  ({1} found)'.format((done - swept) * 1e3, len(resonances)))
+    if args.network == parser.get_default('network'):
+        start = time.perf_counter()
+        python_loop(response.frequency.tolist())
+        print('python loop:  {0:8.1f} ms'.format((time.perf_counter() - start) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
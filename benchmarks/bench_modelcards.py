@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Model parameter store (core/modelcards.py): parsing a library tree compared
+to loading its binary cache, and a bulk parameter query.
+
+Usage: python benchmarks/bench_modelcards.py [--root libraries] [--repeat 20]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'calc'))
+from core import modelcards
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--root', default=os.path.join(ROOT, 'libraries'))
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        start = time.perf_counter()
+        store = modelcards.ModelStore(args.root, directory)
+        parsed = time.perf_counter()
+        for _ in range(args.repeat):
+            store = modelcards.ModelStore(args.root, directory)
+        loaded = time.perf_counter()
+        for _ in range(args.repeat):
+            models, values = store.table(['IS', 'N', 'RS', 'BV', 'IBV', 'CJO', 'TT'], type='D')
+        queried = time.perf_counter()
+        print('parse:        {0:8.2f} ms  ({1} cards)'.format((parsed - start) * 1e3, len(store)))
+        print('cache load:   {0:8.2f} ms  ({1} bytes)'.format((loaded - parsed) * 1e3 / args.repeat,
+                                                              os.path.getsize(store.path)))
+        print('diode table:  {0:8.2f} ms  ({1} models x {2} parameters)'.format(
+            (queried - loaded) * 1e3 / args.repeat, *values.shape))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
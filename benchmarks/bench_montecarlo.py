@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Throughput and peak memory of the Monte Carlo tolerance analysis (core/montecarlo.py).
+
+Usage: python benchmarks/bench_montecarlo.py [--samples N] [--chunk-size N]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'calc'))
+from core import montecarlo as mc
+
+CASES = [
+    ('volt_divider', [mc.component(10, 'V', 0.01), mc.component(4700, 'R', 0.01, tempco=100),
+                      mc.component(1200, 'R', 0.01, mc.NORMAL, tempco=100)]),
+    ('lc', [mc.component(1e-3, 'H', 0.1), mc.component(1e-6, 'F', 0.05, mc.NORMAL)]),
+    ('c_reactance', [mc.component(1e-6, 'F', 0.1, mc.NORMAL), mc.component(50, 'Hz', 0.02)]),
+    ('l_reactance', [mc.component(1e-3, 'H', 0.1), mc.component(1e3, 'Hz')]),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--samples', type=lambda s: int(float(s)), default=10**7)
+    parser.add_argument('--chunk-size', type=lambda s: int(float(s)), default=mc.CHUNK_SIZE)
+    args = parser.parse_args()
+
+    for command, components in CASES:
+        tracemalloc.start()
+        start = time.perf_counter()
+        res = mc.run(components, args.samples, command, temperature=(-40, 85), chunk_size=args.chunk_size, seed=1)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print('{0:12} {1:.2f} s, {2:6.1f} M samples/s, peak {3:.0f} MB, p99.9 {4:.4g}'.format(
+            command, elapsed, args.samples / elapsed / 1e6, peak / 2**20, res.outputs[0].percentile(99.9)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming Welch spectrum (core/spectrum.py) of a memory-mapped signal compared
+to one fft of the whole signal loaded in memory, as in playground/fft.py.
+
+Usage: python benchmarks/bench_spectrum.py [--samples 16000000] [-n 8192]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'calc'))
+from core import spectrum
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    res = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return res, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--samples', type=int, default=16 * 10**6)
+    parser.add_argument('-n', type=int, default=8192)
+    args = parser.parse_args()
+
+    dt = 1e-6
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'y.npy')
+        y = np.lib.format.open_memmap(path, 'w+', np.float64, (args.samples,))
+        for begin in range(0, args.samples, spectrum.CHUNK_SIZE):
+            t = np.arange(begin, min(begin + spectrum.CHUNK_SIZE, args.samples)) * dt
+            y[begin:begin + t.size] = np.sin(2 * np.pi * 50e3 * t)
+        y.flush()
+        del y
+
+        def whole():
+            data = np.load(path)
+            return 2.0 / data.size * np.abs(np.fft.fft(data)[:data.size // 2])
+
+        def welch():
+            return spectrum.welch(np.load(path, mmap_mode='r'), dt, args.n).amplitude
+
+        for name, fn in (('whole fft', whole), ('welch', welch)):
+            _, elapsed, peak = measure(fn)
+            print('{0:10} {1:8.1f} ms  peak {2:8.1f} MB'.format(name, elapsed * 1e3, peak / 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Scaling of the parallel sweep runner (core/sweep.py) with the number of processes.
+
+Uses a CPU-bound stand-in for a simulation (a fixed-step RC transient
+integrated in Python) so that it runs without ngspice; pass --pyspice to
+sweep the 1N4148 DC characteristic of playground/diode.py instead.
+
+Usage: python benchmarks/bench_sweep.py [--points N] [--pyspice]
+"""
+import argparse
+import os
+import sys
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'calc'))
+from core import sweep
+
+
+def rc_transient(point, steps=200000):
+    """
+    Forward Euler integration of an RC low-pass driven by a sine.
+    """
+    dt = 1e-6
+    tau = point['r'] * point['c']
+    v = 0.0
+    out = np.empty(steps // 100)
+    for i in range(steps):
+        vin = point['amplitude'] if (i // 5000) % 2 else 0.0
+        v += (vin - v) * dt / tau
+        if i % 100 == 0:
+            out[i // 100] = v
+    return {'out': out}
+
+
+def diode_circuit():
+    from PySpice.Doc.ExampleTools import find_libraries
+    from PySpice.Spice.Library import SpiceLibrary
+    from PySpice.Spice.Netlist import Circuit
+    circuit = Circuit('Diode Characteristic Curve')
+    circuit.include(SpiceLibrary(os.path.join(ROOT, 'libraries'))['1N4148'])
+    circuit.V('input', 'in', circuit.gnd, 10)
+    circuit.R(1, 'in', 'out', 1)
+    circuit.X('D1', '1N4148', 'out', circuit.gnd)
+    return circuit
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--points', type=int, default=16, help='Number of sweep points')
+    parser.add_argument('--pyspice', action='store_true', help='Sweep a real ngspice simulation')
+    args = parser.parse_args()
+
+    if args.pyspice:
+        simulate = sweep.PySpiceSimulation(diode_circuit, 'dc', {'Vinput': slice(-2, 5, .01)})
+        params = {'temperature': np.linspace(-40, 125, args.points)}
+    else:
+        simulate = rc_transient
+        params = {'r': np.linspace(1e3, 1e4, args.points // 2), 'c': [1e-9, 1e-8], 'amplitude': [5.0]}
+
+    cpus = os.cpu_count() or 1
+    baseline = None
+    # 0 is the serial in-process baseline
+    for processes in [0] + sorted(set([1, 2, cpus // 2, cpus]) - {0}):
+        res = sweep.run(simulate, params, processes=processes)
+        baseline = baseline or res.wall_time
+        print('{0:3} processes: {1:7.2f} s  speedup {2:5.2f}  failures {3}'.format(
+            processes, res.wall_time, baseline / res.wall_time, len(res.failures)))
+    print(res.summary())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reading a window of a large transient from the waveform store (core/waveforms.py)
+compared to loading the same vectors from a compressed .npz (the simulation cache format).
+
+Usage: python benchmarks/bench_waveforms.py [--points N] [--nodes N]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'calc'))
+from core import waveforms
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--points', type=int, default=10**7, help='Time points per vector')
+    parser.add_argument('--nodes', type=int, default=8, help='Number of node vectors')
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, 'run.wf')
+        chunk = 10**6
+        start = time.perf_counter()
+        with waveforms.StoreWriter(path, 'TransientAnalysis', ('time', ['Second', '']), length=args.points) as writer:
+            columns = [writer.column('abscissa')] + [writer.add('nodes', 'n{0}'.format(i), ['Volt', ''])
+                                                     for i in range(args.nodes)]
+            for begin in range(0, args.points, chunk):
+                t = np.arange(begin, min(begin + chunk, args.points)) * 1e-9
+                columns[0][begin:begin + len(t)] = t
+                for i, column in enumerate(columns[1:]):
+                    column[begin:begin + len(t)] = np.sin(2 * np.pi * 50 * (i + 1) * t)
+        size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+        print('write: {0:.2f} s, {1:.0f} MB'.format(time.perf_counter() - start, size / 2**20))
+
+        end_time = args.points * 1e-9
+        start = time.perf_counter()
+        store = waveforms.WaveformStore(path)
+        begin, end = store.window(end_time / 2, end_time / 2 + 1e-3)
+        ptp = np.ptp(store['n3'][begin:end])
+        print('store window of 1 vector: {0:8.2f} ms ({1} points, ptp {2:.3f})'.format(
+            (time.perf_counter() - start) * 1e3, end - begin, ptp))
+
+        npz = os.path.join(tmp, 'run.npz')
+        np.savez_compressed(npz, **{key: store.column(key) for key in store.meta['columns']})
+        start = time.perf_counter()
+        with np.load(npz) as f:
+            t = f['abscissa']
+            begin, end = np.searchsorted(t, [end_time / 2, end_time / 2 + 1e-3])
+            ptp = np.ptp(f['nodes_3'][begin:end])
+        print('npz window of 1 vector:   {0:8.2f} ms'.format((time.perf_counter() - start) * 1e3))
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cold-start budget of the command line tools.
+
+Runs every entry point with "python -X importtime", sums the import time of
+the modules it loads (the interpreter's own site imports excluded) and fails
+if a tool goes over its budget. Each tool is run several times and the best
+run is kept to filter out noise.
+
+Usage: python benchmarks/check_startup.py [--runs N] [--scale FACTOR] [--verbose]
+Exit status is 1 if any tool is over budget.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+CALC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'calc')
+
+# Modules imported by the interpreter before the script starts
+STARTUP_MODULES = ('site', 'encodings', 'zipimport', 'codecs', 'io', 'abc', 'stat', '_')
+
+# Budgets in milliseconds of import time. Calculators that compute with numpy
+# (to broadcast arrays) pay for it; the others must not load numpy or PySpice.
+ENTRY_POINTS = [
+    (['ohm_law.py', '10mA', '4k7R'], 25),
+    (['volt_divider.py', '10V', '1kR', '4kR'], 25),
+    (['calc.py', '10mA', '4k7R'], 25),
+    (['calc.py', '--list'], 25),
+    (['lc.py', '1mH', '1uF'], 120),
+    (['c_reactance.py', '1uF', '1kHz'], 120),
+    (['l_reactance.py', '1mH', '1kHz'], 120),
+    (['dB.py', '1', '10'], 120),
+    (['calc.py', 'lc', '1mH', '1uF'], 120),
+]
+
+
+def import_times(cmd):
+    """
+    Returns a list of (module, self_us, cumulative_us, depth) of one run of cmd.
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime'] + cmd, cwd=CALC, check=True,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True)
+    res = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        res.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return res
+
+
+def total_ms(times):
+    """
+    Import time in milliseconds of the top-level imports, the interpreter's startup excluded.
+    """
+    top = [t for t in times if t[3] == 0 and not t[0].startswith(STARTUP_MODULES)]
+    return sum(t[2] for t in top) / 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5, help='Runs per tool, the best one is kept')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply all budgets (slow machines)')
+    parser.add_argument('--verbose', action='store_true', help='Show the slowest imports of every tool')
+    args = parser.parse_args()
+
+    over = 0
+    for cmd, budget in ENTRY_POINTS:
+        budget *= args.scale
+        runs = [import_times(cmd) for _ in range(args.runs)]
+        best = min(runs, key=total_ms)
+        ms = total_ms(best)
+        status = 'ok' if ms <= budget else 'OVER BUDGET'
+        over += ms > budget
+        print('{0:32} {1:8.1f} ms  (budget {2:6.1f} ms)  {3}'.format(' '.join(cmd), ms, budget, status))
+        if args.verbose or ms > budget:
+            for name, _, cumulative, depth in sorted(best, key=lambda t: -t[2])[:5]:
+                print('    {0:28} {1:8.1f} ms'.format(name, cumulative / 1e3))
+    return 1 if over else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Load test of the HTTP/JSON service (calc.py --http).
+
+Starts the service on a free local port (unless --url is given) and drives it
+with concurrent keep-alive connections sending a mix of calculator, parse and
+format requests. Reports throughput, client-side p50/p99 latency and the
+service's own statistics (batch sizes, rejected requests).
+
+Usage: python benchmarks/load_test.py [--connections N] [--requests N] [--window SECONDS]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+CALC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'calc')
+
+REQUESTS = [
+    ('/calc', lambda r: {'args': ['{0}mA'.format(r.randint(1, 999)), '{0}kR'.format(r.randint(1, 99))]}),
+    ('/calc/lc', lambda r: {'args': ['{0}uH'.format(r.randint(1, 999)), '{0}nF'.format(r.randint(1, 999))]}),
+    ('/calc', lambda r: {'args': ['{0}V'.format(r.randint(1, 24)), '{0}kR'.format(r.randint(1, 99)), '10kR']}),
+    ('/parse', lambda r: {'values': ['{0}k{1}'.format(r.randint(1, 99), r.randint(0, 9)) for _ in range(8)]}),
+    ('/format', lambda r: {'values': [r.uniform(1e-9, 1e9) for _ in range(8)], 'unit': 'Hz'}),
+]
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p / 100.0))]
+
+
+async def request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode('utf8') if payload is not None else b''
+    writer.write('{0} {1} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n'
+                 'Content-Length: {2}\r\n\r\n'.format(method, path, len(body)).encode('latin-1') + body)
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def connection(host, port, n, seed, latencies, statuses):
+    rnd = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(n):
+            path, make = rnd.choice(REQUESTS)
+            payload = make(rnd)
+            t = time.perf_counter()
+            status, _ = await request(reader, writer, 'POST', path, payload)
+            latencies.append(time.perf_counter() - t)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run(host, port, connections, requests):
+    latencies = []
+    statuses = {}
+    t = time.perf_counter()
+    await asyncio.gather(*[connection(host, port, requests, seed, latencies, statuses)
+                           for seed in range(connections)])
+    elapsed = time.perf_counter() - t
+    reader, writer = await asyncio.open_connection(host, port)
+    _, stats = await request(reader, writer, 'GET', '/stats')
+    writer.close()
+    return latencies, statuses, elapsed, stats
+
+
+def free_port():
+    s = socket.socket()
+    s.bind(('127.0.0.1', 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+def wait_for(host, port, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError('Service did not start on {0}:{1}'.format(host, port))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', help='host:port of a running service (default: start one)')
+    parser.add_argument('--connections', type=int, default=32, help='Concurrent connections')
+    parser.add_argument('--requests', type=int, default=300, help='Requests per connection')
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        host, _, port = args.url.rpartition(':')
+        port = int(port)
+    else:
+        host, port = '127.0.0.1', free_port()
+        server = subprocess.Popen([sys.executable, 'calc.py', '--http', '{0}:{1}'.format(host, port)], cwd=CALC,
+                                  stderr=subprocess.DEVNULL)
+    try:
+        wait_for(host, port)
+        latencies, statuses, elapsed, stats = asyncio.run(run(host, port, args.connections, args.requests))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print('{0} requests over {1} connections in {2:.2f} s: {3:.0f} requests/s'.format(
+        len(latencies), args.connections, elapsed, len(latencies) / elapsed))
+    print('latency p50 {0:.2f} ms  p99 {1:.2f} ms'.format(percentile(latencies, 50) * 1e3,
+                                                          percentile(latencies, 99) * 1e3))
+    print('status codes: {0}'.format(statuses))
+    print('service: {0} batches, mean batch size {1:.1f}, {2} rejected'.format(
+        stats['batches'], stats['mean_batch_size'], stats['rejected']))
+    for endpoint, s in sorted(stats['latency'].items()):
+        print('  {0:8} p50 {1:6.2f} ms  p99 {2:6.2f} ms'.format(endpoint, s['p50_ms'], s['p99_ms']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark suite of the units parser and formatter and of every
+calculator formula, with JSON results and a regression check between runs.
+
+Every benchmark runs one operation over a fixed, seeded corpus of inputs
+(mixed SI suffixes, thousands separators, suffixes as decimal separators,
+µ/u, Ω/Ohm/R, ...): scalar benchmarks call the function once per input,
+batch benchmarks call the array functions once on the whole corpus. Times
+are per input: the best and the median of --repeat runs, each of as many
+calls as fit in 50 ms. The units cache is disabled.
+
+Usage: python benchmarks/micro.py run [--output results.json] [--filter REGEX] [--calc DIR]
+       python benchmarks/micro.py compare base.json head.json [--threshold 0.1]
+       python benchmarks/micro.py commits BASE HEAD [--threshold 0.1]
+
+compare exits with status 1 if a benchmark of head is slower than in base by
+more than the threshold (a fraction of the base time); commits runs the suite
+on two git commits (in temporary worktrees) and compares them. Benchmarks of
+functions a tree does not have are skipped.
+"""
+import argparse
+import datetime
+import importlib
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+VERSION = 1
+SEED = 1
+CORPUS_SIZE = 2000
+BATCH_SIZE = 100000
+REPEAT = 5
+# Duration [s] of one timed run
+TARGET = 0.05
+THRESHOLD = 0.1
+
+SUFFIXES = ['p', 'n', 'µ', 'u', 'm', '', 'k', 'M', 'G']
+UNITS = ['Ω', 'Ohm', 'R', 'V', 'A', 'F', 'H', 'Hz', 'W', '']
+# Representative value of every input unit of the calculator formulas
+VALUES = {'V': 5.0, 'Ω': 4700.0, 'A': 0.01, 'H': 1e-3, 'F': 1e-6, 'Hz': 1e3, '': 2.0}
+# play() of the calculator modules and their input units, benchmarked in every tree
+PLAYS = [
+    ('ohm_law', ('V', 'Ω')), ('ohm_law', ('V', 'A')), ('ohm_law', ('A', 'Ω')),
+    ('volt_divider', ('V', 'Ω', 'Ω')),
+    ('lc', ('H', 'F')), ('lc', ('H', 'Hz')), ('lc', ('F', 'Hz')),
+    ('c_reactance', ('F', 'Hz')), ('c_reactance', ('F', 'Ω')), ('c_reactance', ('Ω', 'Hz')),
+    ('l_reactance', ('H', 'Hz')), ('l_reactance', ('H', 'Ω')), ('l_reactance', ('Ω', 'Hz')),
+    ('dB', ('', '')),
+]
+
+
+def corpus(size=CORPUS_SIZE, seed=SEED):
+    """
+    Returns size engineer's inputs in the notations the parser accepts, always the same for a seed.
+    """
+    rng = random.Random(seed)
+    res = []
+    while len(res) < size:
+        suffix, unit = rng.choice(SUFFIXES), rng.choice(UNITS)
+        integer, fraction = rng.randint(1, 999), rng.randint(0, 99)
+        form = rng.randrange(6)
+        if form == 0:
+            s = '{0}{1}{2}'.format(integer, suffix, unit)
+        elif form == 1:
+            s = '{0}.{1}{2}{3}'.format(integer, fraction, suffix, unit)
+        elif form == 2 and suffix:
+            s = '{0}{1}{2}{3}'.format(integer, suffix, fraction, unit)
+        elif form == 3:
+            s = '{0},{1:03d}.{2}{3}{4}'.format(integer, rng.randint(0, 999), fraction, suffix, unit)
+        elif form == 4:
+            s = '{0}e{1}{2}'.format(integer, rng.randint(-9, 9), unit)
+        else:
+            s = '{0}.{1} {2}{3}'.format(integer, fraction, suffix, unit)
+        res.append(s)
+    return res
+
+
+def benchmarks(calc):
+    """
+    Returns [(name, items, setup)] where setup() returns the function to time,
+    one call covering items inputs. calc is the calc directory of the tree under
+    test. The play() functions of the calculator modules are benchmarked in
+    every tree, the formulas of the registry where the tree has one.
+    """
+    sys.path.insert(0, calc)
+    import numpy as np
+    from core import units
+    if hasattr(units, 'disable_cache'):
+        units.disable_cache()
+    p = units.Parser.instance
+    strings = corpus()
+    parsed = [p.normalize(s) for s in strings]
+    values = [v for v, _ in parsed]
+    pyspice_strings = [s for s, (_, u) in zip(strings, parsed) if u]
+    batch = np.array([strings[i % len(strings)] for i in range(BATCH_SIZE)])
+    batch_values = np.array([values[i % len(values)] for i in range(BATCH_SIZE)])
+
+    def loop(fn, items):
+        def run():
+            for item in items:
+                fn(item)
+        return run
+
+    def pyspice():
+        p.normalize_pyspice(pyspice_strings[0])
+        return loop(p.normalize_pyspice, pyspice_strings)
+
+    res = [
+        ('units.split_input', len(strings), lambda: loop(p.split_input, [s.strip() for s in strings])),
+        ('units.normalize', len(strings), lambda: loop(p.normalize, strings)),
+        ('units.normalize_pyspice', len(pyspice_strings), pyspice),
+        ('units.format', len(values), lambda: loop(lambda v: p.format(v, 'Ω'), values)),
+        ('units.parse_array[batch]', BATCH_SIZE, lambda: lambda: p.parse_array(batch)),
+        ('units.parse_quantities[batch]', BATCH_SIZE, lambda: lambda: p.parse_quantities(batch)),
+        ('units.format_array[batch]', BATCH_SIZE, lambda: lambda: p.format_array(batch_values, 'Ω')),
+        ('units.auto_suffix_1d[batch]', BATCH_SIZE, lambda: lambda: p.auto_suffix_1d(batch_values)),
+    ]
+    def calculator(name, inputs, load):
+        """
+        Scalar and batch benchmarks of the function load() returns, called with (value, unit) pairs of inputs.
+        """
+        name = '{0}[{1}]'.format(name, ','.join(u or '1' for u in inputs))
+        scalar = [(VALUES[u], u) for u in inputs]
+        # Arrays of BATCH_SIZE values spread around the representative ones
+        arrays = [(VALUES[u] * np.geomspace(0.1, 10, BATCH_SIZE), u) for u in inputs]
+        return [(name, 1, lambda: lambda fn=load(): fn(*scalar)),
+                (name[:-1] + ',batch]', BATCH_SIZE, lambda: lambda fn=load(): fn(*arrays))]
+
+    try:
+        from core import registry
+        for formula in registry.FORMULAS:
+            res.extend(calculator('{0}.{1}'.format(formula.command, formula.function), formula.inputs,
+                                  lambda f=formula: registry.load(f)))
+    except ImportError:
+        pass
+    names = set(name for name, _, _ in res)
+    for module, inputs in PLAYS:
+        # Calculators of the registry are not benchmarked twice
+        res.extend(b for b in calculator(module + '.play', inputs, lambda m=module: importlib.import_module(m).play)
+                   if b[0] not in names)
+    return res
+
+
+def measure(fn, items, repeat):
+    """
+    Returns {'items', 'number', 'repeat', 'min', 'median'}: seconds per input
+    of repeat runs of number calls of fn.
+    """
+    timer = timeit.Timer(fn)
+    number = max(1, int(TARGET / timer.timeit(1)))
+    times = [t / number / items for t in timer.repeat(repeat=repeat, number=number)]
+    return {'items': items, 'number': number, 'repeat': repeat, 'min': min(times), 'median': statistics.median(times)}
+
+
+def commit_of(directory):
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=directory, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(calc, pattern=None, repeat=REPEAT, verbose=True):
+    """
+    Runs the benchmarks of the calc directory whose names match pattern; returns the results document.
+    """
+    import numpy as np
+    results, skipped = {}, []
+    for name, items, setup in benchmarks(calc):
+        if pattern and not re.search(pattern, name):
+            continue
+        try:
+            fn = setup()
+            # Warm up, and check that the tree supports the benchmark
+            fn()
+        except (AttributeError, ImportError, TypeError, ValueError) as e:
+            skipped.append(name)
+            if verbose:
+                print('{0:48} skipped ({1})'.format(name, e))
+            continue
+        results[name] = measure(fn, items, repeat)
+        if verbose:
+            print('{0:48} {1:10.1f} ns/input (median {2:.1f})'.format(name, results[name]['min'] * 1e9,
+                                                                    results[name]['median'] * 1e9))
+    return {'version': VERSION, 'commit': commit_of(calc), 'date': datetime.datetime.now().isoformat(),
+            'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.machine(),
+            'results': results, 'skipped': skipped}
+
+
+def compare(base, head, threshold=THRESHOLD):
+    """
+    Prints the time ratios of the benchmarks of two results documents; returns the names of the regressions.
+    """
+    regressions = []
+    print('{0:48} {1:>12} {2:>12} {3:>8}'.format('benchmark', 'base ns', 'head ns', 'ratio'))
+    for name in sorted(set(base['results']) | set(head['results'])):
+        if name not in base['results'] or name not in head['results']:
+            print('{0:48} {1}'.format(name, 'only in ' + ('head' if name in head['results'] else 'base')))
+            continue
+        b, h = base['results'][name]['min'], head['results'][name]['min']
+        ratio = h / b
+        flag = ''
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print('{0:48} {1:12.1f} {2:12.1f} {3:8.2f}{4}'.format(name, b * 1e9, h * 1e9, ratio, flag))
+    print('{0} regressions over {1:.0%} ({2} vs {3})'.format(len(regressions), threshold, head.get('commit'),
+                                                            base.get('commit')))
+    return regressions
+
+
+def run_commit(commit, directory, args):
+    """
+    Runs the suite (this file) on commit checked out in a worktree under directory; returns the results document.
+    """
+    tree = os.path.join(directory, commit.replace('/', '_'))
+    subprocess.run(['git', 'worktree', 'add', '--detach', tree, commit], cwd=ROOT, check=True,
+                   stdout=subprocess.DEVNULL)
+    try:
+        output = tree + '.json'
+        cmd = [sys.executable, os.path.abspath(__file__), 'run', '--calc', os.path.join(tree, 'calc'), '--output',
+               output, '--repeat', str(args.repeat)] + (['--filter', args.filter] if args.filter else [])
+        subprocess.run(cmd, check=True)
+        with open(output) as f:
+            return json.load(f)
+    finally:
+        subprocess.run(['git', 'worktree', 'remove', '--force', tree], cwd=ROOT, check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='Run the suite and save the results as JSON')
+    run_parser.add_argument('--output', help='Results file (default: print only)')
+    run_parser.add_argument('--calc', default=os.path.join(ROOT, 'calc'), help='calc directory of the tree to run')
+    compare_parser = commands.add_parser('compare', help='Compare two results files')
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('head')
+    commits_parser = commands.add_parser('commits', help='Run the suite on two git commits and compare them')
+    commits_parser.add_argument('base')
+    commits_parser.add_argument('head')
+    for p in (run_parser, commits_parser):
+        p.add_argument('--filter', help='Regular expression selecting the benchmarks')
+        p.add_argument('--repeat', type=int, default=REPEAT)
+    for p in (compare_parser, commits_parser):
+        p.add_argument('--threshold', type=float, default=THRESHOLD, help='Allowed slowdown (default: 0.1)')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        doc = run(os.path.abspath(args.calc), args.filter, args.repeat)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(doc, f, indent=1)
+        return 0
+    if args.command == 'compare':
+        with open(args.base) as f, open(args.head) as g:
+            base, head = json.load(f), json.load(g)
+    else:
+        directory = tempfile.mkdtemp()
+        try:
+            base, head = run_commit(args.base, directory, args), run_commit(args.head, directory, args)
+        finally:
+            shutil.rmtree(directory)
+    return 1 if compare(base, head, args.threshold) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
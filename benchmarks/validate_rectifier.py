@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Validation of the closed-form rectifier model (core/rectifier.py) against
+PySpice transients of the playground circuits (half_wave_rect_filt.py and
+full_wave_rect_filt.py), with the 1N4148 model, over a range of loads.
+
+The transients run long enough to reach the steady state and are measured
+over their last period. The model is evaluated twice: with the nominal diode
+drop and with the drop fitted to the simulated peak output, which separates
+the error of the constant drop assumption from the error of the model.
+Simulations go through the simulation cache (core/simcache.py).
+
+Usage: python benchmarks/validate_rectifier.py [--periods 40] [--loads 0.25,1,4] [--processes N]
+"""
+import argparse
+import functools
+import os
+import sys
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'calc'))
+from core import rectifier, sweep, units
+from core.units import AllUnits as U
+
+FREQUENCY = 50.0
+# name -> (kind, amplitude [V], load [Ω], filter capacitance [F]) of the playground circuits
+CIRCUITS = {
+    'half_wave_rect_filt': (rectifier.HALF_WAVE, 10.0, 100.0, 1e-3),
+    'full_wave_rect_filt (bridge)': (rectifier.BRIDGE, 10.0, 100.0, 1e-3),
+    # The 115 V mode: a bridge loaded by two 1 mF capacitors in series
+    'full_wave_rect_filt (115V)': (rectifier.BRIDGE, 115.0, 10.0, 0.5e-3),
+}
+
+
+def build(name, load):
+    from PySpice.Spice.Netlist import Circuit
+    from core import libindex
+    spice_library = libindex.LibraryIndex(os.path.join(ROOT, 'libraries'))
+    kind, amplitude, _, capacitance = CIRCUITS[name]
+    circuit = Circuit(name)
+    circuit.include(spice_library['1N4148'])
+    circuit.SinusoidalVoltageSource('input', 'source', circuit.gnd, amplitude=amplitude, frequency=FREQUENCY)
+    if kind == rectifier.HALF_WAVE:
+        circuit.X('D1', '1N4148', 'source', 'output_plus')
+        circuit.R('load', 'output_plus', circuit.gnd, load)
+        circuit.C('1', 'output_plus', circuit.gnd, capacitance)
+        return circuit, {}
+    circuit.X('D1', '1N4148', 'source', 'output_plus')
+    circuit.X('D3', '1N4148', circuit.gnd, 'output_plus')
+    circuit.X('D2', '1N4148', 'output_minus', circuit.gnd)
+    circuit.X('D4', '1N4148', 'output_minus', 'source')
+    circuit.R('load', 'output_plus', 'output_minus', load)
+    if amplitude > 100:
+        circuit.C('1', 'output_plus', 'node_115', 2 * capacitance)
+        circuit.C('2', 'node_115', 'output_minus', 2 * capacitance)
+        return circuit, {'node_115': 0}
+    circuit.C('1', 'output_plus', 'output_minus', capacitance)
+    return circuit, {}
+
+
+def simulate(point, periods=40, steps=400):
+    """
+    Returns the time, output voltage and source current of the last period of a transient.
+    """
+    from core import simcache
+    circuit, initial_condition = build(point['circuit'], point['load'])
+    simulator = simcache.cached_simulator(circuit, temperature=25, nominal_temperature=25)
+    if initial_condition:
+        simulator.initial_condition(**initial_condition)
+    period = 1 / FREQUENCY
+    analysis = simulator.transient(step_time=period / steps, end_time=period * periods)
+    time = np.array(analysis.time)
+    output = np.array(analysis['output_plus'])
+    if 'output_minus' in analysis.nodes:
+        output = output - np.array(analysis['output_minus'])
+    last = time >= time[-1] - period
+    return {'time': time[last], 'output': output[last], 'current': np.abs(np.array(analysis['vinput']))[last]}
+
+
+def measure(time, output, current):
+    """
+    Returns the ripple, mean output, peak current and conduction fraction of one period of a transient.
+    """
+    span = time[-1] - time[0]
+    conducting = current > 0.01 * current.max()
+    on_time = np.sum(np.diff(time) * conducting[:-1])
+    return output.max() - output.min(), np.trapezoid(output, time) / span, current.max(), on_time / span
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--periods', type=int, default=40, help='Simulated periods (default: 40)')
+    parser.add_argument('--loads', default='0.25,1,4', help='Load multipliers of the playground loads')
+    parser.add_argument('--drop', type=float, default=rectifier.DIODE_DROP, help='Nominal diode drop [V]')
+    parser.add_argument('--processes', type=int, default=None)
+    args = parser.parse_args()
+
+    scales = [float(s) for s in args.loads.split(',')]
+    points = {name: [CIRCUITS[name][2] * s for s in scales] for name in CIRCUITS}
+    for name, loads in points.items():
+        kind, amplitude, _, capacitance = CIRCUITS[name]
+        result = sweep.run(functools.partial(simulate, periods=args.periods), {'circuit': [name], 'load': loads},
+                           processes=args.processes)
+        print('{0}: {1}'.format(name, result.summary().splitlines()[0]))
+        print('{0:>8} {1:>26} {2:>26} {3:>26} {4:>20}'.format('load', 'ripple sim/model/fitted',
+                                                             'V_dc sim/model/fitted', 'I_peak sim/model/fitted',
+                                                             'conduction sim/model'))
+        failures = dict((f.point['load'], f.message) for f in result.failures)
+        for load in loads:
+            if load in failures:
+                print('{0:>8} failed: {1}'.format(units.format_simple(load, U.R), failures[load].strip()))
+                continue
+            p = result.point(circuit=name, load=load)
+            ripple, v_dc, peak, fraction = measure(p['time'], p['output'], p['current'])
+            diodes, rectified = rectifier.KINDS[kind]
+            fitted = (amplitude - p['output'].max()) / diodes
+            model, model_fitted = [rectifier.steady_state(kind, amplitude, FREQUENCY, load, capacitance, drop)
+                                   for drop in (args.drop, fitted)]
+            print('{0:>8} {1:>26} {2:>26} {3:>26} {4:>20}'.format(
+                units.format_simple(load, U.R),
+                '/'.join(units.format_simple(float(v), U.V) for v in (ripple, model.ripple, model_fitted.ripple)),
+                '/'.join(units.format_simple(float(v), U.V) for v in (v_dc, model.v_dc, model_fitted.v_dc)),
+                '/'.join(units.format_simple(float(v), U.A)
+                         for v in (peak, model.peak_current, model_fitted.peak_current)),
+                '{0:.1f}°/{1:.1f}°'.format(fraction * np.degrees(rectified), float(model.conduction))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import sys
+from core import units
+from core import batch
+from core import registry
+from core import instrument
+
+
+def parse_window(s):
+    """
+    Parses LOW:HIGH (either may be empty) into ((low, high), unit).
+    """
+    low, _, high = s.partition(':')
+    bounds = [units.AllUnits.convert_to_canonical(units.parse(v)) if v else (None, '') for v in (low, high)]
+    return (bounds[0][0], bounds[1][0]), bounds[0][1] or bounds[1][1]
+
+
+def monte_carlo(values, command, args):
+    """
+    Arguments may carry their own tolerance in percent: 4k7±1% or 4k7+-1%.
+    """
+    from core import montecarlo
+    components = []
+    for v in values:
+        v, tolerance = (v.replace('+-', '±').split('±') + [None])[:2]
+        tolerance = float(tolerance.rstrip('%')) if tolerance else args.tolerance
+        value, unit = units.parse(v)
+        components.append(montecarlo.component(value, unit, tolerance / 100, args.distribution, args.tempco))
+    spec = None
+    if args.spec:
+        window, unit = parse_window(args.spec)
+        spec = {unit or registry.find([c.unit for c in components], command).outputs[0]: window}
+    temperature = None
+    if args.temperature:
+        temperature = tuple(float(t) for t in args.temperature.split(':'))
+        temperature = temperature if len(temperature) > 1 else temperature[0]
+    res = montecarlo.run(components, args.mc, command, spec, temperature, seed=args.seed)
+    print(res.summary(histogram=args.histogram))
+
+
+def expression(expr, values):
+    """
+    Evaluates expr over the NAME=VALUE arguments, e.g. 'V * V / R' V=5V R=4k7R; returns the Measure.
+    """
+    from core import dimensions
+    variables = {}
+    for v in values:
+        name, sep, value = v.partition('=')
+        if not sep:
+            raise ValueError('NAME=VALUE expected, got {0}'.format(v))
+        variables[name.strip()] = units.parse(value)
+    return dimensions.evaluate(expr, variables)
+
+
+def print_formulas():
+    for f in registry.FORMULAS:
+        print('{0:13} {1:12} -> {2}'.format(f.command, ', '.join(u or '-' for u in f.inputs),
+                                           ', '.join(f.outputs)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.description = """
+Single entry point for all calculators. The formula is selected by the units of the arguments;
+the calculator name is only needed when several calculators accept the same units.
+For example: calc.py 10mA 4k7R
+             calc.py lc 1mH 1kHz
+             calc.py volt_divider --batch dividers.csv
+             calc.py --daemon (see calc_client.py)
+             calc.py --http 8080
+             calc.py 10V 4k7R±1% 1k2R±1% --mc 1e7 --spec 1.9V:2.1V (tolerance analysis)
+             calc.py --expr "V * V / (R1 + R2)" V=12V R1=4k7R R2=1k2R (result unit worked out)
+    """
+    parser.add_argument("args", nargs='*',
+                        help='Optional calculator name ({0}) followed by its arguments'.format(
+                            ', '.join(registry.COMMANDS)))
+    parser.add_argument("--list", action='store_true', help='List the available formulas')
+    parser.add_argument("--expr", metavar='EXPRESSION',
+                        help='Evaluate an expression (+ - * / **, sqrt, log10, pi) of NAME=VALUE arguments')
+    batch.add_arguments(parser)
+    parser.add_argument("--arity", type=int, default=2,
+                        help='Number of columns of the batch input (default: 2, 3 for volt_divider)')
+    parser.add_argument("--daemon", action='store_true',
+                        help='Serve requests of calc_client.py over a Unix socket until interrupted')
+    parser.add_argument("--socket", help='Socket path of --daemon (default: $CALC_SOCKET or a per-user path)')
+    parser.add_argument("--http", metavar='[HOST:]PORT',
+                        help='Serve the HTTP/JSON API (see core/service.py) until interrupted')
+    mc = parser.add_argument_group('Monte Carlo tolerance analysis')
+    mc.add_argument("--mc", metavar='SAMPLES', type=lambda s: int(float(s)),
+                    help='Evaluate SAMPLES random component sets and print the distribution of the results')
+    mc.add_argument("--tolerance", type=float, default=0.0,
+                    help='Tolerance in percent of the arguments without their own (default: 0)')
+    mc.add_argument("--distribution", choices=['uniform', 'normal'], default='uniform',
+                    help='Distribution of the values within tolerance (normal: tolerance is 3 sigma)')
+    mc.add_argument("--tempco", type=float, default=0.0, help='Temperature coefficient of the arguments [ppm/°C]')
+    mc.add_argument("--temperature", metavar='LOW[:HIGH]',
+                    help='Temperature [°C], uniformly distributed between LOW and HIGH '
+                         '(write --temperature=-40:85 for negative values)')
+    mc.add_argument("--spec", metavar='LOW:HIGH', help='Spec window of the first result for the yield, e.g. 1.9V:2.1V')
+    mc.add_argument("--histogram", action='store_true', help='Print the histograms of the results')
+    mc.add_argument("--seed", type=int, help='Seed of the random generator')
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    instrument.start(args)
+
+    if args.http:
+        from core import service
+        host, _, port = args.http.rpartition(':')
+        service.serve(host or '127.0.0.1', int(port))
+        sys.exit(0)
+
+    if args.daemon:
+        from core import daemon
+        daemon.serve(args.socket)
+        sys.exit(0)
+
+    if args.list:
+        print_formulas()
+        sys.exit(0)
+
+    if args.expr:
+        try:
+            value, unit = expression(args.expr, args.args).pair()
+        except ValueError as e:
+            parser.error(str(e))
+        print(units.format_verbose(value, unit))
+        sys.exit(0)
+
+    command = None
+    values = args.args
+    if values and values[0] in registry.COMMANDS:
+        command, values = values[0], values[1:]
+
+    if args.batch:
+        arity = 3 if command == 'volt_divider' else args.arity
+        sys.exit(batch.main(args, lambda *a: registry.evaluate(a, command), arity))
+    if not values:
+        parser.error('arguments are required unless --batch or --list is used')
+
+    if args.mc:
+        try:
+            monte_carlo(values, command, args)
+        except ValueError as e:
+            parser.error(str(e))
+        sys.exit(0)
+
+    try:
+        parsed = [units.AllUnits.convert_to_canonical(units.parse(v)) for v in values]
+        formula = registry.find([u for _, u in parsed], command)
+        results = registry.evaluate(parsed, formula.command)
+        lines = registry.format_results(formula, results)
+    except (ValueError, ArithmeticError) as e:
+        parser.error(str(e))
+    for line in lines:
+        print(line)
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import sys
+from core import client
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.description = """
+Thin client of the calculator daemon started with calc.py --daemon.
+Takes the same arguments as calc.py; evaluates in-process when no daemon is running.
+For example: calc_client.py 10mA 4k7R
+             calc_client.py lc 1mH 1kHz
+    """
+    parser.add_argument("args", nargs='+', help='Optional calculator name followed by its arguments')
+    parser.add_argument("--socket", help='Daemon socket path (default: $CALC_SOCKET or a per-user path)')
+    args = parser.parse_args()
+
+    values = args.args
+    command = None
+    # Calculator names never start with a digit, a sign or a decimal point
+    if values[0][0].isalpha():
+        command, values = values[0], values[1:]
+
+    with client.Client(args.socket) as c:
+        response = c.evaluate(values, command)
+    if not response['ok']:
+        parser.error(response['error'])
+    for line in response['text']:
+        print(line)
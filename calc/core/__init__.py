@@ -0,0 +1,6 @@
+import os
+
+# Timing instrumentation requested by the environment (see instrument.py)
+if os.environ.get('CALC_PROFILE'):
+    from . import instrument
+    instrument.enable_from_environment()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming batch mode shared by the calculator command line tools.
+
+Every input row holds the positional arguments of one computation, e.g. for ohm_law.py:
+    10mA,4k7
+    3.3V	560R
+Columns may be separated by commas, semicolons or tabs (detected from the
+first row unless --delimiter is given). Empty lines and lines starting
+with '#' are skipped.
+
+Every output row repeats the input columns followed by a (value, unit) pair
+for each result, e.g.
+    10mA,4k7,47.0,V,0.47000000000000003,W
+
+Rows are read, computed and written one at a time, so memory use does not
+depend on the size of the input. Malformed rows are reported on stderr
+(with their line number) and skipped.
+"""
+import csv
+import itertools
+import sys
+from . import units
+
+DELIMITERS = '\t;,'
+
+
+def add_arguments(parser):
+    """
+    Add the batch mode options to an argparse parser.
+    """
+    parser.add_argument('--batch', metavar='FILE', nargs='?', const='-',
+                        help='Read CSV/TSV rows of arguments from FILE (or stdin if omitted or "-") '
+                             'and write one result row per input row')
+    parser.add_argument('--delimiter', help='Column delimiter of the batch input (default: auto-detected)')
+
+
+def read_rows(stream, delimiter=None):
+    """
+    Split a text stream into rows.
+    Returns a tuple (delimiter, rows) where rows is a generator of
+    (line_number, fields) tuples. If delimiter is None it is detected
+    from the first data line.
+    """
+    lines = ((lineno, line) for lineno, line in enumerate(stream, 1)
+             if line.strip() and not line.startswith('#'))
+    first = next(lines, None)
+    if first is None:
+        return delimiter or ',', iter(())
+    if delimiter is None:
+        delimiter = next((d for d in DELIMITERS if d in first[1]), ',')
+
+    current = [first[0]]
+
+    def tracked_lines():
+        for lineno, line in itertools.chain([first], lines):
+            current[0] = lineno
+            yield line
+
+    def rows():
+        for fields in csv.reader(tracked_lines(), delimiter=delimiter):
+            yield current[0], fields
+
+    return delimiter, rows()
+
+
+def run(compute, rows, arity, out, delimiter=',', err=sys.stderr):
+    """
+    Evaluate compute(*args) for every row and write the results to out.
+    compute receives the parsed (value, unit) arguments and returns
+    a sequence of (value, unit) results.
+
+    Returns a tuple (good_rows, bad_rows).
+    """
+    writer = csv.writer(out, delimiter=delimiter, lineterminator='\n')
+    parse = units.parse
+    good = bad = 0
+    for lineno, fields in rows:
+        if len(fields) != arity:
+            err.write('line {0}: expected {1} columns, got {2}\n'.format(lineno, arity, len(fields)))
+            bad += 1
+            continue
+        try:
+            results = compute(*[parse(f) for f in fields])
+        except KeyError as e:
+            # Raised by the SELECTOR lookup of the calculators
+            err.write('line {0}: unsupported combination of units: {1}\n'.format(lineno, e))
+            bad += 1
+            continue
+        except (ValueError, ZeroDivisionError) as e:
+            err.write('line {0}: {1}: {2}\n'.format(lineno, type(e).__name__, e))
+            bad += 1
+            continue
+        row = list(fields)
+        for value, unit in results:
+            row.append(repr(float(value)))
+            row.append(unit)
+        writer.writerow(row)
+        good += 1
+    return good, bad
+
+
+def main(args, compute, arity):
+    """
+    Entry point of --batch for the calculator scripts.
+    Returns the process exit status: 0 if all rows were computed, 1 otherwise.
+    """
+    # The same literals tend to repeat across rows
+    units.enable_cache()
+    stream = sys.stdin if args.batch == '-' else open(args.batch, encoding='utf8', newline='')
+    try:
+        delimiter, rows = read_rows(stream, args.delimiter)
+        _, bad = run(compute, rows, arity, sys.stdout, delimiter)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return 0 if bad == 0 else 1
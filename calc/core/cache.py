@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+A small thread-safe bounded cache used to memoize parsed and formatted quantities.
+
+Usage example:
+    >>> cache = LruCache(maxsize=2)
+    >>> cache.put('10k', (10000.0, ''))
+    >>> cache.get('10k')
+    (10000.0, '')
+"""
+import collections
+import threading
+
+CacheInfo = collections.namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+
+class LruCache(object):
+    LRU = 'lru'
+    FIFO = 'fifo'
+    POLICIES = (LRU, FIFO)
+
+    def __init__(self, maxsize=4096, policy=LRU):
+        """
+        maxsize is the maximum number of entries kept.
+        policy selects the entry evicted when the cache is full:
+        'lru' evicts the least recently used one, 'fifo' the oldest inserted one.
+        """
+        if maxsize < 1:
+            raise ValueError('Cache size must be positive: {0}'.format(maxsize))
+        if policy not in LruCache.POLICIES:
+            raise ValueError('Unknown eviction policy: {0}'.format(policy))
+        self.maxsize = maxsize
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Returns the value cached under key or default.
+        Counts a hit or a miss.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if self.policy == LruCache.LRU:
+                self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Stores value under key, evicting entries above maxsize.
+        """
+        with self._lock:
+            self._data[key] = value
+            if self.policy == LruCache.LRU:
+                self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Drops all entries and resets the counters.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._data))
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Thin client of the calculator daemon (see core.daemon).
+
+Only the standard library is imported until a request has to be evaluated
+in-process, so the client starts fast. When no daemon is listening,
+requests are evaluated in-process with the same code as the daemon.
+
+Usage example:
+    >>> with Client() as c:
+    ...     c.evaluate(['10mA', '4k7R'])['results']
+    [[47.0, 'V'], [0.47000000000000003, 'W']]
+"""
+import json
+import os
+import socket
+
+
+def default_socket_path():
+    """
+    Returns the daemon socket path: $CALC_SOCKET or a per-user path in the temporary directory.
+    """
+    path = os.environ.get('CALC_SOCKET')
+    if path:
+        return path
+    import tempfile
+    return os.path.join(tempfile.gettempdir(), 'calc-{0}.sock'.format(os.getuid()))
+
+
+class Client(object):
+    def __init__(self, path=None, fallback=True, timeout=10.0):
+        """
+        path is the daemon socket (default: default_socket_path()).
+        If fallback is False, ConnectionError is raised when no daemon is running.
+        """
+        self.path = path or default_socket_path()
+        self.fallback = fallback
+        self.timeout = timeout
+        self._sock = None
+        self._rfile = None
+        self._next_id = 0
+
+    def connect(self):
+        """
+        Connects to the daemon. Returns False if it is not running.
+        """
+        if self._sock is not None:
+            return True
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        s.settimeout(self.timeout)
+        try:
+            s.connect(self.path)
+        except OSError:
+            s.close()
+            return False
+        self._sock = s
+        self._rfile = s.makefile('rb')
+        return True
+
+    def close(self):
+        if self._sock is not None:
+            self._rfile.close()
+            self._sock.close()
+            self._sock = self._rfile = None
+
+    @property
+    def remote(self):
+        """
+        True if requests go to the daemon.
+        """
+        return self._sock is not None or self.connect()
+
+    def evaluate(self, args, command=None):
+        """
+        Evaluates args (strings or [value, unit] pairs) and returns the response
+        object (see core.daemon for its fields).
+        """
+        self._next_id += 1
+        request = {'id': self._next_id, 'args': list(args)}
+        if command is not None:
+            request['command'] = command
+        if self.remote:
+            try:
+                self._sock.sendall((json.dumps(request) + '\n').encode('utf8'))
+                line = self._rfile.readline()
+                if line:
+                    return json.loads(line.decode('utf8'))
+            except OSError:
+                pass
+            # The daemon went away
+            self.close()
+            if not self.fallback:
+                raise ConnectionError('Lost connection to the daemon at {0}'.format(self.path))
+        elif not self.fallback:
+            raise ConnectionError('No daemon listening on {0}'.format(self.path))
+        from . import daemon
+        return daemon.handle(request)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
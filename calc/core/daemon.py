@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Warm calculator daemon.
+
+The daemon loads the units parser and every calculator module once and then
+serves requests over a Unix domain socket. The protocol is line-delimited
+JSON: every request is one JSON object on one line, answered by one JSON
+object on one line. A connection may carry any number of requests.
+
+Request:
+    {"id": 1, "args": ["10mA", "4k7R"], "command": "ohm_law"}
+"id" is optional and echoed back, "command" is only needed when the units
+are ambiguous (see registry.find()). Arguments are strings in any notation
+understood by units.parse(), or [value, unit] pairs.
+
+Responses:
+    {"id": 1, "ok": true, "command": "ohm_law", "results": [[47.0, "V"], [0.47, "W"]],
+     "text": ["47.0 V (47.0 V)", "Power dissipation: 470 mW (0.47 W)"]}
+    {"id": 1, "ok": false, "error": "No formula accepts units ['V', 'V']"}
+
+See core.client for the client side.
+"""
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+from . import registry
+from . import units
+from .client import default_socket_path
+
+
+def _to_json(value):
+    return value.tolist() if hasattr(value, 'tolist') else value
+
+
+def handle(request):
+    """
+    Evaluates one decoded request and returns the response object.
+    Never raises for malformed requests; the error is reported in the response.
+    """
+    response = {'id': request.get('id')} if isinstance(request, dict) else {'id': None}
+    try:
+        if not isinstance(request, dict) or not isinstance(request.get('args'), list):
+            raise ValueError('Request must be an object with an "args" list')
+        args = [units.parse(a) if isinstance(a, str) else _pair(a) for a in request['args']]
+        args = [units.AllUnits.convert_to_canonical(a) for a in args]
+        formula = registry.find([a[1] for a in args], request.get('command'))
+        results = registry.evaluate(args, formula.command)
+        text = registry.format_results(formula, results)
+    except (ValueError, TypeError, IndexError, KeyError, ZeroDivisionError, OverflowError) as e:
+        response['ok'] = False
+        response['error'] = str(e)
+        return response
+    response['ok'] = True
+    response['command'] = formula.command
+    response['results'] = [[_to_json(value), unit] for value, unit in results]
+    response['text'] = text
+    return response
+
+
+def _pair(a):
+    """
+    Returns the (value, unit) tuple of a [number, unit] argument.
+    """
+    if (not isinstance(a, list) or len(a) != 2 or isinstance(a[0], bool)
+            or not isinstance(a[0], (int, float)) or not isinstance(a[1], str)):
+        raise ValueError('Arguments must be strings or [number, unit] pairs, got {0}'.format(json.dumps(a)))
+    return a[0], a[1]
+
+
+def handle_line(line):
+    """
+    Decodes one request line (str or UTF-8 bytes) and returns the encoded response line.
+    """
+    try:
+        if isinstance(line, bytes):
+            line = line.decode('utf8')
+        request = json.loads(line)
+    except UnicodeDecodeError as e:
+        response = {'id': None, 'ok': False, 'error': 'Request is not UTF-8: {0}'.format(e)}
+    except ValueError as e:
+        response = {'id': None, 'ok': False, 'error': 'Malformed JSON: {0}'.format(e)}
+    else:
+        response = handle(request)
+    return (json.dumps(response, ensure_ascii=False) + '\n').encode('utf8')
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            self.wfile.write(handle_line(line))
+            self.wfile.flush()
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Serves every client connection in its own thread.
+    """
+    daemon_threads = True
+
+    def __init__(self, path=None):
+        self.path = path or default_socket_path()
+        _remove_stale_socket(self.path)
+        socketserver.UnixStreamServer.__init__(self, self.path, _RequestHandler)
+
+    def server_close(self):
+        socketserver.UnixStreamServer.server_close(self)
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+def _remove_stale_socket(path):
+    """
+    Removes a socket left behind by a dead daemon.
+    Raises OSError if a daemon is already listening on path.
+    """
+    if not os.path.exists(path):
+        return
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        s.connect(path)
+    except OSError:
+        os.unlink(path)
+    else:
+        raise OSError('A daemon is already listening on {0}'.format(path))
+    finally:
+        s.close()
+
+
+def warm_up():
+    """
+    Imports every calculator module and initializes the parser caches.
+    """
+    for formula in registry.FORMULAS:
+        registry.load(formula)
+    units.enable_cache()
+    units.format_array([1.0])
+
+
+def serve(path=None):
+    """
+    Runs the daemon until interrupted or terminated.
+    """
+    warm_up()
+    server = Server(path)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    sys.stderr.write('calc daemon listening on {0}\n'.format(server.path))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
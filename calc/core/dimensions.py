@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""
+Unit algebra on SI dimension vectors.
+
+A Measure holds a value (a number or a NumPy array) and the exponents of
+its dimension over the SI base units kg, m, s, A and K. Arithmetic works out
+the dimension of the result: V / Ω gives A, V * A gives W, 1 / sqrt(H * F)
+gives Hz. Sums, differences and comparisons require equal dimensions. The
+dimension is checked once per operation, whatever the size of the arrays, so
+multi-step formulas run as plain vectorized expressions:
+
+    >>> v, r = Measure(5, 'V'), Measure([1e3, 4.7e3, 10e3], 'Ohm')
+    >>> p = v * v / r
+    >>> p.unit, p.value
+    ('W', array([0.025     , 0.00531915, 0.0025    ]))
+    >>> evaluate('1 / (2 * pi * sqrt(L * C))', {'L': Measure(1e-3, 'H'), 'C': Measure(1e-6, 'F')})
+    Measure(5032.921210448703, 'Hz')
+
+Results of a dimension without a unit of AllUnits get a composed symbol
+(e.g. 'm²·kg·s⁻²·A⁻¹'). Measures are accepted by the calculators like (value, unit) pairs.
+"""
+import ast
+import numbers
+import numpy as np
+from . import units
+from .units import AllUnits as U
+
+BASE = ('kg', 'm', 's', 'A', 'K')
+DIMENSIONLESS = (0, 0, 0, 0, 0)
+
+# Exponents of the base units (kg, m, s, A, K) of the canonical units
+DIMENSIONS = {
+    '': DIMENSIONLESS,
+    U.F: (-1, -2, 4, 2, 0),
+    U.A: (0, 0, 0, 1, 0),
+    U.R: (1, 2, -3, -2, 0),
+    U.W: (1, 2, -3, 0, 0),
+    U.H: (1, 2, -2, -2, 0),
+    U.C: (0, 0, 1, 1, 0),
+    U.K: (0, 0, 0, 0, 1),
+    U.Hz: (0, 0, -1, 0, 0),
+    U.V: (1, 2, -3, -1, 0),
+    U.J: (1, 2, -2, 0, 0),
+    U.S: (-1, -2, 3, 2, 0),
+}
+_UNITS = dict((d, u) for u, d in DIMENSIONS.items())
+
+_SUPERSCRIPTS = str.maketrans('-0123456789', '⁻⁰¹²³⁴⁵⁶⁷⁸⁹')
+# Base units in the order of composed symbols (SI brochure: m kg s A K)
+_SYMBOL_ORDER = (1, 0, 2, 3, 4)
+
+
+def dimension(unit):
+    """
+    Returns the dimension vector of unit (any alias, e.g. 'Ohm'). Raises ValueError for unknown units.
+    """
+    unit = U.convert_to_canonical((None, unit))[1]
+    try:
+        return DIMENSIONS[unit]
+    except KeyError:
+        raise ValueError('Unknown unit: {0}'.format(unit))
+
+
+def symbol(dimension):
+    """
+    Returns the unit of a dimension vector: its canonical unit or a composed symbol.
+    """
+    unit = _UNITS.get(dimension)
+    if unit is not None:
+        return unit
+    return '·'.join(BASE[i] + ('' if dimension[i] == 1 else str(dimension[i]).translate(_SUPERSCRIPTS))
+                    for i in _SYMBOL_ORDER if dimension[i])
+
+
+class Measure(object):
+    __slots__ = ('value', 'dimension')
+    # NumPy operators defer to Measure (array * Measure is a Measure, not an object array)
+    __array_ufunc__ = None
+
+    def __init__(self, value, unit=''):
+        """
+        value is a number, a sequence or an array; unit any unit of AllUnits.
+        """
+        value, unit = U.convert_to_canonical((value, unit))
+        self.value = value
+        self.dimension = dimension(unit)
+
+    @staticmethod
+    def of(q):
+        """
+        Returns q as a Measure: a Measure, a (value, unit) pair, a Quantity or a QuantityArray.
+        """
+        if isinstance(q, Measure):
+            return q
+        return Measure(*U.convert_to_canonical(q))
+
+    @staticmethod
+    def _make(value, dimension):
+        m = Measure.__new__(Measure)
+        m.value, m.dimension = value, dimension
+        return m
+
+    @property
+    def unit(self):
+        return symbol(self.dimension)
+
+    def pair(self):
+        return self.value, self.unit
+
+    def to(self, unit):
+        """
+        Returns the value in unit, raises ValueError if unit has another dimension.
+        """
+        if dimension(unit) != self.dimension:
+            raise ValueError('Cannot express [{0}] in [{1}]'.format(self.unit, unit))
+        return self.value
+
+    def _check(self, other, operation):
+        other = _coerce(other)
+        if other.dimension != self.dimension:
+            raise ValueError('Cannot {0} [{1}] and [{2}]'.format(operation, self.unit, other.unit))
+        return other
+
+    def __add__(self, other):
+        return Measure._make(self.value + self._check(other, 'add').value, self.dimension)
+
+    def __radd__(self, other):
+        return Measure._make(self._check(other, 'add').value + self.value, self.dimension)
+
+    def __sub__(self, other):
+        return Measure._make(self.value - self._check(other, 'subtract').value, self.dimension)
+
+    def __rsub__(self, other):
+        return Measure._make(self._check(other, 'subtract').value - self.value, self.dimension)
+
+    def __mul__(self, other):
+        other = _coerce(other)
+        return Measure._make(self.value * other.value, tuple(a + b for a, b in zip(self.dimension, other.dimension)))
+
+    def __rmul__(self, other):
+        return _coerce(other) * self
+
+    def __truediv__(self, other):
+        other = _coerce(other)
+        return Measure._make(self.value / other.value, tuple(a - b for a, b in zip(self.dimension, other.dimension)))
+
+    def __rtruediv__(self, other):
+        return _coerce(other) / self
+
+    def __pow__(self, exponent):
+        """
+        exponent must be a number giving whole exponents of the base units (e.g. 0.5 of H·F).
+        """
+        if not isinstance(exponent, numbers.Real):
+            raise ValueError('Exponents must be dimensionless numbers')
+        scaled = [e * exponent for e in self.dimension]
+        if any(s != int(s) for s in scaled):
+            raise ValueError('[{0}] ** {1} is not a whole power of the base units'.format(self.unit, exponent))
+        if exponent != int(exponent) and np.any(np.less(self.value, 0)):
+            raise ValueError('[{0}] ** {1} of a negative value is not real'.format(self.unit, exponent))
+        return Measure._make(self.value ** exponent, tuple(int(s) for s in scaled))
+
+    def __rpow__(self, base):
+        """
+        base ** m, m must be a dimensionless scalar.
+        """
+        if self.dimension != DIMENSIONLESS:
+            raise ValueError('Exponents must be dimensionless numbers')
+        return _coerce(base) ** self.value
+
+    def __neg__(self):
+        return Measure._make(-self.value, self.dimension)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return Measure._make(abs(self.value), self.dimension)
+
+    def __lt__(self, other):
+        return self.value < self._check(other, 'compare').value
+
+    def __le__(self, other):
+        return self.value <= self._check(other, 'compare').value
+
+    def __gt__(self, other):
+        return self.value > self._check(other, 'compare').value
+
+    def __ge__(self, other):
+        return self.value >= self._check(other, 'compare').value
+
+    def __eq__(self, other):
+        other = _coerce(other)
+        if other.dimension != self.dimension:
+            return NotImplemented
+        return self.value == other.value
+
+    def __ne__(self, other):
+        other = _coerce(other)
+        if other.dimension != self.dimension:
+            return NotImplemented
+        return self.value != other.value
+
+    # Mutable and compared by value (arrays compare element-wise), Measures of other dimensions are unequal
+    __hash__ = None
+
+    def __str__(self):
+        if isinstance(self.value, np.ndarray):
+            return str(units.format_array(self.value, self.unit)[0])
+        return units.format_simple(self.value, self.unit)
+
+    def __repr__(self):
+        return 'Measure({0!r}, {1!r})'.format(self.value, self.unit)
+
+
+def _coerce(x):
+    """
+    Measures are returned as they are, numbers and arrays as dimensionless Measures.
+    """
+    if isinstance(x, Measure):
+        return x
+    if isinstance(x, (list, tuple)):
+        x = np.asarray(x, dtype=np.float64)
+    return Measure._make(x, DIMENSIONLESS)
+
+
+def sqrt(m):
+    return _coerce(m) ** 0.5
+
+
+def log10(m):
+    """
+    log10 of a dimensionless Measure (ratios), a dimensionless Measure.
+    """
+    m = _coerce(m)
+    if m.dimension != DIMENSIONLESS:
+        raise ValueError('Cannot take the logarithm of [{0}]'.format(m.unit))
+    return Measure._make(np.log10(m.value), DIMENSIONLESS)
+
+
+FUNCTIONS = {'sqrt': sqrt, 'log10': log10, 'abs': abs}
+CONSTANTS = {'pi': np.pi}
+
+_OPERATORS = {
+    ast.Add: lambda a, b: a + b,
+    ast.Sub: lambda a, b: a - b,
+    ast.Mult: lambda a, b: a * b,
+    ast.Div: lambda a, b: a / b,
+    ast.Pow: lambda a, b: a ** b,
+    ast.USub: lambda a: -a,
+    ast.UAdd: lambda a: +a,
+}
+
+
+def evaluate(expression, variables):
+    """
+    Evaluates an arithmetic expression (+ - * / **, parentheses, numbers, pi,
+    sqrt(), log10(), abs()) of the variables, {name: Measure or (value, unit)}.
+    Returns a Measure. Raises ValueError for anything else, for inconsistent
+    units and for divisions by zero, overflows and results which are not finite real numbers.
+    """
+    variables = dict((name, Measure.of(v)) for name, v in variables.items())
+    try:
+        tree = ast.parse(expression, mode='eval')
+    except SyntaxError as e:
+        raise ValueError('Invalid expression: {0}'.format(e.msg))
+
+    def visit(node):
+        if isinstance(node, ast.Expression):
+            return visit(node.body)
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            # Floats, so that powers of integer literals cannot run into huge exact integers
+            return float(node.value)
+        if isinstance(node, ast.Name):
+            if node.id in variables:
+                return variables[node.id]
+            if node.id in CONSTANTS:
+                return CONSTANTS[node.id]
+            raise ValueError('Unknown name: {0}'.format(node.id))
+        if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+            left, right = visit(node.left), visit(node.right)
+            if isinstance(node.op, ast.Pow):
+                # Exponents are plain numbers (dimensionless Measures give their value)
+                right = right.to('') if isinstance(right, Measure) else right
+                return _coerce(left) ** right
+            return _OPERATORS[type(node.op)](_coerce(left), right)
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _OPERATORS:
+            return _OPERATORS[type(node.op)](_coerce(visit(node.operand)))
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS
+                and len(node.args) == 1 and not node.keywords):
+            return FUNCTIONS[node.func.id](_coerce(visit(node.args[0])))
+        raise ValueError('Unsupported expression: {0}'.format(ast.unparse(node)))
+
+    try:
+        with np.errstate(all='raise'):
+            res = _coerce(visit(tree))
+    except ArithmeticError as e:
+        raise ValueError('Cannot evaluate {0}: {1}'.format(expression, e))
+    if np.iscomplexobj(res.value) or not np.all(np.isfinite(res.value)):
+        raise ValueError('Result of {0} is not a finite real number'.format(expression))
+    return res
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+DC solution of a source - resistor - diode loop without a simulator.
+
+The diode is the SPICE junction diode (level 1, DC): saturation current IS,
+emission coefficient N, series resistance RS, reverse breakdown at BV (IBV),
+IS scaled with the temperature by XTI and EG, and GMIN across the junction.
+The loop is solved for the junction voltage of every point of a sweep at
+once, with Newton's method safeguarded by a bracket of the root: steps
+leaving the bracket are replaced by bisection, so every point converges,
+whatever the voltage, resistance or temperature.
+
+Usage example (playground/diode.py: 1N4148 behind 1 Ω, -2 V .. 5 V, three temperatures):
+    >>> d = model(IS=4.352e-9, N=1.906, RS=0.6458, BV=110, IBV=1e-4)
+    >>> s = solve(d, np.arange(-2, 5, .01), 1.0, temperature=np.array([0, 25, 100])[:, None],
+    ...           r_parallel=5.827e9)
+    >>> s.current.shape, s.voltage[1, -1]          # current [A] and diode voltage [V] per point
+    ((3, 700), 2.562...)
+
+All arguments broadcast, so sweeps over temperature x voltage x resistance
+are one call.
+"""
+import collections
+import numpy as np
+
+BOLTZMANN = 1.380649e-23
+CHARGE = 1.602176634e-19
+ZERO_CELSIUS = 273.15
+# SPICE defaults
+GMIN = 1e-12
+NOMINAL_TEMPERATURE = 27.0
+TOLERANCE = 1e-12
+MAX_ITERATIONS = 100
+# Junction conductance x series resistance above which the inverse characteristic is iterated
+STEEP = 10.0
+# Largest exponent evaluated (exp(700) ~ 1e304)
+EXP_LIMIT = 700.0
+
+DiodeModel = collections.namedtuple('DiodeModel', ['IS', 'N', 'RS', 'BV', 'IBV', 'XTI', 'EG', 'TNOM'])
+DEFAULTS = DiodeModel(IS=1e-14, N=1.0, RS=0.0, BV=np.inf, IBV=1e-3, XTI=3.0, EG=1.11, TNOM=NOMINAL_TEMPERATURE)
+
+# Terminal current [A] and voltage [V] of the diode, junction voltage [V] and Newton iterations of every point
+Solution = collections.namedtuple('Solution', ['current', 'voltage', 'junction', 'iterations'])
+
+
+def model(**params):
+    """
+    Returns the DiodeModel of the SPICE parameters params (case insensitive,
+    e.g. IS=4.352e-9, n=1.906); parameters not given take the SPICE defaults.
+    """
+    fields = dict((k.upper(), v) for k, v in params.items())
+    unknown = set(fields) - set(DiodeModel._fields)
+    if unknown:
+        raise ValueError('Unknown diode parameters: {0}'.format(', '.join(sorted(unknown))))
+    return DEFAULTS._replace(**fields)
+
+
+def thermal_voltage(temperature):
+    """
+    kT/q [V] at temperature [°C].
+    """
+    return BOLTZMANN * (np.asarray(temperature, dtype=np.float64) + ZERO_CELSIUS) / CHARGE
+
+
+def saturation_current(d, temperature):
+    """
+    IS of the DiodeModel d at temperature [°C] (SPICE temperature scaling from TNOM).
+    """
+    ratio = (np.asarray(temperature, dtype=np.float64) + ZERO_CELSIUS) / (d.TNOM + ZERO_CELSIUS)
+    return d.IS * ratio ** (d.XTI / d.N) * np.exp((ratio - 1) * d.EG / (d.N * thermal_voltage(temperature)))
+
+
+def _junction(v, i_s, nvt, xbv, gmin):
+    """
+    Returns the junction current and conductance at the junction voltages v.
+    """
+    forward = i_s * np.exp(np.minimum(v / nvt, EXP_LIMIT))
+    # SPICE reverse region: -IS (1 + (3 N Vt / (e v))^3), breakdown below -BV (slope N Vt, NBV = N)
+    reverse = np.minimum(v, -3 * nvt)
+    x = 3 * nvt / (np.e * reverse)
+    cube = x * x * x
+    breakdown = i_s * np.exp(np.minimum(-(xbv + v) / nvt, EXP_LIMIT))
+    current = np.where(v >= -3 * nvt, forward - i_s, np.where(v > -xbv, -i_s * (1 + cube), -breakdown))
+    conductance = np.where(v >= -3 * nvt, forward / nvt,
+                           np.where(v > -xbv, 3 * i_s * cube / reverse, breakdown / nvt))
+    return current + gmin * v, conductance + gmin
+
+
+def _step(v, low, high, source, series, i_s, nvt, xbv, gmin, tolerance):
+    """
+    One safeguarded iteration on the points v. Returns the new v, the bracket
+    and whether the points converged.
+    """
+    current, conductance = _junction(v, i_s, nvt, xbv, gmin)
+    f = (source - v) / series - current
+    low = np.where(f > 0, v, low)
+    high = np.where(f > 0, high, v)
+    newton = f / (1 / series + conductance)
+    converged = np.abs(newton) <= tolerance * np.maximum(1.0, np.abs(v))
+    candidate = v + newton
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Where the exponential dominates, Newton crawls by N Vt per step from the
+        # high current side: iterate on the inverse characteristic instead, the
+        # junction voltage carrying the resistor current (a contraction there)
+        i_r = (source - v) / series
+        steep = (conductance * series > STEEP) & ((v >= 0) | (v <= -xbv))
+        inverse = np.where(v >= 0, nvt * np.log1p(i_r / i_s), -xbv - nvt * np.log(-i_r / i_s))
+    candidate = np.where(steep & np.isfinite(inverse) & ~converged, inverse, candidate)
+    # Bisection when the step leaves the bracket
+    inside = converged | ((candidate > low) & (candidate < high))
+    return np.where(inside, candidate, (low + high) / 2), low, high, converged
+
+
+def solve(d, voltage, resistance, temperature=25.0, nominal_temperature=None, r_parallel=np.inf, gmin=GMIN,
+          tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS):
+    """
+    Solves source voltage [V] - resistance [Ω] - diode (DiodeModel d, anode
+    on the resistor) at temperature [°C]; nominal_temperature overrides the
+    model's TNOM (ngspice's nominal_temperature). r_parallel [Ω] is a resistor
+    across the diode terminals (the 1N4148 sub-circuit has one).
+
+    Returns the Solution, arrays of the broadcast shape of the arguments;
+    current is the loop (resistor) current.
+    """
+    if nominal_temperature is not None:
+        d = d._replace(TNOM=nominal_temperature)
+    voltage, resistance, temperature, r_parallel = np.broadcast_arrays(
+        *[np.asarray(v, dtype=np.float64) for v in (voltage, resistance, temperature, r_parallel)])
+    shape = voltage.shape
+    voltage, resistance, temperature, r_parallel = [np.ravel(v) for v in (voltage, resistance, temperature,
+                                                                          r_parallel)]
+    nvt = d.N * thermal_voltage(temperature)
+    i_s = saturation_current(d, temperature)
+    # Breakdown voltage giving IBV at -BV
+    xbv = d.BV - nvt * np.log1p(d.IBV / i_s)
+    # Thevenin equivalent of the source, the resistor and r_parallel, then RS in series
+    with np.errstate(divide='ignore', invalid='ignore'):
+        divider = np.where(np.isinf(r_parallel), 1.0, r_parallel / (resistance + r_parallel))
+    source = voltage * divider
+    series = resistance * divider + d.RS
+
+    # f(v) = (source - v) / series - i(v) decreases; its root lies between 0 and source
+    low, high = np.minimum(source, 0.0), np.maximum(source, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        guess = np.where(source > 0, nvt * np.log1p(np.maximum(source, 0.0) / (series * i_s)), source)
+    v = np.clip(guess, low, high)
+    iterations = np.zeros(v.shape, dtype=np.int64)
+    # Indices of the points not converged yet; only those are iterated
+    active = np.arange(v.size)
+    for _ in range(max_iterations):
+        if not active.size:
+            break
+        v[active], low[active], high[active], converged = _step(
+            v[active], low[active], high[active], source[active], series[active], i_s[active], nvt[active],
+            xbv[active], gmin, tolerance)
+        iterations[active] += 1
+        active = active[~converged]
+    current, _ = _junction(v, i_s, nvt, xbv, gmin)
+    terminal = v + d.RS * current
+    with np.errstate(divide='ignore', invalid='ignore'):
+        current = np.where(np.isinf(r_parallel), current, current + terminal / r_parallel)
+    return Solution(*[x.reshape(shape) for x in (current, terminal, v, iterations)])
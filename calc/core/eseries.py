@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+Selection of E-series components for a target value.
+
+The calculators compute a result from given parts; the solvers here go the
+other way and return the best standard parts for a target: a divider ratio
+(or V_out for a V_in), the resonant frequency of an LC circuit or the
+reactance of a capacitor or an inductor at a frequency.
+
+Candidate values are kept in sorted tables, optionally extended with the
+series and parallel combinations of two values. For every value of the first
+part the ideal second part follows from the formula and its nearest values
+are found by binary search (np.searchsorted) over the whole table at once,
+so an E96 x E96 search with pairs takes milliseconds instead of nested loops.
+
+Usage example:
+    >>> for c in divider(5, 'E24', n=2, v_in=12):
+    ...     print([p.value for p in c.parts], c.value, c.error)
+    [18000.0, 13000.0] 5.032... 0.00645...
+    [5100.0, 3600.0] 4.965... -0.00689...
+    >>> reactance(100, 1e3, 'F', 'E12', n=1, pairs=True)[0].parts[0]
+    Part(value=1.59e-06, a=3.9e-07, b=1.2e-06, connection='parallel')
+
+The command line front end is solve.py.
+"""
+import collections
+import functools
+import numpy as np
+from .units import AllUnits as U
+
+# Mantissas of the IEC 60063 series; E48 and E96 are round(10 ** (i / n), 2)
+_E12 = (1.0, 1.2, 1.5, 1.8, 2.2, 2.7, 3.3, 3.9, 4.7, 5.6, 6.8, 8.2)
+_E24 = (1.0, 1.1, 1.2, 1.3, 1.5, 1.6, 1.8, 2.0, 2.2, 2.4, 2.7, 3.0, 3.3, 3.6, 3.9, 4.3, 4.7, 5.1, 5.6, 6.2, 6.8,
+        7.5, 8.2, 9.1)
+SERIES = {
+    'E3': _E12[::4],
+    'E6': _E12[::2],
+    'E12': _E12,
+    'E24': _E24,
+    'E48': tuple(np.round(10 ** (np.arange(48) / 48.0), 2)),
+    'E96': tuple(np.round(10 ** (np.arange(96) / 96.0), 2)),
+}
+
+# Default value ranges [first decade, last decade) per unit
+DECADES = {
+    U.R: (0, 7),        # 1 Ω .. 10 MΩ
+    U.F: (-12, -2),     # 1 pF .. 10 mF
+    U.H: (-9, 0),       # 1 nH .. 1 H
+}
+# Largest ratio of the two values of a pair
+MAX_PAIR_RATIO = 10.0
+
+SINGLE = 'single'
+SERIES_CONNECTION = 'series'
+PARALLEL = 'parallel'
+_CONNECTIONS = (SINGLE, SERIES_CONNECTION, PARALLEL)
+
+# One part: a single value (b is None) or two values in series or parallel
+Part = collections.namedtuple('Part', ['value', 'a', 'b', 'connection'])
+# A solution: its parts, the value it achieves and the relative error to the target
+Candidate = collections.namedtuple('Candidate', ['parts', 'value', 'error'])
+
+
+def values(series='E24', unit=U.R, decades=None):
+    """
+    Returns the sorted array of the values of series over decades, (first, last) exponents.
+    """
+    if series not in SERIES:
+        raise ValueError('Unknown series {0}, expected one of: {1}'.format(series, ', '.join(SERIES)))
+    first, last = decades or DECADES[U.convert_to_canonical((0, unit))[1]]
+    # Rounded to remove the binary noise of the powers of ten
+    return _round(np.outer(10.0 ** np.arange(first, last), SERIES[series]).ravel(), 3)
+
+
+def _round(v, digits):
+    """
+    Rounds the positive values v to digits significant digits.
+    """
+    scale = 10.0 ** (np.floor(np.log10(v)) - digits + 1)
+    return np.round(v / scale) * scale
+
+
+class Table(object):
+    """
+    Sorted values achievable with one part, with how each one is built.
+    """
+    def __init__(self, series='E24', unit=U.R, decades=None, pairs=False, max_ratio=MAX_PAIR_RATIO):
+        unit = U.convert_to_canonical((0, unit))[1]
+        singles = values(series, unit, decades)
+        a, b, connection = [singles], [np.full(singles.size, np.nan)], [np.zeros(singles.size, dtype=np.int8)]
+        if pairs:
+            i, j = np.triu_indices(singles.size)
+            keep = singles[j] <= singles[i] * max_ratio
+            x, y = singles[i[keep]], singles[j[keep]]
+            # Capacitances add up in parallel, resistances and inductances in series
+            adding, reciprocal = (PARALLEL, SERIES_CONNECTION) if unit == U.F else (SERIES_CONNECTION, PARALLEL)
+            for name in (adding, reciprocal):
+                a.append(x)
+                b.append(y)
+                connection.append(np.full(x.size, _CONNECTIONS.index(name), dtype=np.int8))
+            value = np.concatenate([singles, x + y, x * y / (x + y)])
+        else:
+            value = singles
+        a, b, connection = np.concatenate(a), np.concatenate(b), np.concatenate(connection)
+        count = np.where(np.isnan(b), 1, 2)
+        # Sorted, and of equal values only the one with the fewest components
+        rounded = _round(value, 12)
+        order = np.lexsort((count, rounded))
+        order = order[np.unique(rounded[order], return_index=True)[1]]
+        self.unit = unit
+        self.value = value[order]
+        self.a = a[order]
+        self.b = b[order]
+        self.connection = connection[order]
+        # Number of components of every value
+        self.count = count[order]
+
+    def __len__(self):
+        return self.value.size
+
+    def part(self, i):
+        b = self.b[i]
+        return Part(float(self.value[i]), float(self.a[i]), None if np.isnan(b) else float(b),
+                    _CONNECTIONS[self.connection[i]])
+
+    def nearest(self, targets):
+        """
+        Returns the indices of the values nearest (in ratio) to targets.
+        """
+        targets = np.asarray(targets, dtype=np.float64)
+        i = np.clip(np.searchsorted(self.value, targets), 1, self.value.size - 1)
+        below, above = self.value[i - 1], self.value[i]
+        return np.where(targets * targets <= below * above, i - 1, i)
+
+
+@functools.lru_cache(maxsize=32)
+def table(series='E24', unit=U.R, decades=None, pairs=False, max_ratio=MAX_PAIR_RATIO):
+    """
+    Returns the (cached) Table of series for unit.
+    """
+    return Table(series, unit, decades, pairs, max_ratio)
+
+
+def _tables(series, unit, decades, pairs):
+    """
+    Returns the tables searched for a second part: with pairs, the singles as
+    well, so that a single value within max_error is not hidden by a nearer pair.
+    """
+    res = [table(series, unit, decades, pairs)]
+    if pairs:
+        res.append(table(series, unit, decades))
+    return res
+
+
+def _match(first, seconds, targets):
+    """
+    Matches every value of the table first with the value of each table in
+    seconds nearest to its target (targets has one value per value of first).
+    Returns (i, value, count, part): the indices into first, the values and
+    component counts of the matches, and part(m) returning the m-th match.
+    """
+    size = len(first)
+    i = np.tile(np.arange(size), len(seconds))
+    j = [t.nearest(targets) for t in seconds]
+    value = np.concatenate([t.value[k] for t, k in zip(seconds, j)])
+    count = np.concatenate([t.count[k] for t, k in zip(seconds, j)])
+    return i, value, count, lambda m: seconds[m // size].part(j[m // size][m % size])
+
+
+def _best(error, n, max_error=0.0, *ties):
+    """
+    Returns the indices of the n (or more, if tied) best candidates, sorted by
+    |error| (errors within max_error being equally good), then by ties and |error|.
+    """
+    key = np.round(np.maximum(np.abs(error), max_error), 12)
+    if key.size > 4 * n:
+        # Keep every candidate as good as the n-th one for the tie break
+        candidates = np.flatnonzero(key <= np.partition(key, n - 1)[n - 1])
+    else:
+        candidates = np.arange(key.size)
+    order = np.lexsort((np.abs(error[candidates]),) + tuple(t[candidates] for t in reversed(ties)) +
+                       (key[candidates],))
+    return candidates[order]
+
+
+def divider(ratio, series='E24', n=10, pairs=False, v_in=None, impedance=10e3, max_error=0.0, decades=None):
+    """
+    Returns the n best (R1, R2) Candidates for V_out / V_in = R2 / (R1 + R2) = ratio
+    (or for V_out = ratio if v_in is given), their value being the achieved ratio
+    (or V_out). Candidates within max_error are ranked by number of resistors.
+    Dividers with the same ratio in other decades are dropped, keeping the one
+    whose R1 + R2 is the nearest to impedance.
+    """
+    scale = 1.0 if v_in is None else float(v_in)
+    ratio = ratio / scale
+    if not 0.0 < ratio < 1.0:
+        raise ValueError('A divider ratio must be between 0 and 1, got {0}'.format(ratio))
+    t = table(series, U.R, decades, pairs)
+    i, r2, count2, part2 = _match(t, _tables(series, U.R, decades, pairs), t.value * ratio / (1.0 - ratio))
+    r1 = t.value[i]
+    achieved = r2 / (r1 + r2)
+    error = achieved / ratio - 1.0
+    res = []
+    seen = set()
+    for m in _best(error, n * 8, max_error, t.count[i] + count2, np.abs(np.log(r1 + r2) - np.log(impedance))):
+        key = round(float(achieved[m]), 12)
+        if key in seen:
+            continue
+        seen.add(key)
+        res.append(Candidate((t.part(i[m]), part2(m)), float(achieved[m]) * scale, float(error[m])))
+        if len(res) == n:
+            break
+    return res
+
+
+def lc(frequency, series='E12', n=10, pairs=False, impedance=None, max_error=0.0, decades_l=None,
+       decades_c=None, series_c=None):
+    """
+    Returns the n best (L, C) Candidates for the resonant frequency f = 1 / (2 pi sqrt(LC)),
+    their value being the achieved frequency. Candidates within max_error are
+    ranked by number of components; equally good ones by how near their
+    characteristic impedance sqrt(L / C) is to impedance.
+    """
+    lt = table(series, U.H, decades_l, pairs)
+    product = 1.0 / np.square(2 * np.pi * frequency)
+    i, c, count_c, part_c = _match(lt, _tables(series_c or series, U.F, decades_c, pairs), product / lt.value)
+    l = lt.value[i]
+    achieved = 1.0 / (2 * np.pi * np.sqrt(l * c))
+    error = achieved / frequency - 1.0
+    ties = [lt.count[i] + count_c]
+    if impedance is not None:
+        ties.append(np.abs(0.5 * np.log(l / c) - np.log(impedance)))
+    return [Candidate((lt.part(i[m]), part_c(m)), float(achieved[m]), float(error[m]))
+            for m in _best(error, n, max_error, *ties)[:n]]
+
+
+def nearest(target, unit, series='E24', n=10, pairs=False, max_error=0.0, decades=None):
+    """
+    Returns the n Candidates of one part nearest to the target value; candidates
+    within max_error are ranked by number of components.
+    """
+    t = table(series, unit, decades, pairs)
+    i = int(t.nearest(target))
+    begin, end = np.searchsorted(t.value, [target * (1 - max_error), target * (1 + max_error)])
+    window = np.arange(max(min(begin, i - n), 0), min(max(end, i + n + 1), len(t)))
+    error = t.value[window] / target - 1.0
+    best = _best(error, n, max_error, t.count[window])[:n]
+    return [Candidate((t.part(k),), float(t.value[k]), float(e)) for k, e in zip(window[best], error[best])]
+
+
+def reactance(x, frequency, unit, series='E24', n=10, pairs=False, max_error=0.0, decades=None):
+    """
+    Returns the n best capacitors (unit F) or inductors (unit H) having the
+    reactance x [Ω] at frequency; the value of the Candidates is their reactance.
+    """
+    unit = U.convert_to_canonical((0, unit))[1]
+    omega = 2 * np.pi * frequency
+    if unit == U.F:
+        target, to_reactance = 1.0 / (omega * x), lambda c: 1.0 / (omega * c)
+    elif unit == U.H:
+        target, to_reactance = x / omega, lambda l: omega * l
+    else:
+        raise ValueError('Reactance of [{0}] or [{1}] expected, got [{2}]'.format(U.F, U.H, unit))
+    res = []
+    for c in nearest(target, unit, series, n, pairs, max_error, decades):
+        achieved = to_reactance(c.value)
+        res.append(Candidate(c.parts, achieved, achieved / x - 1.0))
+    return res
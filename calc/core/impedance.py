@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+Frequency response of passive R, L, C networks.
+
+A network is built from elements combined in series and in parallel, or
+parsed from a description where '+' connects in series and '|' (or '||')
+in parallel, '|' binding tighter than '+':
+
+    >>> network = parse('10R + 1mH + (100nF | 1kR)')
+    >>> response = sweep(network, 10, 1e7, 10**6)      # log-spaced grid, one NumPy pass per element
+    >>> response.magnitude, response.phase              # |Z| [Ω] and arg(Z) [°]
+    >>> for r in response.resonances():
+    ...     print(r.kind, r.frequency, r.low, r.high, r.q)
+
+Resonances are the frequencies where the reactance changes sign: from
+capacitive to inductive for a series resonance (|Z| minimum), the other way
+for a parallel one (|Z| maximum). They are located on the grid and refined
+by bisection on the network itself, as are the -3 dB edges, where |Z| has
+changed by a factor of sqrt(2) from its value at resonance.
+"""
+import collections
+import re
+import numpy as np
+from . import units
+from .units import AllUnits as U
+
+SERIES = 'series'
+PARALLEL = 'parallel'
+# Bisection steps refining resonances and edges (relative precision 2 ** -steps of a grid step)
+BISECTION_STEPS = 40
+
+Resonance = collections.namedtuple('Resonance', ['kind', 'frequency', 'magnitude', 'low', 'high', 'q'])
+
+
+class Element(object):
+    def __init__(self, value, unit):
+        value, unit = U.convert_to_canonical((value, unit))
+        if unit not in (U.R, U.H, U.F):
+            raise ValueError('Element of [{0}], [{1}] or [{2}] expected, got [{3}]'.format(U.R, U.H, U.F, unit))
+        self.value = value
+        self.unit = unit
+
+    def impedance(self, omega):
+        omega = np.asarray(omega, dtype=np.float64)
+        if self.unit == U.R:
+            return np.full(omega.shape, self.value, dtype=np.complex128)
+        if self.unit == U.H:
+            return 1j * omega * self.value
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 1 / (1j * omega * self.value)
+
+    def __str__(self):
+        return units.format_simple(self.value, self.unit).replace(' ', '')
+
+
+class Series(object):
+    def __init__(self, *parts):
+        self.parts = parts
+
+    def impedance(self, omega):
+        res = self.parts[0].impedance(omega)
+        for part in self.parts[1:]:
+            res = res + part.impedance(omega)
+        return res
+
+    def __str__(self):
+        return ' + '.join(str(p) for p in self.parts)
+
+
+class Parallel(object):
+    def __init__(self, *parts):
+        self.parts = parts
+
+    def impedance(self, omega):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            admittance = 1 / self.parts[0].impedance(omega)
+            for part in self.parts[1:]:
+                admittance = admittance + 1 / part.impedance(omega)
+            return 1 / admittance
+
+    def __str__(self):
+        return ' | '.join('({0})'.format(p) if isinstance(p, Series) else str(p) for p in self.parts)
+
+
+_TOKENS = re.compile(r'\s*(\|\|?|\+|\(|\)|[^\s()|+]+)')
+
+
+def parse(s):
+    """
+    Parses a network description, e.g. '50R + (1mH | 100nF)'. Values are read
+    with the units parser and must carry their unit (R/Ω, H or F).
+    """
+    tokens = [t for t in _TOKENS.findall(s) if t]
+    pos = [0]
+
+    def peek():
+        return tokens[pos[0]] if pos[0] < len(tokens) else None
+
+    def take():
+        pos[0] += 1
+        return tokens[pos[0] - 1]
+
+    def series():
+        parts = [parallel()]
+        while peek() == '+':
+            take()
+            parts.append(parallel())
+        return parts[0] if len(parts) == 1 else Series(*parts)
+
+    def parallel():
+        parts = [element()]
+        while peek() in ('|', '||'):
+            take()
+            parts.append(element())
+        return parts[0] if len(parts) == 1 else Parallel(*parts)
+
+    def element():
+        token = peek()
+        if token is None:
+            raise ValueError('Unexpected end of network: {0}'.format(s))
+        take()
+        if token == '(':
+            res = series()
+            if peek() != ')':
+                raise ValueError('Missing ) in network: {0}'.format(s))
+            take()
+            return res
+        if token in ('+', '|', '||', ')'):
+            raise ValueError('Unexpected {0} in network: {1}'.format(token, s))
+        return Element(*units.parse(token))
+
+    res = series()
+    if peek() is not None:
+        raise ValueError('Unexpected {0} in network: {1}'.format(peek(), s))
+    return res
+
+
+def frequencies(start, stop, points):
+    """
+    Returns points log-spaced frequencies from start to stop [Hz].
+    Raises ValueError unless 0 < start < stop and points >= 2.
+    """
+    if not 0 < start < stop:
+        raise ValueError('Frequencies must satisfy 0 < start < stop, got {0} Hz and {1} Hz'.format(start, stop))
+    if int(points) < 2:
+        raise ValueError('At least 2 points are needed, got {0}'.format(points))
+    return np.geomspace(start, stop, int(points))
+
+
+def _bisect(fn, low, high, steps=BISECTION_STEPS):
+    """
+    Refines brackets [low, high] (arrays of frequencies) of sign changes of fn
+    by bisection in log frequency, all at once. Returns the midpoints.
+    """
+    low, high = np.log(low), np.log(high)
+    low_sign = np.sign(fn(np.exp(low)))
+    for _ in range(steps):
+        middle = (low + high) / 2
+        same = np.sign(fn(np.exp(middle))) == low_sign
+        low = np.where(same, middle, low)
+        high = np.where(same, high, middle)
+    return np.exp((low + high) / 2)
+
+
+class Response(object):
+    """
+    Complex impedance of a network over a frequency grid.
+    """
+    def __init__(self, network, frequency, impedance):
+        self.network = network
+        self.frequency = frequency
+        self.impedance = impedance
+
+    @property
+    def magnitude(self):
+        return np.abs(self.impedance)
+
+    @property
+    def phase(self):
+        """
+        Phase in degrees.
+        """
+        return np.degrees(np.angle(self.impedance))
+
+    def _z(self, f):
+        return self.network.impedance(2 * np.pi * f)
+
+    def resonances(self):
+        """
+        Returns the Resonances within the grid, with their -3 dB edges (None if
+        beyond the grid) and quality factor f / (high - low).
+        """
+        x = self.impedance.imag
+        sign = np.sign(x)
+        change = np.flatnonzero(sign[:-1] * sign[1:] < 0)
+        if not change.size:
+            return []
+        rising = sign[change] < 0
+        # Series: X rises through zero; parallel: X falls through a pole, B = Im(1/Z) rises through zero
+        with np.errstate(divide='ignore', invalid='ignore'):
+            f0 = np.where(rising,
+                          _bisect(lambda f: self._z(f).imag, self.frequency[change], self.frequency[change + 1]),
+                          _bisect(lambda f: (1 / self._z(f)).imag, self.frequency[change],
+                                  self.frequency[change + 1]))
+        magnitude = np.abs(self._z(f0))
+        res = []
+        for i, f, m, series in zip(change, f0, magnitude, rising):
+            level = m * np.sqrt(2) if series else m / np.sqrt(2)
+            low, high = self._edge(i, f, level, -1), self._edge(i + 1, f, level, 1)
+            q = None
+            if low is not None and high is not None:
+                # A lossless resonance is narrower than the float resolution
+                q = f / (high - low) if high > low else np.inf
+            res.append(Resonance(SERIES if series else PARALLEL, float(f), float(m), low, high, q))
+        return res
+
+    def _edge(self, i, f0, level, direction):
+        """
+        Returns the first frequency from the resonance f0 in direction (-1 or 1)
+        where |Z| crosses level; i is the grid index next to f0 on that side.
+        """
+        inside = np.sign(np.abs(self._z(f0)) - level)
+        side = self.magnitude[i::-1] if direction < 0 else self.magnitude[i:]
+        crossed = np.flatnonzero(np.sign(side - level) != inside)
+        if not crossed.size:
+            return None
+        j = i + direction * int(crossed[0])
+        outer = self.frequency[j]
+        inner = f0 if j == i else self.frequency[j - direction]
+        low, high = sorted((inner, outer))
+        return float(_bisect(lambda f: np.abs(self._z(f)) - level, low, high))
+
+    def crossings(self, level):
+        """
+        Returns the frequencies where |Z| crosses level [Ω].
+        """
+        sign = np.sign(self.magnitude - level)
+        change = np.flatnonzero(sign[:-1] * sign[1:] < 0)
+        return _bisect(lambda f: np.abs(self._z(f)) - level, self.frequency[change], self.frequency[change + 1])
+
+    def table(self, rows=20):
+        """
+        Returns the text table of rows points of the response spread over the
+        grid, each column scaled to the suffix auto_suffix_1d() picks for it.
+        """
+        index = np.unique(np.linspace(0, self.frequency.size - 1, rows).round().astype(np.intp))
+        columns = [('f', self.frequency[index], U.Hz), ('|Z|', self.magnitude[index], U.R),
+                   ('R', self.impedance.real[index], U.R), ('X', self.impedance.imag[index], U.R)]
+        header, cells = [], []
+        for name, values, unit in columns:
+            multiplier, suffix = axis_scale(values)
+            header.append('{0} [{1}{2}]'.format(name, suffix, unit))
+            cells.append(['{0:.4g}'.format(v) for v in values * multiplier])
+        header.append('phase [°]')
+        cells.append(['{0:.2f}'.format(v) for v in self.phase[index]])
+        width = [max(len(h), max(len(c) for c in column)) for h, column in zip(header, cells)]
+        lines = ['  '.join(h.rjust(w) for h, w in zip(header, width))]
+        for row in zip(*cells):
+            lines.append('  '.join(c.rjust(w) for c, w in zip(row, width)))
+        return '\n'.join(lines)
+
+    def summary(self):
+        lines = ['{0}: {1} points from {2} to {3}'.format(
+            self.network, self.frequency.size, units.format_simple(self.frequency[0], U.Hz),
+            units.format_simple(self.frequency[-1], U.Hz))]
+        for r in self.resonances():
+            edges = ''
+            if r.low is not None and r.high is not None:
+                edges = ', -3 dB {0} .. {1}, Q {2:.3g}'.format(units.format_simple(r.low, U.Hz),
+                                                              units.format_simple(r.high, U.Hz), r.q)
+            lines.append('{0} resonance at {1}, |Z| {2}{3}'.format(
+                r.kind, units.format_simple(r.frequency, U.Hz), units.format_simple(r.magnitude, U.R), edges))
+        return '\n'.join(lines)
+
+
+def axis_scale(values):
+    """
+    Returns (multiplier, suffix) labelling values with one SI prefix, see Parser.auto_suffix_1d().
+    """
+    finite = np.asarray(values, dtype=np.float64)
+    finite = finite[np.isfinite(finite)]
+    if not finite.size:
+        return 1.0, ''
+    with np.errstate(divide='ignore'):
+        return units.Parser.instance.auto_suffix_1d(finite)
+
+
+def sweep(network, start, stop, points=1000):
+    """
+    Evaluates the impedance of network (or of its description) over points
+    log-spaced frequencies from start to stop [Hz]; start and stop may be
+    strings such as '10Hz'. Returns a Response.
+    """
+    if isinstance(network, str):
+        network = parse(network)
+    start, stop = [units.parse(v)[0] if isinstance(v, str) else v for v in (start, stop)]
+    f = frequencies(start, stop, points)
+    return Response(network, f, network.impedance(2 * np.pi * f))
@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+"""
+Timing and memory instrumentation of calculator and simulation runs.
+
+When enabled, timers are put around the functions a run spends its time in:
+the units parser and formatter, the calculator formulas, the imports of the
+heavy modules (numpy, scipy, PySpice, matplotlib), PySpice simulator
+construction, netlist generation and analysis calls, the ngspice load, run
+and read steps, and matplotlib's show and savefig. Every call is counted
+and timed (total and self time, without the timed calls it makes); with
+memory, tracemalloc also records the peak memory allocated during each call.
+Nothing is wrapped while disabled, so the instrumentation costs nothing then.
+
+At exit, a summary is printed to stderr and, with a trace path, every call
+is written as a Chrome trace event (open it in chrome://tracing or
+https://ui.perfetto.dev).
+
+Enabled for any script importing core by $CALC_PROFILE (1, or the trace
+path; $CALC_PROFILE_MEMORY=1 adds the memory peaks), or by the --profile
+[TRACE.json] and --profile-memory options of the command line tools:
+    $ CALC_PROFILE=diode.json python playground/diode.py
+    $ ./calc.py 10mA 4k7R --profile
+
+Usage example (in a script):
+    >>> enable(memory=True, at_exit=False)
+    >>> with span('netlist variants'):
+    ...     build()
+    >>> print(summary())
+
+Only the calling process is instrumented (not sweep worker processes), and
+memory peaks are process wide: calls running concurrently in several
+threads see each other's allocations.
+"""
+import atexit
+import contextlib
+import functools
+import importlib.machinery
+import os
+import sys
+import threading
+import time
+from . import registry
+from . import units
+
+ENVIRONMENT = 'CALC_PROFILE'
+MEMORY_ENVIRONMENT = 'CALC_PROFILE_MEMORY'
+# Calls kept for the trace; later calls are only counted
+MAX_EVENTS = 1000000
+
+# Timed imports
+IMPORTS = ('numpy', 'scipy', 'PySpice', 'matplotlib')
+ANALYSES = ('operating_point', 'dc', 'ac', 'transient', 'dc_sensitivity', 'ac_sensitivity', 'polezero', 'noise',
+            'distortion', 'transfer_function')
+# Timed functions: module -> [(attribute path, name, category)]; modules imported later are patched on import
+TARGETS = {
+    units.__name__: [('Parser.normalize', 'units.parse', 'units'),
+                     ('Parser.normalize_pyspice', 'units.parse_pyspice', 'units'),
+                     ('Parser.normalize_spice', 'units.parse_spice', 'units'),
+                     ('Parser.parse_array', 'units.parse_array', 'units'),
+                     ('Parser.format', 'units.format', 'units'),
+                     ('Parser.format_array', 'units.format_array', 'units')],
+    'PySpice.Spice.Netlist': [('Circuit.simulator', 'simulator', 'simulation')],
+    'PySpice.Spice.Simulation': [('CircuitSimulation.__str__', 'netlist', 'simulation')] +
+                                [('CircuitSimulator.' + a, 'analysis ' + a, 'simulation') for a in ANALYSES],
+    'PySpice.Spice.NgSpice.Shared': [('NgSpiceShared.load_circuit', 'ngspice load', 'ngspice'),
+                                     ('NgSpiceShared.run', 'ngspice run', 'ngspice'),
+                                     ('NgSpiceShared.plot', 'ngspice read', 'ngspice')],
+    'matplotlib.pyplot': [('show', 'plot show', 'plot')],
+    'matplotlib.figure': [('Figure.savefig', 'plot savefig', 'plot')],
+}
+# Calculator functions of the running script (see start())
+CALCULATOR_FUNCTIONS = ('play', 'play_with_power', 'play_db')
+
+_recorder = None
+_trace = None
+# (owner, attribute, original) of the patched functions
+_patched = []
+_hook = None
+_started_tracemalloc = False
+
+
+class Recorder(object):
+    def __init__(self, memory=False):
+        """
+        With memory, tracemalloc must be tracing.
+        """
+        self.memory = memory
+        self.origin = time.perf_counter_ns()
+        # (name, category, start ns, duration ns, thread, peak bytes or None) of every call
+        self.events = []
+        self.dropped = 0
+        # (name, category) -> [calls, total ns, self ns, max ns, peak bytes]
+        self.stats = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def start(self):
+        """
+        Returns the frame of a call starting now, to be passed to stop().
+        """
+        stack = self._stack()
+        # [start ns, ns spent in timed callees, peak bytes, traced bytes at the start]
+        frame = [0, 0, 0, 0]
+        if self.memory:
+            import tracemalloc
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1][2] = max(stack[-1][2], peak)
+            tracemalloc.reset_peak()
+            frame[3] = current
+        stack.append(frame)
+        frame[0] = time.perf_counter_ns()
+        return frame
+
+    def stop(self, frame, name, category):
+        end = time.perf_counter_ns()
+        stack = self._stack()
+        stack.pop()
+        duration = end - frame[0]
+        peak = None
+        if self.memory:
+            import tracemalloc
+            peak = max(frame[2], tracemalloc.get_traced_memory()[1])
+            if stack:
+                stack[-1][2] = max(stack[-1][2], peak)
+            peak -= frame[3]
+        if stack:
+            stack[-1][1] += duration
+        with self._lock:
+            s = self.stats.get((name, category))
+            if s is None:
+                s = self.stats[(name, category)] = [0, 0, 0, 0, 0]
+            s[0] += 1
+            s[1] += duration
+            s[2] += duration - frame[1]
+            s[3] = max(s[3], duration)
+            if peak is not None:
+                s[4] = max(s[4], peak)
+            if len(self.events) < MAX_EVENTS:
+                self.events.append((name, category, frame[0], duration, threading.get_ident(), peak))
+            else:
+                self.dropped += 1
+
+    def summary(self):
+        """
+        Returns the text summary: calls, total, self, mean and max time (and peak memory) of every timed function.
+        """
+        wall = (time.perf_counter_ns() - self.origin) / 1e9
+        calls = sum(s[0] for s in self.stats.values())
+        lines = ['Profile: {0:.3f} s wall since enabled, {1} timed calls{2}'.format(
+            wall, calls, ', {0} not traced'.format(self.dropped) if self.dropped else '')]
+        lines.append('{0:>9} {1:>11} {2:>11} {3:>7} {4:>11} {5:>10} {6:>9}  {7}'.format(
+            'calls', 'total ms', 'self ms', 'self %', 'mean us', 'max ms', 'peak MB' if self.memory else '',
+            'function'))
+        for (name, category), (n, total, own, longest, peak) in sorted(self.stats.items(), key=lambda s: -s[1][1]):
+            lines.append('{0:9d} {1:11.3f} {2:11.3f} {3:7.1f} {4:11.2f} {5:10.3f} {6:>9}  {7} [{8}]'.format(
+                n, total / 1e6, own / 1e6, own / 1e7 / wall if wall else 0.0, total / n / 1e3, longest / 1e6,
+                '{0:.2f}'.format(peak / 2 ** 20) if self.memory else '', name, category))
+        return '\n'.join(lines)
+
+    def chrome_trace(self):
+        """
+        Returns the calls as a Chrome trace-event document (complete 'X' events, times in µs).
+        """
+        pid = os.getpid()
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': ' '.join(sys.argv) or 'python'}}]
+        for name, category, start, duration, thread, peak in self.events:
+            event = {'name': name, 'cat': category, 'ph': 'X', 'ts': (start - self.origin) / 1e3,
+                     'dur': duration / 1e3, 'pid': pid, 'tid': thread}
+            if peak is not None:
+                event['args'] = {'peak_bytes': peak}
+            events.append(event)
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def _timed(fn, name, category):
+    @functools.wraps(fn)
+    def timed(*args, **kwargs):
+        recorder = _recorder
+        frame = recorder.start()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            recorder.stop(frame, name, category)
+    return timed
+
+
+def _patch(owner, attribute, name, category):
+    original = owner.__dict__.get(attribute)
+    if callable(original):
+        setattr(owner, attribute, _timed(original, name, category))
+        _patched.append((owner, attribute, original))
+
+
+def _patch_module(module):
+    for path, name, category in TARGETS.get(module.__name__, ()):
+        *owners, attribute = path.split('.')
+        owner = module
+        for o in owners:
+            owner = getattr(owner, o, None)
+        if owner is not None:
+            _patch(owner, attribute, name, category)
+
+
+class _ImportHook(object):
+    """
+    Meta path finder timing the imports of the IMPORTS packages and patching
+    the TARGETS modules once they are executed. The first module of a package
+    imported (e.g. PySpice.Spice.Netlist) is timed with everything it imports
+    from its package; the other packages it imports are timed separately.
+    """
+    def __init__(self):
+        # Packages being imported
+        self.importing = set()
+
+    def find_spec(self, name, path=None, target=None):
+        package = name.partition('.')[0]
+        if package not in IMPORTS and name not in TARGETS:
+            return None
+        spec = importlib.machinery.PathFinder.find_spec(name, path, target)
+        if spec is None or not hasattr(spec.loader, 'exec_module'):
+            return None
+        exec_module = spec.loader.exec_module
+
+        def timed_exec_module(module):
+            if package not in IMPORTS or package in self.importing:
+                exec_module(module)
+            else:
+                self.importing.add(package)
+                try:
+                    with span('import ' + name, 'import'):
+                        exec_module(module)
+                finally:
+                    self.importing.discard(package)
+            _patch_module(module)
+        spec.loader.exec_module = timed_exec_module
+        return spec
+
+
+def enable(trace=None, memory=False, at_exit=True):
+    """
+    Starts the instrumentation; returns the Recorder. trace is the path of the
+    Chrome trace written by report(). With at_exit, report() runs at exit.
+    """
+    global _recorder, _trace, _hook, _started_tracemalloc
+    if trace:
+        _trace = trace
+    if _recorder is not None:
+        return _recorder
+    if memory:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracemalloc = True
+    _recorder = Recorder(memory)
+    # Formulas evaluated through the registry (calc.py, the daemon and the service)
+    load = registry.load
+
+    @functools.wraps(load)
+    def timed_load(formula):
+        return _timed(load(formula), 'calc {0}.{1}'.format(formula.command, formula.function), 'calc')
+    registry.load = timed_load
+    _patched.append((registry, 'load', load))
+    for name in TARGETS:
+        if name in sys.modules:
+            _patch_module(sys.modules[name])
+    _hook = _ImportHook()
+    sys.meta_path.insert(0, _hook)
+    if at_exit:
+        atexit.register(report)
+    return _recorder
+
+
+def disable():
+    """
+    Stops the instrumentation and restores the timed functions; returns the Recorder (None if not enabled).
+    """
+    global _recorder, _hook, _started_tracemalloc
+    recorder = _recorder
+    if recorder is None:
+        return None
+    for owner, attribute, original in reversed(_patched):
+        setattr(owner, attribute, original)
+    del _patched[:]
+    if _hook in sys.meta_path:
+        sys.meta_path.remove(_hook)
+    if _started_tracemalloc:
+        import tracemalloc
+        tracemalloc.stop()
+        _started_tracemalloc = False
+    atexit.unregister(report)
+    _recorder = _hook = None
+    return recorder
+
+
+def enabled():
+    return _recorder is not None
+
+
+def span(name, category='user'):
+    """
+    Returns a context manager timing its block as a call of name (a no-op while disabled).
+    """
+    recorder = _recorder
+    if recorder is None:
+        return contextlib.nullcontext()
+    return _span(recorder, name, category)
+
+
+@contextlib.contextmanager
+def _span(recorder, name, category):
+    frame = recorder.start()
+    try:
+        yield
+    finally:
+        recorder.stop(frame, name, category)
+
+
+def summary():
+    return _recorder.summary() if _recorder is not None else ''
+
+
+def report(stream=None):
+    """
+    Prints the summary (to stderr by default) and writes the Chrome trace if a path was given.
+    """
+    if _recorder is None:
+        return
+    print(_recorder.summary(), file=stream or sys.stderr)
+    if _trace:
+        import json
+        with open(_trace, 'w') as f:
+            json.dump(_recorder.chrome_trace(), f)
+        print('Chrome trace written to {0}'.format(_trace), file=stream or sys.stderr)
+
+
+def enable_from_environment():
+    """
+    Enables the instrumentation if $CALC_PROFILE is set.
+    """
+    value = os.environ.get(ENVIRONMENT, '')
+    if value and value != '0':
+        enable(None if value.lower() in ('1', 'true', 'yes') else value,
+               os.environ.get(MEMORY_ENVIRONMENT, '') not in ('', '0'))
+
+
+def add_arguments(parser):
+    group = parser.add_argument_group('profiling')
+    group.add_argument('--profile', nargs='?', const='', metavar='TRACE.json',
+                       help='Print where the time goes at exit; with a path, also write a Chrome trace there')
+    group.add_argument('--profile-memory', action='store_true', help='With --profile, record peak memory (slower)')
+
+
+def start(args):
+    """
+    Enables the instrumentation if the command line (see add_arguments()) asks
+    for it. Once enabled (by either the command line or the environment), the
+    calculator functions of the running script are timed too.
+    """
+    if args.profile is not None or args.profile_memory:
+        enable(args.profile or None, args.profile_memory)
+    if not enabled():
+        return None
+    script = sys.modules.get('__main__')
+    command = os.path.splitext(os.path.basename(getattr(script, '__file__', '') or ''))[0]
+    for name in CALCULATOR_FUNCTIONS:
+        _patch(script, name, 'calc {0}.{1}'.format(command, name), 'calc')
+    return _recorder
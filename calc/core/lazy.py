@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Deferred imports of heavy optional modules (numpy, PySpice).
+
+A LazyModule stands in for a module until one of its attributes is used;
+the module is then imported and the placeholder replaced in the namespace
+it was bound in, so later accesses cost nothing.
+
+Usage example:
+    >>> np = LazyModule('numpy', globals(), 'np')
+    >>> 'numpy' in sys.modules
+    False
+    >>> np.pi
+    3.141592653589793
+"""
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    def __init__(self, name, namespace=None, alias=None):
+        """
+        name is the module to import on first use.
+        If namespace (usually globals()) is given, namespace[alias]
+        is rebound to the imported module.
+        """
+        super(LazyModule, self).__init__(name)
+        self._namespace = namespace
+        self._alias = alias or name
+
+    def load(self):
+        """
+        Imports the module and returns it.
+        """
+        module = importlib.import_module(self.__name__)
+        if self._namespace is not None and self._namespace.get(self._alias) is self:
+            self._namespace[self._alias] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+
+def is_loaded(name):
+    """
+    Returns True if module name has already been imported (by anyone).
+    """
+    return name in sys.modules
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent index of SPICE model libraries.
+
+PySpice's SpiceLibrary walks and parses a whole directory tree every time it
+is created. LibraryIndex records, once, where every top-level .SUBCKT and
+.MODEL of a tree is defined (file, zip member, byte offset, mtime) in a JSON
+file, so later runs find a model with a dict lookup. Models shipped in zip
+archives (e.g. vendor downloads) are indexed in place, without extracting
+the archives.
+
+Usage example (a drop-in for SpiceLibrary):
+    >>> spice_library = LibraryIndex(find_libraries())
+    >>> circuit.include(spice_library['1N4148'])
+    >>> spice_library.lookup('2N2222A')
+    Definition(name='2n2222a', kind='model', path='.../transistor/2N2222A.lib', member=None, offset=581, ...)
+    >>> print(spice_library.read('ATL432A_TRANS'))     # the .SUBCKT ... .ENDS text from the zip
+
+Names are case insensitive, like SPICE. A definition's file is checked
+(one stat) when it is looked up and reindexed if it changed; update()
+rescans the tree and reparses only the files whose mtime or size changed.
+Names not in the index trigger one update() before KeyError is raised.
+
+The index is stored in $CALC_LIB_INDEX or ~/.cache/calcel/libraries.
+"""
+import collections
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+
+VERSION = 1
+# Library files, as in PySpice's SpiceLibrary (plus .sub); '@xyce' files define name@xyce
+EXTENSIONS = ('.spice', '.lib', '.mod', '.sub', '.cir', '.lib@xyce', '.mod@xyce')
+KINDS = ('subckt', 'model')
+
+Definition = collections.namedtuple('Definition', ['name', 'kind', 'path', 'member', 'offset', 'mtime',
+                                                   'encrypted'])
+
+_STATEMENT = re.compile(rb'^[ \t]*\.(subckt|model|ends)\b[ \t]*([^\s]*)', re.IGNORECASE | re.MULTILINE)
+# Vendor encrypted bodies (PSpice), unusable by ngspice
+_ENCRYPTED = b'$CDNENCSTART'
+
+
+def default_directory():
+    return os.environ.get('CALC_LIB_INDEX') or os.path.join(os.path.expanduser('~'), '.cache', 'calcel',
+                                                            'libraries')
+
+
+def _is_library(name):
+    return name.lower().endswith(EXTENSIONS)
+
+
+def scan(data, filename=''):
+    """
+    Returns the (name, kind, offset, encrypted) of the top-level sub-circuits and
+    models defined in data (bytes); definitions nested in a sub-circuit are local to it.
+    """
+    res = []
+    depth = 0
+    suffix = '@xyce' if filename.lower().endswith('@xyce') else ''
+    for match in _STATEMENT.finditer(data):
+        statement = match.group(1).lower()
+        if statement == b'ends':
+            depth = max(depth - 1, 0)
+            continue
+        if depth == 0 and match.group(2):
+            res.append([match.group(2).decode('latin-1') + suffix, statement.decode('ascii'), match.start()])
+        if statement == b'subckt':
+            depth += 1
+    ends = [offset for _, _, offset in res[1:]] + [len(data)]
+    for definition, end in zip(res, ends):
+        definition.append(data.find(_ENCRYPTED, definition[2], end) >= 0)
+    return res
+
+
+def definition_text(data, kind):
+    """
+    Returns the text of the definition data (bytes) starts with: up to the
+    matching .ENDS for a sub-circuit, the '+' continuation lines for a model.
+    """
+    lines = data.decode('latin-1').splitlines(True)
+    res = [lines[0]]
+    depth = 1
+    for line in lines[1:]:
+        statement = line.strip().lower()
+        if kind == 'model':
+            if not statement.startswith('+'):
+                break
+        elif statement.startswith('.subckt'):
+            depth += 1
+        elif statement.startswith('.ends'):
+            depth -= 1
+        res.append(line)
+        if kind == 'subckt' and depth == 0:
+            break
+    return ''.join(res)
+
+
+def read_source(path, member=None):
+    """
+    Returns the contents (bytes) of a library file or, with member, of a zip archive member.
+    """
+    if member is None:
+        with open(path, 'rb') as f:
+            return f.read()
+    with zipfile.ZipFile(path) as archive:
+        return archive.read(member)
+
+
+class LibraryIndex(object):
+    def __init__(self, root, directory=None, check=True):
+        """
+        root is the library tree, directory holds the index (default: default_directory()).
+        With check, the file of a looked up definition is checked for changes.
+        The index is built on first use and then only updated.
+        """
+        self.root = os.path.abspath(str(root))
+        self.directory = directory or default_directory()
+        self.check = check
+        self.path = os.path.join(self.directory, hashlib.sha1(self.root.encode('utf8')).hexdigest()[:16] + '.json')
+        # relative path -> {'mtime_ns', 'size', 'members': {member or '': [[name, kind, offset, encrypted], ...]}}
+        self._files = {}
+        self._names = {}
+        try:
+            with open(self.path) as f:
+                index = json.load(f)
+            if index.get('version') == VERSION and index.get('root') == self.root:
+                self._files = index['files']
+        except (OSError, ValueError):
+            pass
+        if self._files:
+            self._build_names()
+        else:
+            self.update()
+
+    def _build_names(self):
+        names = {}
+        for rel in sorted(self._files):
+            info = self._files[rel]
+            path = os.path.join(self.root, rel)
+            for member in sorted(info['members']):
+                for name, kind, offset, encrypted in info['members'][member]:
+                    names.setdefault(name.upper(), []).append(
+                        Definition(name, kind, path, member or None, offset, info['mtime_ns'], encrypted))
+        for definitions in names.values():
+            # Plain text before encrypted, sub-circuits before models (like SpiceLibrary)
+            definitions.sort(key=lambda d: (d.encrypted, KINDS.index(d.kind)))
+        self._names = names
+
+    def _index_file(self, path):
+        """
+        Returns the members dict of a library file or zip archive.
+        """
+        if path.lower().endswith('.zip'):
+            members = {}
+            try:
+                with zipfile.ZipFile(path) as archive:
+                    for info in archive.infolist():
+                        if not info.is_dir() and _is_library(info.filename):
+                            members[info.filename] = scan(archive.read(info), info.filename)
+            except (zipfile.BadZipFile, OSError):
+                pass
+            return members
+        with open(path, 'rb') as f:
+            return {'': scan(f.read(), path)}
+
+    def _walk(self):
+        for directory, dirs, files in os.walk(self.root):
+            dirs.sort()
+            for name in sorted(files):
+                if _is_library(name) or name.lower().endswith('.zip'):
+                    yield os.path.join(directory, name)
+
+    def _refresh(self, rel, st=None):
+        """
+        Reindexes one file if its mtime or size changed. Returns True if the index changed.
+        """
+        path = os.path.join(self.root, rel)
+        if st is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return self._files.pop(rel, None) is not None
+        known = self._files.get(rel)
+        if known is not None and (known['mtime_ns'], known['size']) == (st.st_mtime_ns, st.st_size):
+            return False
+        self._files[rel] = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size, 'members': self._index_file(path)}
+        return True
+
+    def update(self):
+        """
+        Rescans the tree, reparsing new and changed files. Returns the number of changed files.
+        """
+        seen = set()
+        changed = 0
+        for path in self._walk():
+            rel = os.path.relpath(path, self.root)
+            seen.add(rel)
+            try:
+                changed += self._refresh(rel, os.stat(path))
+            except OSError:
+                continue
+        for rel in set(self._files) - seen:
+            del self._files[rel]
+            changed += 1
+        if changed or not os.path.exists(self.path):
+            self._build_names()
+            self.save()
+        return changed
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'version': VERSION, 'root': self.root, 'files': self._files}, f)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def definitions(self, name):
+        """
+        Returns every definition of name, the preferred one first, or an empty list.
+        """
+        definitions = self._names.get(name.upper(), [])
+        if self.check and definitions:
+            rels = set(os.path.relpath(d.path, self.root) for d in definitions)
+            if sum(self._refresh(rel) for rel in rels):
+                self._build_names()
+                self.save()
+                definitions = self._names.get(name.upper(), [])
+        return definitions
+
+    def lookup(self, name):
+        """
+        Returns the Definition of name. Raises KeyError if it is not in the tree.
+        """
+        definitions = self.definitions(name)
+        if not definitions and self.check and self.update():
+            definitions = self.definitions(name)
+        if not definitions:
+            raise KeyError(name)
+        return definitions[0]
+
+    def __getitem__(self, name):
+        """
+        Returns the path of the file defining name, to be included in a circuit.
+        Zip members are extracted (once per archive version) next to the index.
+        """
+        definition = self.lookup(name)
+        if definition.member is None:
+            return definition.path
+        key = hashlib.sha1('{0}\0{1}\0{2}'.format(definition.path, definition.mtime, definition.member)
+                           .encode('utf8')).hexdigest()[:16]
+        path = os.path.join(self.directory, 'members', key, os.path.basename(definition.member))
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(path))
+            try:
+                with os.fdopen(fd, 'wb') as f, zipfile.ZipFile(definition.path) as archive, \
+                        archive.open(definition.member) as member:
+                    shutil.copyfileobj(member, f)
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        return path
+
+    def __contains__(self, name):
+        return name.upper() in self._names
+
+    def __len__(self):
+        return len(self._names)
+
+    @property
+    def names(self):
+        return sorted(definitions[0].name for definitions in self._names.values())
+
+    def read(self, name):
+        """
+        Returns the text of the definition of name, read from its offset.
+        """
+        definition = self.lookup(name)
+        if definition.member is None:
+            with open(definition.path, 'rb') as f:
+                f.seek(definition.offset)
+                data = f.read()
+        else:
+            data = read_source(definition.path, definition.member)[definition.offset:]
+        return definition_text(data, definition.kind)
+
+    def sources(self):
+        """
+        Returns the (path, member, mtime_ns, size) of every library file and zip
+        member of the tree (member None for plain files), in path order.
+        """
+        return [(os.path.join(self.root, rel), member or None, info['mtime_ns'], info['size'])
+                for rel, info in sorted(self._files.items()) for member in sorted(info['members'])]
+
+    def search(self, pattern):
+        """
+        Returns {name: Definition} of the names matching the regular expression pattern.
+        """
+        return {definitions[0].name: definitions[0] for definitions in self._names.values()
+                if re.search(pattern, definitions[0].name)}
@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""
+Parameters of the SPICE models of a library tree, without a simulator.
+
+parse() reads the .MODEL and .SUBCKT cards of a library file (comments
+dropped, '+' continuation lines joined, numbers converted by
+units.parse_spice()) into Model and Subckt records. ModelStore parses every
+library file and zip member of a tree (see libindex.LibraryIndex) once and
+keeps the parameters in a binary cache next to the library index: an .npz
+file holding one row of values per card, which loads in milliseconds and is
+rebuilt when a library file changes.
+
+Usage example:
+    >>> store = ModelStore(find_libraries())
+    >>> store.model('BAV21').params['IKF']
+    0.01923
+    >>> models, values = store.table(['IS', 'N', 'RS', 'BV'], type='D')    # every diode, nan where not given
+    >>> models[0].name, models[0].subckt, values[0]
+    ('1N4148', '1N4148', array([4.352e-09, 1.906e+00, 6.458e-01, 1.100e+02]))
+    >>> diode.model(**store.parameters('1N4148', diode.DiodeModel._fields))
+    DiodeModel(IS=4.352e-09, N=1.906, RS=0.6458, BV=110.0, IBV=0.0001, XTI=3.0, EG=1.11, TNOM=27.0)
+
+Names and parameters are case insensitive, like SPICE; parameters are stored
+upper case. Models defined inside a sub-circuit are local to it
+(Model.subckt names it); lookups prefer top-level definitions. Values that
+are not numbers (e.g. {expressions}) are kept as strings.
+
+The cache is stored with the library index ($CALC_LIB_INDEX or ~/.cache/calcel/libraries).
+"""
+import collections
+import hashlib
+import json
+import os
+import re
+import tempfile
+import zipfile
+import numpy as np
+from . import libindex
+from . import units
+
+VERSION = 1
+
+# type: SPICE model type, e.g. 'D', 'NPN', 'NMOS'; subckt: the sub-circuit the model is local to, or None
+Model = collections.namedtuple('Model', ['name', 'type', 'params', 'subckt', 'path', 'member'])
+# models: names of the models local to the sub-circuit
+Subckt = collections.namedtuple('Subckt', ['name', 'nodes', 'params', 'models', 'path', 'member'])
+
+# Inline comments: ';' anywhere, '$' after white space (ngspice)
+_COMMENT = re.compile(r';.*|(?:^|\s)\$.*')
+_PARAM = re.compile(r'([^\s()=,]+)\s*=\s*(\{[^}]*\}|\'[^\']*\'|[^\s()=,]+)')
+
+
+def statements(text):
+    """
+    Returns the statements of a netlist text: comment lines and inline comments
+    dropped, '+' continuation lines joined to the statement they continue.
+    """
+    res = []
+    for line in text.splitlines():
+        line = _COMMENT.sub('', line).strip()
+        if not line or line.startswith('*'):
+            continue
+        if line.startswith('+'):
+            if res:
+                res[-1] += ' ' + line[1:]
+            continue
+        res.append(line)
+    return res
+
+
+def parameters(text):
+    """
+    Returns ({NAME: value}, rest) of the name=value pairs in text and the text
+    left without them. Values are floats, or strings if they are not SPICE numbers.
+    """
+    res = {}
+    for name, value in _PARAM.findall(text):
+        try:
+            value = units.parse_spice(value)[0]
+        except ValueError:
+            pass
+        res[name.upper()] = value
+    return res, _PARAM.sub(' ', text)
+
+
+def parse(text, path=None, member=None):
+    """
+    Returns the (models, subckts) lists of Model and Subckt records defined in
+    text, a library file's contents, in file order.
+    """
+    # Top-level names of '@xyce' files are name@xyce (see libindex.scan())
+    suffix = '@xyce' if (member or path or '').lower().endswith('@xyce') else ''
+    models, subckts = [], []
+    # Enclosing sub-circuits: [name, nodes, params, local models]
+    stack = []
+    for statement in statements(text):
+        keyword = statement.split(None, 1)[0].lower()
+        if keyword == '.ends':
+            if stack:
+                name, nodes, params, local = stack.pop()
+                subckts.append(Subckt(name, nodes, params, tuple(local), path, member))
+        elif keyword == '.model':
+            params, rest = parameters(statement)
+            words = rest.replace('(', ' ').replace(')', ' ').split()
+            if len(words) < 3:
+                continue
+            name = words[1] if stack else words[1] + suffix
+            models.append(Model(name, words[2].upper(), params, stack[-1][0] if stack else None, path, member))
+            if stack:
+                stack[-1][3].append(name)
+        elif keyword == '.subckt':
+            params, rest = parameters(statement)
+            words = [w for w in rest.split() if w.lower() != 'params:']
+            if len(words) < 2:
+                continue
+            stack.append([words[1] if stack else words[1] + suffix, tuple(words[2:]), params, []])
+    return models, subckts
+
+
+def _index_dtype(n):
+    """
+    Smallest unsigned integer dtype indexing n items (uint16 or uint32).
+    """
+    return np.uint16 if n <= 1 << 16 else np.uint32
+
+
+class ModelStore(object):
+    def __init__(self, root, directory=None):
+        """
+        root is the library tree, directory holds the library index and the cache
+        (default: libindex.default_directory()).
+        """
+        self.index = libindex.LibraryIndex(root, directory)
+        self.index.update()
+        sources = self.index.sources()
+        signature = hashlib.sha1(json.dumps([VERSION] + sources).encode('utf8')).hexdigest()
+        self.path = os.path.splitext(self.index.path)[0] + '.models.npz'
+        if not self._load(signature):
+            self._build(sources)
+            self._save(signature)
+        self._index()
+
+    def _load(self, signature):
+        try:
+            with np.load(self.path, allow_pickle=False) as f:
+                if str(f['signature']) != signature:
+                    return False
+                stored = dict((k, f[k]) for k in f.files)
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            # Missing, truncated or foreign cache: rebuilt
+            return False
+        # Dense values from the stored (row, column, value) triplets, paths from their indices
+        values = np.full((len(stored['names']), len(stored['columns'])), np.nan)
+        values[stored['rows'], stored['cols']] = stored['data']
+        self._arrays = dict((k, stored[k]) for k in ('kinds', 'names', 'types', 'subckts', 'nodes', 'columns'))
+        self._arrays.update(paths=stored['paths'][stored['path_of']], members=stored['members'][stored['member_of']],
+                            values=values)
+        self._strings = json.loads(str(stored['strings']))
+        return True
+
+    def _build(self, sources):
+        cards = []
+        for path, member, _, _ in sources:
+            text = libindex.read_source(path, member).decode('latin-1')
+            models, subckts = parse(text, path, member)
+            cards += [('model', m.name, m.type, m.subckt or '', '', m.params, path, member or '') for m in models]
+            cards += [('subckt', s.name, '', '', ' '.join(s.nodes), s.params, path, member or '') for s in subckts]
+        columns = sorted(set(p for card in cards for p in card[5]))
+        position = dict((p, i) for i, p in enumerate(columns))
+        values = np.full((len(cards), len(columns)), np.nan)
+        # row -> {parameter: string value}
+        self._strings = {}
+        for row, card in enumerate(cards):
+            for p, v in card[5].items():
+                if isinstance(v, str):
+                    self._strings.setdefault(str(row), {})[p] = v
+                else:
+                    values[row, position[p]] = v
+        fields = ['kinds', 'names', 'types', 'subckts', 'nodes', None, 'paths', 'members']
+        self._arrays = dict((field, np.array([card[i] for card in cards], dtype=str))
+                            for i, field in enumerate(fields) if field)
+        self._arrays.update(columns=np.array(columns, dtype=str), values=values)
+
+    def _save(self, signature):
+        """
+        Writes the cache: the values as (row, column, value) triplets of the
+        parameters given, the paths and zip members as indices into their unique values.
+        """
+        a = self._arrays
+        rows, cols = np.nonzero(~np.isnan(a['values']))
+        paths, path_of = np.unique(a['paths'], return_inverse=True)
+        members, member_of = np.unique(a['members'], return_inverse=True)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(self.path))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, signature=np.array(signature), strings=np.array(json.dumps(self._strings)),
+                         kinds=a['kinds'], names=a['names'], types=a['types'], subckts=a['subckts'],
+                         nodes=a['nodes'], columns=a['columns'], rows=rows.astype(np.uint32),
+                         cols=cols.astype(_index_dtype(len(a['columns']))), data=a['values'][rows, cols],
+                         paths=paths, path_of=path_of.astype(_index_dtype(len(paths))), members=members,
+                         member_of=member_of.astype(_index_dtype(len(members))))
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _index(self):
+        a = self._arrays
+        self._columns = dict((p, i) for i, p in enumerate(a['columns'].tolist()))
+        # Values with a last nan column, which parameters no card gives select
+        self._padded = np.hstack([a['values'], np.full((len(a['values']), 1), np.nan)])
+        # (kind, NAME) -> rows, top-level definitions first
+        self._rows = {}
+        for row, (kind, name, subckt) in enumerate(zip(a['kinds'].tolist(), a['names'].tolist(),
+                                                       a['subckts'].tolist())):
+            self._rows.setdefault((kind, name.upper()), []).append((bool(subckt), row))
+        for key, rows in self._rows.items():
+            self._rows[key] = [row for _, row in sorted(rows)]
+
+    def _params(self, row):
+        values = self._arrays['values'][row]
+        given = np.flatnonzero(~np.isnan(values))
+        res = dict(zip(self._arrays['columns'][given].tolist(), values[given].tolist()))
+        res.update(self._strings.get(str(row), {}))
+        return res
+
+    def _record(self, row):
+        a = self._arrays
+        path, member = str(a['paths'][row]), str(a['members'][row]) or None
+        if a['kinds'][row] == 'model':
+            return Model(str(a['names'][row]), str(a['types'][row]), self._params(row),
+                         str(a['subckts'][row]) or None, path, member)
+        name = str(a['names'][row])
+        local = [str(m) for m, s, p, mb in zip(a['names'], a['subckts'], a['paths'], a['members'])
+                 if s == name and p == path and mb == (member or '')]
+        return Subckt(name, tuple(str(a['nodes'][row]).split()), self._params(row), tuple(local), path, member)
+
+    def models(self, name):
+        """
+        Returns every Model named name, top-level definitions first, or an empty list.
+        """
+        return [self._record(row) for row in self._rows.get(('model', name.upper()), [])]
+
+    def model(self, name):
+        """
+        Returns the Model named name. Raises KeyError if it is not in the tree.
+        """
+        rows = self._rows.get(('model', name.upper()))
+        if not rows:
+            raise KeyError(name)
+        return self._record(rows[0])
+
+    def subckt(self, name):
+        """
+        Returns the Subckt named name. Raises KeyError if it is not in the tree.
+        """
+        rows = self._rows.get(('subckt', name.upper()))
+        if not rows:
+            raise KeyError(name)
+        return self._record(rows[0])
+
+    def parameters(self, name, fields):
+        """
+        Returns {field: value} of the fields (e.g. diode.DiodeModel._fields) the model name gives.
+        """
+        params = self.model(name).params
+        return dict((f, params[f.upper()]) for f in fields if f.upper() in params)
+
+    def table(self, params, names=None, type=None):
+        """
+        Returns (models, values): the Model records of names (default: every
+        model, or those of type, e.g. 'D'; one per name and enclosing
+        sub-circuit) and the float array of their params, one row per model, nan
+        where a model does not give a parameter.
+        """
+        a = self._arrays
+        if names is not None:
+            rows = [self._rows[('model', n.upper())][0] for n in names if ('model', n.upper()) in self._rows]
+            if len(rows) < len(names):
+                raise KeyError(', '.join(n for n in names if ('model', n.upper()) not in self._rows))
+        else:
+            seen = set()
+            rows = []
+            for row in np.flatnonzero(a['kinds'] == 'model').tolist():
+                key = (str(a['names'][row]).upper(), str(a['subckts'][row]).upper())
+                if (type is None or a['types'][row] == type.upper()) and key not in seen:
+                    seen.add(key)
+                    rows.append(row)
+        columns = [self._columns.get(p.upper(), len(self._columns)) for p in params]
+        values = self._padded[np.array(rows, dtype=np.intp)[:, None], np.array(columns, dtype=np.intp)]
+        return [self._record(row) for row in rows], values
+
+    @property
+    def names(self):
+        """
+        Sorted names of the top-level models and sub-circuits.
+        """
+        return sorted(set(str(n) for n, s in zip(self._arrays['names'], self._arrays['subckts']) if not s))
+
+    def __contains__(self, name):
+        return ('model', name.upper()) in self._rows or ('subckt', name.upper()) in self._rows
+
+    def __len__(self):
+        return len(self._arrays['names'])
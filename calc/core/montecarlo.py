@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Monte Carlo tolerance analysis of the calculator formulas.
+
+Component values are drawn around their nominal value from a uniform or a
+normal distribution (the tolerance is then 3 sigma), optionally shifted by
+a temperature coefficient at a random board temperature. The formula is
+evaluated on whole arrays of samples, chunk by chunk, so memory use does
+not depend on the number of samples. Every output is summarized by its
+mean, standard deviation, percentiles and histogram, and the yield is the
+fraction of samples whose outputs are all within the spec window.
+
+Usage example:
+    >>> res = run([component(10, 'V'), component(4700, 'Ω', 0.01), component(1200, 'Ω', 0.01, NORMAL)],
+    ...           samples=10**7, spec={'V': (2.0, 2.1)}, temperature=(-40, 85), seed=1)
+    >>> res.outputs[0].percentile([1, 50, 99])
+    array([2.017..., 2.034..., 2.051...])
+    >>> res.yield_
+    0.9987...
+    >>> print(res.summary())
+
+Percentiles are interpolated from a histogram of FINE_BINS bins spanning the
+range of the first chunk (widened by half of it on both sides); samples
+outside of it are counted and bounded by the exact minimum and maximum.
+"""
+import collections
+import numpy as np
+from . import registry
+from .units import AllUnits as U
+
+UNIFORM = 'uniform'
+NORMAL = 'normal'
+DISTRIBUTIONS = (UNIFORM, NORMAL)
+# Tolerance of normally distributed values in standard deviations
+SIGMAS = 3.0
+# Reference temperature of the nominal values [°C]
+NOMINAL_TEMPERATURE = 25.0
+CHUNK_SIZE = 1 << 20
+FINE_BINS = 1 << 16
+PERCENTILES = (0.1, 1, 50, 99, 99.9)
+
+# value and unit as for the calculators, tolerance relative (0.01 is 1%), tempco in ppm/°C
+Component = collections.namedtuple('Component', ['value', 'unit', 'tolerance', 'distribution', 'tempco'])
+
+
+def component(value, unit, tolerance=0.0, distribution=UNIFORM, tempco=0.0):
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError('Unknown distribution {0}, expected one of: {1}'.format(
+            distribution, ', '.join(DISTRIBUTIONS)))
+    value, unit = U.convert_to_canonical((value, unit))
+    return Component(value, unit, tolerance, distribution, tempco)
+
+
+def sample(c, n, rng, temperature=None):
+    """
+    Returns n values of component c (or its nominal value if it has no tolerance
+    nor temperature dependence). temperature is an array of n temperatures or None.
+    """
+    factor = 1.0
+    if c.tolerance:
+        if c.distribution == NORMAL:
+            factor = rng.normal(1.0, c.tolerance / SIGMAS, n)
+        else:
+            factor = rng.uniform(1.0 - c.tolerance, 1.0 + c.tolerance, n)
+    if c.tempco and temperature is not None:
+        factor = factor * (1.0 + c.tempco * 1e-6 * (temperature - NOMINAL_TEMPERATURE))
+    return c.value * factor
+
+
+class Distribution(object):
+    """
+    Streaming summary of the samples of one output.
+    """
+    def __init__(self, nominal, unit, bins=50):
+        """
+        bins is the default number of bins of histogram().
+        """
+        self.nominal = nominal
+        self.unit = unit
+        self.bins = bins
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.underflow = 0
+        self.overflow = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._counts = None
+        self._low = self._width = None
+
+    def add(self, values):
+        values = np.ravel(values)
+        n = values.size
+        if not n:
+            return
+        if self._counts is None:
+            low, high = values.min(), values.max()
+            span = (high - low) or abs(high) * 1e-9 or 1e-12
+            self._low = low - span / 2
+            self._width = 2 * span / FINE_BINS
+            self._counts = np.zeros(FINE_BINS, dtype=np.int64)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        # Chan et al. parallel update of the mean and the sum of squared deviations
+        mean = values.mean()
+        m2 = np.square(values - mean).sum()
+        delta = mean - self._mean
+        total = self.count + n
+        self._mean += delta * n / total
+        self._m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        index = np.floor((values - self._low) / self._width)
+        under = index < 0
+        over = index >= self._counts.size
+        self.underflow += int(np.count_nonzero(under))
+        self.overflow += int(np.count_nonzero(over))
+        inside = index[~(under | over)].astype(np.intp)
+        self._counts += np.bincount(inside, minlength=self._counts.size)
+
+    @property
+    def mean(self):
+        return self._mean
+
+    @property
+    def std(self):
+        return np.sqrt(self._m2 / self.count) if self.count else np.nan
+
+    def percentile(self, q):
+        """
+        Returns the q-th percentile(s), q in [0, 100].
+        """
+        q = np.asarray(q, dtype=np.float64)
+        target = q / 100.0 * self.count
+        cdf = self.underflow + np.cumsum(self._counts)
+        i = np.clip(np.searchsorted(cdf, target, 'left'), 0, cdf.size - 1)
+        before = np.where(i > 0, cdf[i - 1], self.underflow)
+        in_bin = self._counts[i]
+        fraction = np.where(in_bin > 0, (target - before) / np.maximum(in_bin, 1), 0.0)
+        res = self._low + (i + np.clip(fraction, 0.0, 1.0)) * self._width
+        return np.clip(res, self.min, self.max)
+
+    def histogram(self, bins=None):
+        """
+        Returns (counts, edges) of at most bins (default: self.bins) equal bins
+        spanning the samples; samples out of the fine histogram are counted in
+        underflow and overflow instead.
+        """
+        occupied = np.flatnonzero(self._counts)
+        if not occupied.size:
+            return np.zeros(0, dtype=np.int64), np.array([self._low or 0.0])
+        first, last = occupied[0], occupied[-1] + 1
+        group = -(-(last - first) // (bins or self.bins))
+        starts = np.arange(first, last, group)
+        counts = np.add.reduceat(self._counts[:starts[-1] + group], starts)
+        edges = self._low + np.append(starts, starts[-1] + group) * self._width
+        return counts, edges
+
+
+class MonteCarloResult(object):
+    """
+    Output distributions of a Monte Carlo run; passed is the number of samples within spec.
+    """
+    def __init__(self, formula, samples, outputs, passed, spec):
+        self.formula = formula
+        self.samples = samples
+        self.outputs = outputs
+        self.passed = passed
+        self.spec = spec
+
+    @property
+    def yield_(self):
+        return self.passed / self.samples if self.samples else np.nan
+
+    def summary(self, percentiles=PERCENTILES, histogram=False, width=50):
+        from . import units
+        lines = ['{0}: {1} samples'.format(self.formula.command, self.samples)]
+        for d in self.outputs:
+            lines.append('{0}: nominal {1}, mean {2}, std {3} ({4:.3g}%)'.format(
+                d.unit, units.format_simple(d.nominal, d.unit), units.format_simple(d.mean, d.unit),
+                units.format_simple(d.std, d.unit), 100 * d.std / abs(d.nominal) if d.nominal else np.nan))
+            for q, v in zip(percentiles, d.percentile(percentiles)):
+                lines.append('  {0:>6}%: {1:<12} {2:+.3f}%'.format(
+                    q, units.format_simple(v, d.unit), 100 * (v / d.nominal - 1) if d.nominal else np.nan))
+            if histogram:
+                counts, edges = d.histogram()
+                scale = width / max(counts.max(), 1)
+                for c, e in zip(counts, edges):
+                    lines.append('  {0:>12} {1:+8.3f}% {2}'.format(
+                        units.format_simple(e, d.unit), 100 * (e / d.nominal - 1) if d.nominal else np.nan,
+                        '#' * int(round(c * scale))))
+        if self.spec:
+            lines.append('yield: {0:.4%} ({1} of {2} samples within spec)'.format(
+                self.yield_, self.passed, self.samples))
+        return '\n'.join(lines)
+
+
+def run(components, samples=10**6, command=None, spec=None, temperature=None, bins=50, chunk_size=CHUNK_SIZE,
+        seed=None):
+    """
+    Evaluates the formula matching the units of components (a sequence of
+    Component) on samples random component sets.
+
+    spec maps output units to (low, high) windows (None for no bound);
+    temperature is a (low, high) range of uniformly distributed temperatures
+    [°C] or a fixed temperature, applied to the components' tempco.
+
+    Returns a MonteCarloResult.
+    """
+    formula = registry.find([c.unit for c in components], command)
+    components = registry.order(formula, components)
+    function = registry.load(formula)
+    nominal = function(*[(c.value, c.unit) for c in components])
+    nominal = [nominal] if len(formula.outputs) == 1 else list(nominal)
+    outputs = [Distribution(v, u, bins) for v, u in nominal]
+    spec = {U.convert_to_canonical((0, u))[1]: window for u, window in (spec or {}).items()}
+    for u in spec:
+        if u not in formula.outputs:
+            raise ValueError('{0} has no output in {1}'.format(formula.command, u))
+    rng = np.random.default_rng(seed)
+    passed = 0
+    for begin in range(0, samples, chunk_size):
+        n = min(chunk_size, samples - begin)
+        t = None
+        if temperature is not None:
+            t = rng.uniform(temperature[0], temperature[1], n) if np.ndim(temperature) else temperature
+        res = function(*[(sample(c, n, rng, t), c.unit) for c in components])
+        res = [res] if len(formula.outputs) == 1 else res
+        ok = np.ones(n, dtype=bool)
+        for d, (values, u) in zip(outputs, res):
+            values = np.broadcast_to(values, (n,))
+            d.add(values)
+            low, high = spec.get(u, (None, None))
+            if low is not None:
+                ok &= values >= low
+            if high is not None:
+                ok &= values <= high
+        passed += int(np.count_nonzero(ok))
+    return MonteCarloResult(formula, samples, outputs, passed, spec)
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Steady state of capacitor-input rectifiers without transient simulation.
+
+A sine source of amplitude V_p charges the filter capacitor C through one
+(half-wave) or two (full-wave bridge) diodes of constant forward drop, n V_d
+in total; the load R discharges it. With the phase θ of the source:
+
+- while the diodes conduct, the output is V_p sin θ - n V_d;
+- they stop when the sine falls faster than the capacitor discharges into
+  the load, at θ_off = π - atan(ωRC) - asin(n V_d / (V_p sqrt(1 + (ωRC)^2)));
+- the capacitor then decays as V(θ_off) exp(-(θ - θ_off) / ωRC);
+- the diodes conduct again at θ_on, one rectified period P (2π half-wave,
+  π full-wave) later, where the decay meets V_p sin θ - n V_d. θ_on is the
+  only equation without a closed form; it is solved by Newton's method from
+  π/2, which converges monotonically as the equation is concave and
+  increasing over [0, π/2], vectorized over whole design grids.
+
+Ripple, DC (mean) output, conduction angle and peak diode current follow in
+closed form. Diode and source resistances are neglected, so the peak current
+is an upper bound (see benchmarks/validate_rectifier.py for the comparison
+with PySpice transients of the playground circuits).
+
+Usage example:
+    >>> res = steady_state(HALF_WAVE, 10, 50, 100, np.array([100e-6, 1e-3]))
+    >>> res.ripple, res.v_dc
+    (array([7.307..., 1.544...]), array([5.255..., 8.530...]))
+    >>> min_capacitance(HALF_WAVE, 0.1, 10, 50, 100)                # smallest C for 100 mV of ripple
+    0.01808...
+    >>> min_capacitance(HALF_WAVE, 0.1, 10, 50, 100, series='E6')
+    0.022
+"""
+import collections
+import numpy as np
+from . import eseries
+from .units import AllUnits as U
+
+HALF_WAVE = 'half'
+BRIDGE = 'bridge'
+# Diodes conducting in series and rectified period (in source phase) of each kind
+KINDS = {HALF_WAVE: (1, 2 * np.pi), BRIDGE: (2, np.pi)}
+DIODE_DROP = 0.7
+BISECTION_STEPS = 60
+NEWTON_TOLERANCE = 1e-13
+NEWTON_STEPS = 50
+
+# Voltages [V], conduction angle [°] of each current pulse, diode currents [A]
+Rectifier = collections.namedtuple('Rectifier', ['ripple', 'v_dc', 'v_max', 'v_min', 'conduction', 'peak_current',
+                                                 'average_current'])
+
+
+def _kind(kind):
+    if kind not in KINDS:
+        raise ValueError('Unknown rectifier {0}, expected one of: {1}'.format(kind, ', '.join(KINDS)))
+    return KINDS[kind]
+
+
+def _bisect(fn, low, high, steps=BISECTION_STEPS):
+    """
+    Returns the roots of the increasing fn within the brackets [low, high] (arrays).
+    """
+    for _ in range(steps):
+        middle = (low + high) / 2
+        below = fn(middle) < 0
+        low = np.where(below, middle, low)
+        high = np.where(below, high, middle)
+    return (low + high) / 2
+
+
+def _conduction_start(amplitude, drop, v_off, off, period, tau):
+    """
+    Returns θ_on in [0, π/2], the root of V_p sin θ - n V_d - V(θ_off) exp(-(θ + P - θ_off) / ωRC).
+    """
+    a = v_off * np.exp(-(period - off) / tau)
+    theta = np.full(np.shape(tau), np.pi / 2)
+    for _ in range(NEWTON_STEPS):
+        decay = a * np.exp(-theta / tau)
+        step = (amplitude * np.sin(theta) - drop - decay) / (amplitude * np.cos(theta) + decay / tau)
+        theta = np.maximum(theta - step, 0.0)
+        if not np.nanmax(np.abs(step), initial=0.0) > NEWTON_TOLERANCE:
+            break
+    return theta
+
+
+def steady_state(kind, amplitude, frequency, load, capacitance, drop=DIODE_DROP):
+    """
+    Returns the Rectifier steady state of kind (HALF_WAVE or BRIDGE) for the
+    source amplitude [V] and frequency [Hz], the load [Ω], the filter
+    capacitance [F] and the drop [V] of one diode. Arguments broadcast.
+    """
+    diodes, period = _kind(kind)
+    amplitude, frequency, load, capacitance, drop = np.broadcast_arrays(
+        *[np.asarray(v, dtype=np.float64) for v in (amplitude, frequency, load, capacitance, drop)])
+    drop = diodes * drop
+    # No output where the source does not overcome the diodes
+    conducts = amplitude > drop
+    amplitude = np.where(conducts, amplitude, 1.0)
+    drop = np.where(conducts, drop, 0.0)
+    omega_c = 2 * np.pi * frequency * capacitance
+    tau = omega_c * load
+    filtered = tau > 0
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        off = np.pi - np.arctan(tau) - np.arcsin(drop / (amplitude * np.sqrt(1 + np.square(tau))))
+        v_off = amplitude * np.sin(off) - drop
+        on = np.where(filtered, _conduction_start(amplitude, drop, v_off, off, period, np.where(filtered, tau, 1.0)),
+                      np.arcsin(drop / amplitude))
+        v_max = amplitude - drop
+        v_min = np.where(filtered, amplitude * np.sin(on) - drop, 0.0)
+        # Mean over a period: the sine while conducting, the exponential decay after
+        decay = np.where(filtered, tau * (v_off - v_min), 0.0)
+        v_dc = (amplitude * (np.cos(on) - np.cos(off)) - drop * (off - on) + decay) / period
+        # i(θ) = V_p (ωC cos θ + sin θ / R) - n V_d / R peaks at θ = atan(1 / ωRC), or at θ_on if later
+        peak = np.maximum(on, np.arctan2(1.0, tau))
+        peak_current = amplitude * (omega_c * np.cos(peak) + np.sin(peak) / load) - drop / load
+    res = [v_max - v_min, v_dc, v_max, v_min, np.degrees(off - on), peak_current, v_dc / load]
+    return Rectifier(*[np.where(conducts, v, 0.0) for v in res])
+
+
+def min_capacitance(kind, ripple, amplitude, frequency, load, drop=DIODE_DROP, series=None):
+    """
+    Returns the smallest filter capacitance [F] keeping the ripple [V] at or
+    below the target; with series (e.g. 'E6'), the smallest value of the
+    series that does. Arguments broadcast; 0 where no capacitor is needed, nan
+    where the target is not reachable.
+    """
+    ripple, amplitude, frequency, load, drop = np.broadcast_arrays(
+        *[np.asarray(v, dtype=np.float64) for v in (ripple, amplitude, frequency, load, drop)])
+    # The ripple falls with C; bracket in log C between 1 pF and 100 F
+    log_c = _bisect(lambda c: ripple - steady_state(kind, amplitude, frequency, load, np.exp(c), drop).ripple,
+                    np.full(ripple.shape, np.log(1e-12)), np.full(ripple.shape, np.log(100.0)))
+    res = np.exp(log_c)
+    reached = steady_state(kind, amplitude, frequency, load, res, drop).ripple <= ripple * (1 + 1e-9)
+    if series is not None:
+        values = eseries.values(series, U.F, (-12, 2))
+        i = np.searchsorted(values, res * (1 - 1e-9))
+        res = np.where(i < values.size, values[np.minimum(i, values.size - 1)], np.nan)
+    res = np.where(reached & (ripple > 0), res, np.nan)
+    res = np.where(steady_state(kind, amplitude, frequency, load, 0.0, drop).ripple <= ripple, 0.0, res)
+    return res[()] if res.ndim == 0 else res
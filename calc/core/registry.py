@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Registry of the calculator formulas.
+
+Every formula declares the command (calculator module) it belongs to, its input
+units and its output units. Formulas are looked up by the canonical unit set of
+the arguments with a single dict access; the calculator module implementing a
+formula is imported only when the formula is evaluated for the first time.
+
+Usage example:
+    >>> evaluate([(0.01, 'A'), (4700.0, 'R')])
+    [(47.0, 'V'), (0.47000000000000003, 'W')]
+"""
+import collections
+import importlib
+from . import units
+from .units import AllUnits as U
+
+Formula = collections.namedtuple('Formula', ['command', 'inputs', 'outputs', 'function', 'labels'])
+
+# function is the name of a callable in the command's module; it receives the
+# arguments in the declared input order and returns (value, unit) or a sequence of them.
+FORMULAS = [
+    Formula('ohm_law', (U.V, U.R), (U.A, U.W), 'play_with_power', ('', 'Power dissipation')),
+    Formula('ohm_law', (U.V, U.A), (U.R, U.W), 'play_with_power', ('', 'Power dissipation')),
+    Formula('ohm_law', (U.A, U.R), (U.V, U.W), 'play_with_power', ('', 'Power dissipation')),
+    Formula('volt_divider', (U.V, U.R, U.R), (U.V,), 'play', ('',)),
+    Formula('lc', (U.H, U.F), (U.Hz,), 'play', ('',)),
+    Formula('lc', (U.H, U.Hz), (U.F,), 'play', ('',)),
+    Formula('lc', (U.F, U.Hz), (U.H,), 'play', ('',)),
+    Formula('c_reactance', (U.F, U.Hz), (U.R,), 'play', ('',)),
+    Formula('c_reactance', (U.F, U.R), (U.Hz,), 'play', ('',)),
+    Formula('c_reactance', (U.R, U.Hz), (U.F,), 'play', ('',)),
+    Formula('l_reactance', (U.H, U.Hz), (U.R,), 'play', ('',)),
+    Formula('l_reactance', (U.H, U.R), (U.Hz,), 'play', ('',)),
+    Formula('l_reactance', (U.R, U.Hz), (U.H,), 'play', ('',)),
+    Formula('dB', ('', ''), ('dB', 'dB'), 'play_db', ('Power ratio    ', 'Amplitude ratio')),
+]
+
+COMMANDS = sorted(set(f.command for f in FORMULAS))
+
+# Key: sorted canonical input units, value: formulas accepting them
+_BY_UNITS = {}
+# Key: (command, sorted canonical input units), value: formula
+_BY_COMMAND = {}
+for _f in FORMULAS:
+    _BY_UNITS.setdefault(tuple(sorted(_f.inputs)), []).append(_f)
+    _BY_COMMAND[(_f.command, tuple(sorted(_f.inputs)))] = _f
+
+# Calculator modules live in the package containing core (or are top-level modules
+# when the scripts are run from the calc directory)
+_PACKAGE = __package__.rpartition('.')[0]
+_functions = {}
+
+
+def find(input_units, command=None):
+    """
+    Returns the formula accepting the given (canonical) units.
+    Raises ValueError if there is none or, without a command, if several
+    calculators accept them.
+    """
+    key = tuple(sorted(input_units))
+    if command is not None:
+        formula = _BY_COMMAND.get((command, key))
+        if formula is None:
+            raise ValueError('{0} does not accept units {1}'.format(command, list(input_units)))
+        return formula
+    formulas = _BY_UNITS.get(key)
+    if not formulas:
+        raise ValueError('No formula accepts units {0}'.format(list(input_units)))
+    if len(formulas) > 1:
+        raise ValueError('Units {0} are ambiguous, choose one of: {1}'.format(
+            list(input_units), ', '.join(f.command for f in formulas)))
+    return formulas[0]
+
+
+def load(formula):
+    """
+    Returns the callable implementing formula, importing its module on first use.
+    """
+    key = (formula.command, formula.function)
+    fn = _functions.get(key)
+    if fn is None:
+        module_name = '{0}.{1}'.format(_PACKAGE, formula.command) if _PACKAGE else formula.command
+        fn = getattr(importlib.import_module(module_name), formula.function)
+        _functions[key] = fn
+    return fn
+
+
+def order(formula, args):
+    """
+    Returns args, (value, canonical unit) pairs, in the declared input order of formula.
+    Arguments sharing a unit keep their relative order (e.g. R1 and R2 of the voltage divider).
+    """
+    ordered = []
+    remaining = list(args)
+    for u in formula.inputs:
+        for i, a in enumerate(remaining):
+            if a[1] == u:
+                ordered.append(remaining.pop(i))
+                break
+    return ordered
+
+
+def evaluate(args, command=None):
+    """
+    Evaluate the formula matching the units of args, a sequence of (value, unit) pairs.
+    Arguments are passed in the declared input order (see order()).
+
+    Returns a list of (value, unit) results.
+    """
+    args = [U.convert_to_canonical(a) for a in args]
+    formula = find([a[1] for a in args], command)
+    res = load(formula)(*order(formula, args))
+    if len(formula.outputs) == 1:
+        res = [res]
+    return [(value, unit) for value, unit in res]
+
+
+def format_results(formula, results):
+    """
+    Returns the human readable lines for the results of formula,
+    prefixed with the formula's labels.
+    """
+    lines = []
+    for (value, unit), label in zip(results, formula.labels):
+        msg = units.format_verbose(value, unit)
+        lines.append('{0}: {1}'.format(label, msg) if label else msg)
+    return lines
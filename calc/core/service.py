@@ -0,0 +1,418 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP/JSON service exposing the units parser and the calculators.
+
+Endpoints (request and response bodies are JSON objects):
+    POST /parse          {"values": ["10k", "4µA"]}
+                         -> {"values": [10000.0, 4e-06], "units": ["", "A"], "errors": []}
+    POST /format         {"values": [1000.0, 0.0047], "unit": "V"}
+                         -> {"strings": ["1.00 kV", "4.70 mV"], "errors": []}
+    POST /calc           {"args": ["10mA", "4k7R"], "command": "ohm_law"}
+    POST /calc/<command> {"args": ["1mH", "1uF"]}
+                         -> {"ok": true, "command": "lc", "results": [[5032.92, "Hz"]]}
+    GET  /stats          request counts, batch sizes and latency percentiles
+
+"command" is only needed when the units are ambiguous (see registry.find()).
+Calculator arguments are strings in any notation understood by units.parse()
+or [number, unit] pairs. Elements that cannot be parsed or formatted are
+reported in "errors" as [index, message] pairs and get null.
+
+Requests of the same kind arriving within a short window (see Service) are
+coalesced and evaluated together: calculator arguments are stacked into
+arrays and the formula is evaluated once for the whole batch, parse and
+format requests are concatenated into one parse_array() / format_array()
+call. When more than max_pending requests are in flight, new requests are
+rejected with 503 until the backlog drains.
+
+The service only uses asyncio streams from the standard library; it speaks
+just enough HTTP/1.1 (Content-Length bodies, keep-alive) for local clients.
+"""
+import asyncio
+import bisect
+import collections
+import json
+import math
+import sys
+import time
+import numpy as np
+from . import registry
+from . import units
+from .units import AllUnits as U
+
+MAX_BODY = 1 << 20
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super(HttpError, self).__init__(message)
+        self.status = status
+
+
+class LatencyStats(object):
+    """
+    Keeps the most recent request latencies of every endpoint.
+    """
+    def __init__(self, maxlen=10000):
+        self.maxlen = maxlen
+        self.samples = {}
+        self.counts = collections.Counter()
+
+    def add(self, endpoint, seconds):
+        samples = self.samples.get(endpoint)
+        if samples is None:
+            samples = self.samples[endpoint] = collections.deque(maxlen=self.maxlen)
+        samples.append(seconds)
+        self.counts[endpoint] += 1
+
+    def summary(self):
+        """
+        Returns {endpoint: {"count", "p50_ms", "p90_ms", "p99_ms", "max_ms"}},
+        percentiles being computed over the most recent requests.
+        """
+        res = {}
+        for endpoint, samples in self.samples.items():
+            p50, p90, p99, pmax = np.percentile(np.fromiter(samples, float), [50, 90, 99, 100]) * 1e3
+            res[endpoint] = {'count': self.counts[endpoint], 'p50_ms': p50, 'p90_ms': p90,
+                             'p99_ms': p99, 'max_ms': pmax}
+        return res
+
+
+class Batcher(object):
+    """
+    Coalesces items submitted under the same key within window seconds
+    (or until max_size items are waiting) into one evaluate(key, items) call,
+    which must return one result per item.
+    """
+    def __init__(self, evaluate, window=0.002, max_size=1024):
+        self.evaluate = evaluate
+        self.window = window
+        self.max_size = max_size
+        self.batches = 0
+        self.items = 0
+        self._pending = {}
+
+    def submit(self, key, item):
+        """
+        Returns a future resolved with the result of item.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = []
+            loop.call_later(self.window, self._flush, key, batch)
+        batch.append((item, future))
+        if len(batch) >= self.max_size:
+            self._flush(key, batch)
+        return future
+
+    def _flush(self, key, batch):
+        if self._pending.get(key) is not batch:
+            # Already flushed because it was full
+            return
+        del self._pending[key]
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = self.evaluate(key, [item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), res in zip(batch, results):
+            if not future.done():
+                future.set_result(res)
+
+
+def _split(flat, offsets):
+    return [flat[begin:end] for begin, end in zip(offsets[:-1], offsets[1:])]
+
+
+def _split_errors(errors, offsets):
+    """
+    Distributes (flat index, message) errors to the items delimited by offsets.
+    """
+    res = [[] for _ in range(len(offsets) - 1)]
+    for index, message in errors:
+        item = bisect.bisect_right(offsets, index) - 1
+        res[item].append([index - offsets[item], message])
+    return res
+
+
+def _offsets(items):
+    offsets = [0]
+    for item in items:
+        offsets.append(offsets[-1] + len(item))
+    return offsets
+
+
+def _nullable(values):
+    return [v if v == v else None for v in values.tolist()]
+
+
+def evaluate_calc(key, items):
+    """
+    Evaluates a batch of calculator requests sharing the formula and argument units.
+    key is (command, units), items are tuples of argument values.
+    """
+    command, arg_units = key
+    n = len(items)
+    args = [(np.array([item[i] for item in items], dtype=np.float64), u) for i, u in enumerate(arg_units)]
+    with np.errstate(all='ignore'):
+        results = registry.evaluate(args, command)
+    values = [np.broadcast_to(np.asarray(value, dtype=np.float64), (n,)) for value, _ in results]
+    finite = np.logical_and.reduce([np.isfinite(v) for v in values])
+    columns = [v.tolist() for v in values]
+    res = []
+    for i in range(n):
+        if finite[i]:
+            res.append({'ok': True, 'command': command,
+                        'results': [[column[i], unit] for column, (_, unit) in zip(columns, results)]})
+        else:
+            # Scalar evaluation would have raised ZeroDivisionError
+            res.append({'ok': False, 'error': 'Result is not finite (division by zero?)'})
+    return res
+
+
+def evaluate_parse(key, items):
+    """
+    Evaluates a batch of parse requests, items are lists of strings.
+    """
+    offsets = _offsets(items)
+    strings = [s for item in items for s in item]
+    values, codes, errors = units.parse_array(np.array(strings, dtype=str))
+    # Numbers beyond the float range (e.g. 1e400) parse as inf, which JSON cannot carry
+    overflow = np.flatnonzero(~np.isfinite(values) & (codes != U.INVALID_CODE))
+    if overflow.size:
+        values[overflow] = np.nan
+        codes[overflow] = U.INVALID_CODE
+        errors = sorted(errors + [(int(i), 'Number out of range: {0}'.format(strings[i])) for i in overflow])
+    unit_names = [None if c == U.INVALID_CODE else U.code_unit(c) for c in codes.tolist()]
+    return [{'values': v, 'units': u, 'errors': e}
+            for v, u, e in zip(_split(_nullable(values), offsets), _split(unit_names, offsets),
+                               _split_errors(errors, offsets))]
+
+
+def evaluate_format(key, items):
+    """
+    Evaluates a batch of format requests sharing the unit (key), items are lists of numbers.
+    """
+    offsets = _offsets(items)
+    strings, errors = units.format_array(np.array([v for item in items for v in item], dtype=np.float64), key)
+    errors_by_item = _split_errors(errors, offsets)
+    strings = strings.tolist()
+    for index, _ in errors:
+        strings[index] = None
+    return [{'strings': s, 'errors': e} for s, e in zip(_split(strings, offsets), errors_by_item)]
+
+
+def _is_number(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _floats(values, finite=False):
+    """
+    Returns the numbers values as floats. Raises HttpError 400 for integers
+    too large for a float and, if finite, for infinite or NaN values.
+    """
+    try:
+        res = [float(v) for v in values]
+    except OverflowError:
+        raise HttpError(400, 'Number too large')
+    if finite and not all(math.isfinite(v) for v in res):
+        raise HttpError(400, 'Arguments must be finite numbers')
+    return res
+
+
+class Service(object):
+    def __init__(self, window=0.002, max_batch=1024, max_pending=1000):
+        """
+        window is the time in seconds requests are held to be batched together,
+        max_batch the largest batch and max_pending the number of requests in
+        flight above which new requests are rejected with 503.
+        """
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self.latency = LatencyStats()
+        self.batchers = {'calc': Batcher(evaluate_calc, window, max_batch),
+                         'parse': Batcher(evaluate_parse, window, max_batch),
+                         'format': Batcher(evaluate_format, window, max_batch)}
+        self._server = None
+
+    async def start(self, host='127.0.0.1', port=8080):
+        """
+        Starts listening and returns the asyncio server (port 0 picks a free port).
+        """
+        units.enable_cache()
+        for formula in registry.FORMULAS:
+            registry.load(formula)
+        self._server = await asyncio.start_server(self._serve_client, host, port)
+        return self._server
+
+    @property
+    def port(self):
+        return self._server.sockets[0].getsockname()[1]
+
+    async def handle(self, method, path, body):
+        """
+        Handles one request and returns (status, response object).
+        """
+        if path == '/stats':
+            if method != 'GET':
+                raise HttpError(405, 'Use GET')
+            return 200, self.stats()
+        if path == '/parse':
+            endpoint, handler = 'parse', self._parse
+        elif path == '/format':
+            endpoint, handler = 'format', self._format
+        elif path == '/calc' or path.startswith('/calc/'):
+            endpoint, handler = 'calc', self._calc
+        else:
+            raise HttpError(404, 'Unknown endpoint: {0}'.format(path))
+        if method != 'POST':
+            raise HttpError(405, 'Use POST')
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HttpError(503, 'Server busy, retry later')
+        start = time.perf_counter()
+        self.pending += 1
+        try:
+            try:
+                request = json.loads(body.decode('utf8'))
+            except ValueError as e:
+                raise HttpError(400, 'Malformed JSON: {0}'.format(e))
+            if not isinstance(request, dict):
+                raise HttpError(400, 'Request must be a JSON object')
+            return 200, await handler(path, request)
+        finally:
+            self.pending -= 1
+            self.latency.add(endpoint, time.perf_counter() - start)
+
+    async def _calc(self, path, request):
+        if path == '/calc':
+            command = request.get('command')
+        else:
+            command = path[len('/calc/'):]
+        raw = request.get('args')
+        if not isinstance(raw, list):
+            raise HttpError(400, 'Request must have an "args" list')
+        try:
+            args = []
+            for a in raw:
+                if isinstance(a, str):
+                    a = units.parse(a)
+                elif not (isinstance(a, list) and len(a) == 2 and _is_number(a[0]) and isinstance(a[1], str)):
+                    raise ValueError('Arguments must be strings or [number, unit] pairs: {0}'.format(a))
+                args.append(U.convert_to_canonical(a))
+            formula = registry.find([u for _, u in args], command)
+        except ValueError as e:
+            return {'ok': False, 'error': str(e)}
+        key = (formula.command, tuple(u for _, u in args))
+        return await self.batchers['calc'].submit(key, tuple(_floats([v for v, _ in args], finite=True)))
+
+    async def _parse(self, path, request):
+        values = request.get('values')
+        if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+            raise HttpError(400, 'Request must have a "values" list of strings')
+        return await self.batchers['parse'].submit(None, values)
+
+    async def _format(self, path, request):
+        values = request.get('values')
+        unit = request.get('unit', '')
+        if not isinstance(values, list) or not all(_is_number(v) for v in values) or not isinstance(unit, str):
+            raise HttpError(400, 'Request must have a "values" list of numbers and an optional "unit" string')
+        # Infinite and NaN values are reported per value, like out of range ones
+        return await self.batchers['format'].submit(unit, _floats(values))
+
+    def stats(self):
+        batches = sum(b.batches for b in self.batchers.values())
+        items = sum(b.items for b in self.batchers.values())
+        return {'pending': self.pending, 'rejected': self.rejected, 'batches': batches,
+                'batched_requests': items, 'mean_batch_size': items / batches if batches else 0.0,
+                'latency': self.latency.summary()}
+
+    async def _serve_client(self, reader, writer):
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    request = await _read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    keep_alive = headers.get('connection', '').lower() != 'close'
+                    status, response = await self.handle(method, path, body)
+                except HttpError as e:
+                    status, response = e.status, {'ok': False, 'error': str(e)}
+                    # The rest of a malformed request cannot be skipped reliably
+                    keep_alive = keep_alive and status not in (400, 413)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    status, response = 500, {'ok': False, 'error': 'Internal error: {0}'.format(e)}
+                writer.write(_encode_response(status, response, keep_alive))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _read_request(reader):
+    """
+    Returns (method, path, headers, body) or None at the end of the connection.
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, path, _ = line.decode('latin-1').split()
+    except ValueError:
+        raise HttpError(400, 'Malformed request line')
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise HttpError(400, 'Malformed Content-Length')
+    if length > MAX_BODY:
+        raise HttpError(413, 'Request body larger than {0} bytes'.format(MAX_BODY))
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), path.split('?', 1)[0], headers, body
+
+
+def _encode_response(status, response, keep_alive=True):
+    body = json.dumps(response, ensure_ascii=False).encode('utf8')
+    head = ['HTTP/1.1 {0} {1}'.format(status, _REASONS.get(status, '')),
+            'Content-Type: application/json; charset=utf-8',
+            'Content-Length: {0}'.format(len(body)),
+            'Connection: {0}'.format('keep-alive' if keep_alive else 'close')]
+    if status == 503:
+        head.append('Retry-After: 1')
+    return ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body
+
+
+def serve(host='127.0.0.1', port=8080, **kwargs):
+    """
+    Runs the service until interrupted. kwargs are passed to Service.
+    """
+    async def run():
+        service = Service(**kwargs)
+        server = await service.start(host, port)
+        sys.stderr.write('calc service listening on http://{0}:{1}\n'.format(host, service.port))
+        async with server:
+            await server.serve_forever()
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+Content-addressed on-disk cache of PySpice simulation results.
+
+A simulation is keyed on a SHA-256 hash of the complete input deck PySpice
+generates (netlist, options including the temperatures, analysis
+statements), the simulator type and the contents of every included library
+file (followed through nested .include/.lib statements). Editing a model
+file therefore changes the key of every simulation using it, and they are
+simulated again.
+
+Results are stored as compressed .npz files (one per simulation) holding the
+vectors and their units, and are returned as the same PySpice analysis
+classes the simulator returns. The total size of the cache is bounded; the
+least recently used entries are evicted first.
+
+Usage example:
+    >>> simulator = cached_simulator(circuit, temperature=25, nominal_temperature=25)
+    >>> analysis = simulator.transient(step_time=1e-4, end_time=40e-3)   # simulated
+    >>> analysis = simulator.transient(step_time=1e-4, end_time=40e-3)   # loaded from the cache
+    >>> default_cache().info()
+    CacheInfo(hits=1, misses=1, evictions=0, maxsize=536870912, currsize=52113)
+
+The cache directory is $CALC_SIM_CACHE or ~/.cache/calcel/simulations.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import zipfile
+import numpy as np
+from . import waveforms
+from .cache import CacheInfo
+
+DEFAULT_MAX_BYTES = 512 << 20
+
+# Analysis methods of the PySpice simulators that are cached
+ANALYSES = ('operating_point', 'dc', 'ac', 'transient')
+_INCLUDE = re.compile(r'^\s*\.(?:include|inc|lib)\s+"?([^"\s]+)"?', re.IGNORECASE | re.MULTILINE)
+
+
+def default_directory():
+    return os.environ.get('CALC_SIM_CACHE') or os.path.join(os.path.expanduser('~'), '.cache', 'calcel',
+                                                            'simulations')
+
+
+class SimulationCache(object):
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        directory holds the .npz files, max_bytes bounds their total size.
+        """
+        self.directory = directory or default_directory()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(self.directory, exist_ok=True)
+        self._size = sum(size for _, _, size in self._entries())
+        # path -> (mtime_ns, size, digest) of the library files
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.npz')
+
+    def _entries(self):
+        """
+        Returns (mtime, path, size) of every stored entry.
+        """
+        res = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npz'):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                res.append((st.st_mtime_ns, entry.path, st.st_size))
+        return res
+
+    def library_digest(self, path):
+        """
+        Returns the SHA-256 of a library file and of the files it includes.
+        Digests are recomputed only when the file's mtime or size changes.
+        """
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            # Left to the simulator to report
+            return 'missing'
+        known = self._digests.get(path)
+        if known is not None and known[:2] == (st.st_mtime_ns, st.st_size):
+            return known[2]
+        # Guard against include cycles
+        self._digests[path] = (st.st_mtime_ns, st.st_size, 'cycle')
+        with open(path, 'rb') as f:
+            content = f.read()
+        h = hashlib.sha256(content)
+        for name in _INCLUDE.findall(content.decode('latin-1')):
+            h.update(self.library_digest(os.path.join(os.path.dirname(path), name)).encode('ascii'))
+        digest = h.hexdigest()
+        self._digests[path] = (st.st_mtime_ns, st.st_size, digest)
+        return digest
+
+    def key(self, simulator, analysis, *args, **kwargs):
+        """
+        Prepares the analysis on simulator (without running it) and returns the key of its result.
+        """
+        from PySpice.Spice.Simulation import CircuitSimulation
+        simulator.reset_analysis()
+        kwargs = dict(kwargs)
+        kwargs.pop('log_desk', None)
+        probes = kwargs.pop('probes', None)
+        if probes:
+            simulator.save(*probes)
+        getattr(CircuitSimulation, analysis)(simulator, *args, **kwargs)
+        h = hashlib.sha256()
+        h.update(type(simulator).__name__.encode('utf8'))
+        h.update(str(simulator).encode('utf8'))
+        circuit = simulator.circuit
+        libraries = list(circuit._includes) + [name for name, _ in circuit._libs]
+        with self._lock:
+            for path in libraries:
+                h.update(b'\0' + self.library_digest(path).encode('ascii'))
+        return h.hexdigest()
+
+    def get(self, key, simulation=None):
+        """
+        Returns the cached analysis for key or None.
+        """
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as f:
+                analysis = _from_arrays(dict(f), simulation)
+            # Last use time for the LRU eviction
+            os.utime(path)
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            # Missing or truncated entries are simulated again
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return analysis
+
+    def put(self, key, analysis):
+        """
+        Stores analysis under key and evicts the least recently used entries above max_bytes.
+        """
+        fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez_compressed(f, **_to_arrays(analysis))
+            size = os.path.getsize(tmp)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        path = self._path(key)
+        with self._lock:
+            # The entry may exist already (e.g. stored by another sweep worker): count only the difference
+            try:
+                size -= os.path.getsize(path)
+            except OSError:
+                pass
+            try:
+                # Atomic, concurrent writers never see partial files
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            self._size += size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        self._size = sum(size for _, _, size in entries)
+        for _, path, size in entries:
+            if self._size <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            self._size -= size
+            self.evictions += 1
+
+    def run(self, simulator, analysis, *args, **kwargs):
+        """
+        Returns the result of simulator.<analysis>(*args, **kwargs), simulating only on a cache miss.
+        """
+        key = self.key(simulator, analysis, *args, **kwargs)
+        res = self.get(key, simulator)
+        if res is None:
+            res = getattr(simulator, analysis)(*args, **kwargs)
+            self.put(key, res)
+        return res
+
+    def simulator(self, circuit, **kwargs):
+        """
+        Returns circuit.simulator(**kwargs) with cached analyses.
+        """
+        return CachedSimulator(self, circuit.simulator(**kwargs))
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.max_bytes, self._size)
+
+    def clear(self):
+        """
+        Deletes all entries and resets the counters.
+        """
+        with self._lock:
+            for _, path, _ in self._entries():
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            self._size = 0
+            self.hits = self.misses = self.evictions = 0
+
+
+class CachedSimulator(object):
+    """
+    Wraps a PySpice simulator: the analyses in ANALYSES go through the cache,
+    everything else (options, initial_condition, ...) goes to the simulator.
+    """
+    def __init__(self, cache, simulator):
+        self.cache = cache
+        self.simulator = simulator
+
+    def __getattr__(self, name):
+        if name in ANALYSES:
+            return lambda *args, **kwargs: self.cache.run(self.simulator, name, *args, **kwargs)
+        return getattr(self.simulator, name)
+
+
+def _to_arrays(analysis):
+    meta, arrays = waveforms.describe(analysis)
+    arrays['meta'] = np.array(json.dumps(meta))
+    return arrays
+
+
+def _from_arrays(arrays, simulation=None):
+    return waveforms.build_analysis(json.loads(str(arrays['meta'])), arrays.__getitem__, simulation)
+
+
+_default_cache = None
+
+
+def default_cache():
+    """
+    Returns the process wide cache in default_directory().
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SimulationCache()
+    return _default_cache
+
+
+def cached_simulator(circuit, **kwargs):
+    """
+    Drop-in replacement of circuit.simulator(**kwargs) whose analyses use default_cache().
+    """
+    return default_cache().simulator(circuit, **kwargs)
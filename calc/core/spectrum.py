@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming spectrum analysis of long waveforms.
+
+The playground scripts (playground/fft.py) transform a whole signal at once
+and keep half of the result. Here signals are read chunk by chunk, cut into
+(overlapping, windowed) frames and transformed with rfft a batch of frames
+at a time, so memory is bounded by the chunk size whatever the length of the
+signal. A source is an array, a memory-mapped array (e.g. a column of a
+core.waveforms.WaveformStore) or any iterable of sample blocks or samples.
+
+Usage example:
+    >>> store = waveforms.WaveformStore('rect.wf')
+    >>> y = uniform(store.abscissa, store['output'], dt=1e-6)          # transients have variable steps
+    >>> s = welch(y, dt=1e-6, n=8192, window='hann')
+    >>> s.frequency[s.amplitude.argmax()], s.amplitude.max()
+    >>> for t, amplitude in stft(store['output'], dt=1e-6, n=1024): ...
+    >>> times, frequency, amplitude = spectrogram(store['output'], dt=1e-6, n=1024)
+
+Amplitudes use the normalization of the playground, 2/N |Y|, N being the sum
+of the window (the frame length for the rectangular window): a sine of
+amplitude A reads A at its bin, and the DC bin reads twice the mean.
+"""
+import numpy as np
+
+CHUNK_SIZE = 1 << 20
+WINDOWS = {
+    'rectangular': np.ones,
+    'hann': np.hanning,
+    'hamming': np.hamming,
+    'blackman': np.blackman,
+    'bartlett': np.bartlett,
+}
+
+
+def weights(window, n):
+    """
+    Returns the n weights of window, a key of WINDOWS or an array of n weights.
+    """
+    if isinstance(window, str):
+        if window not in WINDOWS:
+            raise ValueError('Unknown window {0}, expected one of: {1}'.format(window, ', '.join(WINDOWS)))
+        return WINDOWS[window](n)
+    res = np.asarray(window, dtype=np.float64)
+    if res.shape != (n,):
+        raise ValueError('A window of {0} samples expected, got {1}'.format(n, res.shape))
+    return res
+
+
+def chunks(source, chunk_size=CHUNK_SIZE):
+    """
+    Yields the samples of source as float64 arrays of about chunk_size samples.
+    Arrays (memory-mapped ones included) are sliced, iterables are regrouped.
+    """
+    if hasattr(source, 'shape'):
+        for begin in range(0, len(source), chunk_size):
+            yield np.asarray(source[begin:begin + chunk_size], dtype=np.float64)
+        return
+    pending, size = [], 0
+    for block in source:
+        block = np.atleast_1d(np.asarray(block, dtype=np.float64))
+        pending.append(block)
+        size += block.size
+        if size >= chunk_size:
+            yield np.concatenate(pending) if len(pending) > 1 else block
+            pending, size = [], 0
+    if pending:
+        yield np.concatenate(pending)
+
+
+def frames(source, n, hop, chunk_size=CHUNK_SIZE):
+    """
+    Yields (first sample index, batch) for the frames of n samples taken every
+    hop samples; a batch is a (frames, n) read-only view. Trailing samples not
+    filling a frame are dropped.
+    """
+    buffer = np.zeros(0)
+    start = 0
+    for chunk in chunks(source, max(chunk_size, n)):
+        buffer = np.concatenate((buffer, chunk)) if buffer.size else chunk
+        if buffer.size < n:
+            continue
+        count = (buffer.size - n) // hop + 1
+        yield start, np.lib.stride_tricks.sliding_window_view(buffer, n)[::hop][:count]
+        # At most n samples are carried to the next chunk
+        buffer = buffer[count * hop:]
+        start += count * hop
+
+
+def frequencies(n, dt):
+    return np.fft.rfftfreq(n, dt)
+
+
+def amplitude(y, dt, window='rectangular'):
+    """
+    Returns (frequency, amplitude) of the whole signal y (the playground's
+    fft, but with rfft and the Nyquist bin kept).
+    """
+    y = np.asarray(y, dtype=np.float64)
+    w = weights(window, y.size)
+    return frequencies(y.size, dt), 2.0 / w.sum() * np.abs(np.fft.rfft(y * w))
+
+
+def _hop(n, overlap):
+    overlap = n // 2 if overlap is None else int(overlap)
+    if not 0 <= overlap < n:
+        raise ValueError('The overlap must be in [0, {0}), got {1}'.format(n, overlap))
+    return n - overlap
+
+
+class Spectrum(object):
+    """
+    Welch averaged spectrum: the mean power of the frames' bins and the window it was computed with.
+    """
+    def __init__(self, frequency, power, frames, window, dt):
+        self.frequency = frequency
+        self.power = power
+        self.frames = frames
+        self.window = window
+        self.dt = dt
+
+    @property
+    def amplitude(self):
+        """
+        RMS average of the frame amplitudes, normalized as 2/N |Y|.
+        """
+        return 2.0 / self.window.sum() * np.sqrt(self.power)
+
+    @property
+    def psd(self):
+        """
+        One-sided power spectral density [unit^2/Hz].
+        """
+        res = 2.0 * self.dt * self.power / np.square(self.window).sum()
+        res[0] /= 2
+        if self.window.size % 2 == 0:
+            res[-1] /= 2
+        return res
+
+
+def welch(source, dt, n=4096, overlap=None, window='hann', detrend=False, chunk_size=CHUNK_SIZE):
+    """
+    Returns the Spectrum averaged over the frames of n samples overlapping by
+    overlap samples (default n/2) of source sampled every dt seconds. With
+    detrend, the mean of every frame is removed.
+    """
+    w = weights(window, n)
+    power = np.zeros(n // 2 + 1)
+    count = 0
+    for _, batch in frames(source, n, _hop(n, overlap), chunk_size):
+        if detrend:
+            batch = batch - batch.mean(axis=1, keepdims=True)
+        power += np.square(np.abs(np.fft.rfft(batch * w, axis=1))).sum(axis=0)
+        count += batch.shape[0]
+    if not count:
+        raise ValueError('The signal is shorter than a frame of {0} samples'.format(n))
+    return Spectrum(frequencies(n, dt), power / count, count, w, dt)
+
+
+def stft(source, dt, n=1024, overlap=None, window='hann', chunk_size=CHUNK_SIZE):
+    """
+    Yields (times, amplitudes) per batch of frames: the times [s] of the frame
+    centers and a (frames, n/2 + 1) array of their amplitude spectra (2/N |Y|).
+    """
+    w = weights(window, n)
+    hop = _hop(n, overlap)
+    scale = 2.0 / w.sum()
+    for start, batch in frames(source, n, hop, chunk_size):
+        times = (start + np.arange(batch.shape[0]) * hop + n / 2.0) * dt
+        yield times, scale * np.abs(np.fft.rfft(batch * w, axis=1))
+
+
+def spectrogram(source, dt, n=1024, overlap=None, window='hann', dtype=np.float32, chunk_size=CHUNK_SIZE):
+    """
+    Returns (times, frequency, amplitude) of the STFT of source; amplitude is
+    a (frames, n/2 + 1) array of dtype.
+    """
+    times, rows = [], []
+    for t, amplitudes in stft(source, dt, n, overlap, window, chunk_size):
+        times.append(t)
+        rows.append(amplitudes.astype(dtype, copy=False))
+    if not rows:
+        return np.zeros(0), frequencies(n, dt), np.zeros((0, n // 2 + 1), dtype=dtype)
+    return np.concatenate(times), frequencies(n, dt), np.concatenate(rows)
+
+
+def uniform(time, values, dt=None, chunk_size=CHUNK_SIZE):
+    """
+    Yields values (sampled at the increasing times time, e.g. the variable
+    steps of a transient analysis) linearly interpolated every dt seconds from
+    time[0], chunk by chunk. dt defaults to the mean step.
+    """
+    first, last = float(time[0]), float(time[-1])
+    if dt is None:
+        dt = (last - first) / (len(time) - 1)
+    total = int(np.floor((last - first) / dt + 1e-9)) + 1
+    for k in range(0, total, chunk_size):
+        t = first + dt * np.arange(k, min(k + chunk_size, total))
+        # Only the source samples around this chunk are read
+        lo = max(int(np.searchsorted(time, t[0], 'right')) - 1, 0)
+        hi = min(int(np.searchsorted(time, t[-1], 'left')) + 1, len(time))
+        yield np.interp(t, np.asarray(time[lo:hi], dtype=np.float64), np.asarray(values[lo:hi], dtype=np.float64))
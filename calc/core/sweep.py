@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+Parallel parameter sweeps of PySpice simulations.
+
+A sweep evaluates a simulate(point) callable on every point of a parameter
+grid (the cartesian product of the parameter values) and stacks the
+returned waveforms into arrays indexed by parameter. Points run in a pool of
+worker processes, each with its own ngspice instance, so a crashing or
+hanging simulation cannot corrupt the others.
+
+Usage example:
+    >>> def rectifier(r_load):
+    ...     circuit = Circuit('half-wave rectification')
+    ...     ...
+    ...     return circuit
+    >>> simulation = PySpiceSimulation(rectifier, 'transient',
+    ...                                {'step_time': 1e-4, 'end_time': 40e-3}, probes=['output'])
+    >>> result = run(simulation, {'temperature': [0, 25, 100], 'r_load': [100, 1e3]})
+    >>> result['output'].shape     # temperature x r_load x time
+    (3, 2, 401)
+    >>> print(result.summary())
+
+simulate must be picklable (e.g. a module level function or a
+PySpiceSimulation of a module level circuit factory) and return a dict
+of name -> array (or scalar).
+"""
+import collections
+import concurrent.futures
+import itertools
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+
+Failure = collections.namedtuple('Failure', ['index', 'point', 'message'])
+
+
+class PySpiceSimulation(object):
+    # Point parameters consumed by the simulator instead of the circuit factory
+    SIMULATOR_PARAMETERS = ('temperature', 'nominal_temperature')
+
+    def __init__(self, factory, analysis, analysis_kwargs=None, probes=None, simulator_kwargs=None):
+        """
+        factory(**parameters) returns the PySpice Circuit of a point.
+        analysis is the name of the simulator method ('dc', 'ac', 'transient',
+        'operating_point'), called with analysis_kwargs.
+        probes is the list of node/branch names to keep (default: all).
+        The temperature parameter sets both the simulation and the nominal temperature
+        (unless nominal_temperature is swept as well).
+        """
+        self.factory = factory
+        self.analysis = analysis
+        self.analysis_kwargs = analysis_kwargs or {}
+        self.probes = probes
+        self.simulator_kwargs = simulator_kwargs or {}
+
+    def __call__(self, point):
+        circuit_params = {k: v for k, v in point.items() if k not in PySpiceSimulation.SIMULATOR_PARAMETERS}
+        simulator_kwargs = dict(self.simulator_kwargs)
+        if 'temperature' in point:
+            simulator_kwargs['temperature'] = point['temperature']
+            simulator_kwargs['nominal_temperature'] = point.get('nominal_temperature', point['temperature'])
+        elif 'nominal_temperature' in point:
+            simulator_kwargs['nominal_temperature'] = point['nominal_temperature']
+        circuit = self.factory(**circuit_params)
+        simulator = circuit.simulator(**simulator_kwargs)
+        return analysis_arrays(getattr(simulator, self.analysis)(**self.analysis_kwargs), self.probes)
+
+
+def analysis_arrays(analysis, probes=None):
+    """
+    Converts a PySpice analysis to a dict of plain NumPy arrays: its abscissa
+    ('sweep', 'time' or 'frequency') and its node voltages and branch currents.
+    """
+    res = {}
+    for abscissa in ('sweep', 'time', 'frequency'):
+        # Properties of the analysis class; other names are looked up as waveforms
+        if hasattr(type(analysis), abscissa):
+            res[abscissa] = np.array(getattr(analysis, abscissa))
+    waveforms = dict(analysis.nodes)
+    waveforms.update(analysis.branches)
+    if probes is not None:
+        waveforms = {name: analysis[name] for name in probes}
+    for name, waveform in waveforms.items():
+        res[str(name)] = np.array(waveform)
+    return res
+
+
+class SweepResult(object):
+    """
+    Stacked outputs of a sweep.
+
+    data[name] has the grid shape followed by the shape of the output; outputs
+    of different lengths (e.g. adaptive transient steps) are padded with NaN
+    and lengths holds the length of every point. Failed points are NaN.
+    timings holds the simulation time of every point in seconds (NaN if failed).
+    """
+    def __init__(self, names, axes, data, lengths, timings, failures, wall_time, processes):
+        self.names = names
+        self.axes = axes
+        self.data = data
+        self.lengths = lengths
+        self.timings = timings
+        self.failures = failures
+        self.wall_time = wall_time
+        self.processes = processes
+
+    @property
+    def shape(self):
+        return tuple(len(a) for a in self.axes)
+
+    @property
+    def ok(self):
+        """
+        Boolean array of the grid shape, True where the point succeeded.
+        """
+        return ~np.isnan(self.timings)
+
+    def __getitem__(self, name):
+        return self.data[name]
+
+    def index(self, **params):
+        """
+        Returns the grid index of the point with the given parameter values.
+        """
+        return tuple(int(np.flatnonzero(np.asarray(axis) == params[name])[0])
+                     for name, axis in zip(self.names, self.axes))
+
+    def point(self, **params):
+        """
+        Returns the unpadded outputs of one point.
+        """
+        idx = self.index(**params)
+        n = self.lengths[idx]
+        return {name: values[idx][..., :n] if values.ndim > len(idx) else values[idx]
+                for name, values in self.data.items()}
+
+    def summary(self):
+        simulated = np.nansum(self.timings)
+        lines = ['{0} points ({1}) in {2:.2f} s with {3} processes, {4:.2f} s summed over points ({5:.1f}x)'.format(
+            self.timings.size, ' x '.join('{0} {1}'.format(len(a), n) for n, a in zip(self.names, self.axes)),
+            self.wall_time, self.processes, simulated, simulated / self.wall_time if self.wall_time else 0.0)]
+        if self.ok.any():
+            t = self.timings[self.ok]
+            lines.append('per point: min {0:.3f} s, median {1:.3f} s, max {2:.3f} s'.format(
+                t.min(), np.median(t), t.max()))
+        for failure in self.failures:
+            lines.append('failed {0}: {1}'.format(failure.point, failure.message))
+        return '\n'.join(lines)
+
+
+def _run_chunk(simulate, chunk):
+    """
+    Worker: evaluates simulate on (index, point) pairs.
+    Returns (index, outputs, elapsed, error) tuples; exceptions are reported as text.
+    """
+    res = []
+    for index, point in chunk:
+        start = time.perf_counter()
+        try:
+            outputs = {name: np.asarray(values) for name, values in simulate(point).items()}
+        except Exception as e:
+            message = traceback.format_exception_only(type(e), e)[-1].strip()
+            res.append((index, None, time.perf_counter() - start, message))
+            continue
+        res.append((index, outputs, time.perf_counter() - start, None))
+    return res
+
+
+def _stack(name, shape, outputs, lengths):
+    """
+    Stacks the outputs (dict of grid index -> array) of one name into one array.
+    Scalars are taken as 1-element arrays when other points return arrays,
+    raises ValueError for other outputs of different numbers of dimensions.
+    """
+    if len(set(v.ndim for v in outputs.values())) > 1:
+        outputs = dict((idx, np.atleast_1d(v)) for idx, v in outputs.items())
+        ranks = sorted(set(v.ndim for v in outputs.values()))
+        if len(ranks) > 1:
+            raise ValueError('Output {0} has different numbers of dimensions: {1}'.format(
+                name, ', '.join(str(r) for r in ranks)))
+    shapes = set(v.shape for v in outputs.values())
+    dtype = np.result_type(*outputs.values())
+    if not np.issubdtype(dtype, np.inexact):
+        dtype = np.float64
+    if len(shapes) == 1:
+        tail = shapes.pop()
+    else:
+        # Pad along the last axis
+        tail = tuple(max(s) for s in zip(*shapes))
+    res = np.full(shape + tail, np.nan, dtype=dtype)
+    for idx, values in outputs.items():
+        res[idx + tuple(slice(0, n) for n in values.shape)] = values
+        if values.ndim:
+            lengths[idx] = max(lengths[idx], values.shape[-1])
+    return res
+
+
+def _run_isolated_point(simulate, item, connection):
+    connection.send(_run_chunk(simulate, [item]))
+    connection.close()
+
+
+def _run_isolated(simulate, points, processes, context):
+    """
+    Runs every point in its own process, processes at a time.
+    Returns (results, dead) where dead lists the points whose process died.
+    """
+    results = []
+    dead = []
+    for i in range(0, len(points), processes):
+        running = []
+        for item in points[i:i + processes]:
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=_run_isolated_point, args=(simulate, item, sender))
+            process.start()
+            sender.close()
+            running.append((item, process, receiver))
+        for item, process, receiver in running:
+            try:
+                results.extend(receiver.recv())
+            except EOFError:
+                dead.append(item)
+            process.join()
+            receiver.close()
+    return results, dead
+
+
+def run(simulate, params, processes=None, chunksize=1, mp_context=None):
+    """
+    Evaluates simulate(point) on every point of the grid of params, a mapping of
+    parameter name -> sequence of values (point is a dict name -> value).
+
+    processes is the number of worker processes (default: the number of CPUs);
+    0 runs the points in this process. chunksize points are sent to a worker at
+    once. When a worker dies (e.g. ngspice crashed) the pool stops, so the points
+    it had not finished are rerun each in its own process; points whose process
+    dies again are reported as failures.
+
+    Returns a SweepResult.
+    """
+    names = list(params)
+    axes = [list(params[name]) for name in names]
+    shape = tuple(len(a) for a in axes)
+    points = [(idx, dict(zip(names, (a[i] for a, i in zip(axes, idx)))))
+              for idx in itertools.product(*(range(n) for n in shape))]
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    points_by_index = dict(points)
+    outputs = {}
+    timings = np.full(shape, np.nan)
+    failures = []
+    start = time.perf_counter()
+
+    def record(results):
+        for idx, values, elapsed, error in results:
+            if error is not None:
+                failures.append(Failure(idx, points_by_index[idx], error))
+                continue
+            timings[idx] = elapsed
+            for name, v in values.items():
+                outputs.setdefault(name, {})[idx] = v
+
+    if processes == 0:
+        record(_run_chunk(simulate, points))
+    else:
+        broken = []
+        with concurrent.futures.ProcessPoolExecutor(processes, mp_context=mp_context) as pool:
+            futures = {pool.submit(_run_chunk, simulate, points[i:i + chunksize]): points[i:i + chunksize]
+                       for i in range(0, len(points), chunksize)}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    record(future.result())
+                except BrokenProcessPool:
+                    broken.extend(futures[future])
+        if broken:
+            results, dead = _run_isolated(simulate, sorted(broken, key=lambda item: item[0]), processes,
+                                          mp_context or multiprocessing.get_context())
+            record(results)
+            for idx, point in dead:
+                failures.append(Failure(idx, point, 'Worker process died'))
+    wall_time = time.perf_counter() - start
+
+    lengths = np.zeros(shape, dtype=np.int64)
+    data = {name: _stack(name, shape, values, lengths) for name, values in sorted(outputs.items())}
+    failures.sort(key=lambda f: f.index)
+    return SweepResult(names, axes, data, lengths, timings, failures, wall_time, processes)
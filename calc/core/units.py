@@ -15,12 +15,52 @@ Usage example:
     >>> print(normalize_engineer_notation("1µ234 Ω"))
     (1.234e-6, 'Ω')
 
+Parsed values can be held compactly as Quantity objects (a float and a
+unit code) or as a QuantityArray (one structured array of values and unit
+codes), which the calculators and formatters accept like (value, unit) pairs:
+    >>> q, errors = parse_quantities(['4k7Ω', '1R2', '10Ohm'], dtype='float32')
+    >>> format_array(q)[0]
+    array(['4.70 kΩ', '1.20 Ω', '10.0 Ω'], dtype='<U7')
+
 Based on code published at techoverflow.net.
 """
+import collections.abc
 import math
 import itertools
-import numpy as np
-from PySpice.Unit import *
+import re
+from .cache import LruCache
+from .lazy import LazyModule, is_loaded
+
+# numpy is only needed by the array functions, PySpice by normalize_pyspice():
+# both are imported on first use to keep the command line tools fast to start
+np = LazyModule('numpy', globals(), 'np')
+
+
+class _PySpiceUnitMap(collections.abc.Mapping):
+    """
+    Maps unit symbols to PySpice unit constructors, importing PySpice.Unit on first lookup.
+    """
+    NAMES = {'F': 'u_F', 'A': 'u_A', 'Ω': 'u_Ohm', 'Ohm': 'u_Ohm', 'R': 'u_Ohm',
+             'W': 'u_W', 'H': 'u_H', 'C': 'u_C', 'K': 'u_K', 'Hz': 'u_Hz', 'V': 'u_V',
+             'J': 'u_J', 'S': 'u_S'}
+
+    def __init__(self):
+        self._map = None
+
+    def _load(self):
+        if self._map is None:
+            import PySpice.Unit
+            self._map = {u: getattr(PySpice.Unit, name) for u, name in _PySpiceUnitMap.NAMES.items()}
+        return self._map
+
+    def __getitem__(self, u):
+        return self._load()[u]
+
+    def __iter__(self):
+        return iter(_PySpiceUnitMap.NAMES)
+
+    def __len__(self):
+        return len(_PySpiceUnitMap.NAMES)
 
 
 class AllUnits(object):
@@ -38,22 +78,196 @@ class AllUnits(object):
     UNITS = [['F'], ['A'], ['Ω', 'Ohm', 'R'], ['W'], ['H'], ['C'], ['K'],
              ['Hz'], ['V'], ['J'], ['S']]
 
-    PYSPICE_UNIT_MAP = {'F': u_F, 'A': u_A, 'Ω': u_Ohm, 'Ohm': u_Ohm, 'R': u_Ohm,
-                        'W': u_W, 'H': u_H, 'C': u_C, 'K': u_K, 'Hz': u_Hz, 'V': u_V,
-                        'J': u_J, 'S': u_S}
+    # Compact unit codes: index of the unit group in UNITS
+    UNIT_CODES = {u: code for code, same_units in enumerate(UNITS) for u in same_units}
+    NO_UNIT_CODE = 254
+    INVALID_CODE = 255
+
+    PYSPICE_UNIT_MAP = _PySpiceUnitMap()
 
     @staticmethod
     def convert_to_canonical(v):
+        """
+        Returns (value, canonical unit) for a (value, unit) pair.
+        Values given as lists or tuples are converted to float arrays
+        so that the calculators can broadcast them.
+        """
+        # Quantity and QuantityArray hold canonical unit codes, no alias lookup needed
+        # (duck-typed: the calculators may see this module as core.units or calc.core.units)
+        if hasattr(v, 'pair'):
+            return v.pair()
         n = v[0]
         u = v[1]
+        if isinstance(n, (list, tuple)):
+            n = np.asarray(n, dtype=np.float64)
 
-        for same_units in AllUnits.UNITS:
-            if u in same_units:
-                u = same_units[0]
-                break
-
+        code = AllUnits.UNIT_CODES.get(u)
+        if code is not None:
+            u = AllUnits.UNITS[code][0]
         return n, u
 
+    @staticmethod
+    def unit_code(u):
+        """
+        Returns the compact code of unit u (any of its aliases).
+        An empty unit maps to NO_UNIT_CODE.
+        """
+        if not u:
+            return AllUnits.NO_UNIT_CODE
+        return AllUnits.UNIT_CODES[u]
+
+    @staticmethod
+    def code_unit(code):
+        """
+        Returns the canonical unit for a compact unit code.
+        """
+        if code == AllUnits.NO_UNIT_CODE:
+            return ''
+        if code == AllUnits.INVALID_CODE:
+            raise ValueError('No unit for a value which could not be parsed')
+        return AllUnits.UNITS[code][0]
+
+
+def quantity_dtype(dtype='float64'):
+    """
+    Structured dtype of QuantityArray elements: the value (float64 or
+    float32) and the uint8 unit code, packed (9 or 5 bytes).
+    """
+    return np.dtype([('value', dtype), ('code', np.uint8)])
+
+
+class Quantity(object):
+    """
+    A value with the compact code of its canonical unit (see AllUnits.unit_code).
+    Behaves like the (value, unit) pair it replaces: q[0], q[1] and
+    value, unit = q work.
+    """
+    __slots__ = ('value', 'code')
+
+    def __init__(self, value, unit=''):
+        try:
+            self.code = AllUnits.unit_code(unit)
+        except KeyError:
+            raise ValueError('Unknown unit: {0}'.format(unit))
+        self.value = float(value)
+
+    @staticmethod
+    def from_code(value, code):
+        q = Quantity.__new__(Quantity)
+        q.value, q.code = float(value), int(code)
+        return q
+
+    @property
+    def unit(self):
+        return AllUnits.code_unit(self.code)
+
+    def pair(self):
+        return self.value, self.unit
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, i):
+        return self.pair()[i]
+
+    def __iter__(self):
+        return iter(self.pair())
+
+    def __eq__(self, other):
+        if isinstance(other, Quantity):
+            return self.value == other.value and self.code == other.code
+        if isinstance(other, tuple) and len(other) == 2:
+            return self.pair() == AllUnits.convert_to_canonical(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.pair())
+
+    def __repr__(self):
+        if self.code == AllUnits.INVALID_CODE:
+            return 'Quantity({0!r}, code={1})'.format(self.value, self.code)
+        return 'Quantity({0!r}, {1!r})'.format(self.value, self.unit)
+
+
+class QuantityArray(object):
+    """
+    Values and unit codes in one structured NumPy array (see quantity_dtype()):
+    9 bytes per element, 5 with float32 values, instead of a (float, str) tuple each.
+
+    The calculators and formatters accept it wherever they accept a
+    (values, unit) pair; the calculators require a single unit.
+    """
+    __slots__ = ('data',)
+
+    def __init__(self, values, unit='', dtype='float64'):
+        """
+        values is a sequence or array of numbers, or a structured array of
+        quantity_dtype() which is wrapped as is. unit is the unit of every
+        value or an array of unit codes of the shape of values.
+        """
+        values = np.asarray(values)
+        if values.dtype.names == ('value', 'code'):
+            self.data = values
+            return
+        self.data = np.empty(values.shape, dtype=quantity_dtype(dtype))
+        self.data['value'] = values
+        if isinstance(unit, str):
+            try:
+                unit = AllUnits.unit_code(unit)
+            except KeyError:
+                raise ValueError('Unknown unit: {0}'.format(unit))
+        self.data['code'] = unit
+
+    @property
+    def values(self):
+        return self.data['value']
+
+    @property
+    def codes(self):
+        return self.data['code']
+
+    @property
+    def unit(self):
+        """
+        The canonical unit shared by every value. Raises ValueError if the units differ.
+        """
+        codes = np.flatnonzero(np.bincount(self.codes.ravel(), minlength=1)).tolist()
+        if AllUnits.INVALID_CODE in codes:
+            raise ValueError('Values which could not be parsed have no unit')
+        if len(codes) > 1:
+            raise ValueError('Values of several units: {0}'.format(
+                ', '.join(AllUnits.code_unit(c) or '1' for c in codes)))
+        return AllUnits.code_unit(codes[0]) if codes else ''
+
+    def pair(self):
+        return self.values, self.unit
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+    def astype(self, dtype):
+        return QuantityArray(self.values, self.codes, dtype)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __getitem__(self, key):
+        res = self.data[key]
+        if isinstance(res, np.void):
+            return Quantity.from_code(res['value'], res['code'])
+        return QuantityArray(res)
+
+    def __repr__(self):
+        return 'QuantityArray({0!r}, {1})'.format(self.values, self.data.dtype)
+
 
 class Parser(object):
     instance = None
@@ -65,6 +279,16 @@ class Parser(object):
     SUFFICES = [["y"], ["z"], ["a"], ["f"], ["p"], ["n"], ["µ", "u"], ["m"], ['', 'R'],
                 ["k"], ["M"], ["G"], ["T"], ["E"], ["Z"], ["Y"]]
     FIRST_SUFFIX_EXP = -24
+    # Exponents of the SPICE scale factors (case insensitive, M is milli) but MIL (25.4 µm);
+    # letters after them are ignored
+    SPICE_SCALE = {'t': 12, 'g': 9, 'meg': 6, 'k': 3, 'm': -3, 'u': -6, 'µ': -6, 'n': -9, 'p': -12, 'f': -15}
+    SPICE_MIL = 25.4e-6
+    SPICE_NUMBER = re.compile(r"([+-]?(?:\d+\.?\d*|\.\d+))(?:e([+-]?\d+))?(meg|mil|[tgkmuµnpf])?([^\d\s.+-]*)",
+                              re.IGNORECASE)
+    # Lookup tables for format_array(): integer parts and zero-padded fractions,
+    # built on first use (see _format_tables())
+    FORMAT_DIGITS = None
+    FORMAT_FRACTIONS = None
 
     def __init__(self):
         # Unit prefixes will only be used in strip, so we can strip spaces in one go.
@@ -77,8 +301,11 @@ class Parser(object):
         self.suffix_exp_map = {}  # Key: suffix, value: exponent
         self.exp_map_min = None
         self.exp_map_max = None
+        # Optional memoization, see enable_cache()
+        self.cache = None
 
         self._recompute_suffix_maps()
+        self._recompute_tokenizer_tables()
 
     def _recompute_suffix_maps(self):
         """
@@ -103,10 +330,38 @@ class Parser(object):
         self.exp_map_min = min(self.exp_suffix_map.keys())
         self.exp_map_max = max(self.exp_suffix_map.keys())
 
+    def _recompute_tokenizer_tables(self):
+        """
+        Recompute the tables used by split_input():
+        the unit lookup keyed by the last character of the unit and
+        the grammar of the numeric part, compiled from the character classes
+        of SUFFICES, NUM_CHARACTERS and UNIT_PREFIXES.
+        """
+        # Key: last character, value: units ending with it, longest first
+        self.unit_tail_map = {}
+        for unit in sorted(self.all_units, key=len, reverse=True):
+            self.unit_tail_map.setdefault(unit[-1], []).append(unit)
+
+        # Character sets used by parse_array to split "<number><tail>" strings
+        self.number_chars = "".join(sorted(Parser.NUM_CHARACTERS)) + ","
+        self.tail_chars = "".join(sorted(self.all_suffixes | set(self.strippable) |
+                                         set("".join(self.all_units)) | {" "}))
+
+        strip_class = re.escape(self.strippable.replace(" ", ""))
+        suffix_class = re.escape("".join(sorted(self.all_suffixes)))
+        digit_class = re.escape("".join(sorted(Parser.NUM_CHARACTERS - {"."})))
+        self.number_pattern = re.compile(
+            r"(?P<lead>[{s}]*)(?:"
+            # number with an optional trailing suffix, e.g. 1234.56k
+            r"(?P<num>[{d}.]*)[{s}]*(?P<suffix>[{x}]?)"
+            # suffix used as decimal separator, e.g. 1k234
+            r"|(?P<int>[{d}]*)(?P<mid>[{x}])(?P<frac>[{d}]+)"
+            r")[{s}]*".format(s=strip_class, x=suffix_class, d=digit_class))
+
     def split_input(self, s):
         """
         Separate a string into a 3-tuple (number, suffix, unit).
-        returns None if the string could not be parsed.
+        Raises ValueError if the string could not be parsed.
 
         The tuple will never contain None but empty strings if some
         element is not present. The number must be present for the string
@@ -120,44 +375,45 @@ class Parser(object):
         be mixed. Whitespace is removed automatically.
         """
         # Remove thousands separator & ensure dot is used
-        s = Parser._normalize_interpunctation(s).replace(" ", "")
+        if "," in s:
+            s = Parser._normalize_interpunctation(s)
+        if " " in s:
+            s = s.replace(" ", "")
 
         s, u = self.split_unit(s)
 
         if not s:
             raise ValueError("Can't split empty string")
 
-        # Try to find SI suffix at the end or in the middle
-        if s[-1] in self.all_suffixes:
-            s, suffix = s[:-1], s[-1]
-        else:  # Try to find unit anywhere
-            suffix_list = [ch in self.all_suffixes for ch in s]
-            suffix_count = sum(suffix_list)
-            
-            if suffix_count > 1:
-                raise ValueError("More than one SI suffix in the string")
-            elif suffix_count == 0:
-                suffix = ""
-            else:
-                # Suffix-as-decimal-separator --> there must be no other decimal separator
-                if "." in s:
-                    raise ValueError("Suffix as decimal separator, but dot is also in string: {0}".format(s))
-                suffix_index = suffix_list.index(True)
-                # Suffix must NOT be first character
-                if suffix_index == 0:
-                    raise ValueError("Suffix in '{0}' must not be the first char".format(s))
-                suffix = s[suffix_index]
-                s = s.replace(suffix, ".")
-        # Handle unit prefix (if any). Not allowable if no unit is present
-        s = s.strip(self.strippable)
-        # Final check: Is there any number left and is it valid?
-        if not all((ch in Parser.NUM_CHARACTERS for ch in s)):
-            raise ValueError("Remainder of string is not purely numeric: {0}".format(s))
+        # Single left to right pass over the numeric part
+        match = self.number_pattern.fullmatch(s)
+        if match is None:
+            raise ValueError(self._split_error(s))
+        mid = match.group("mid")
+        if mid is None:
+            num = match.group("num")
+            suffix = match.group("suffix")
+        else:
+            # Suffix must NOT be first character
+            if not match.group("int") and not match.group("lead"):
+                raise ValueError("Suffix in '{0}' must not be the first char".format(s))
+            num = match.group("int") + "." + match.group("frac")
+            suffix = mid
 
         # special case for R (R can be suffix, then the unit is implicitly R
         if u == "" and suffix == 'R':
             u = 'R'
-        return s, suffix, u
+        return num, suffix, u
+
+    def _split_error(self, s):
+        """
+        Explain why split_input() rejected the numeric part s.
+        """
+        if sum(ch in self.all_suffixes for ch in s) > 1:
+            return "More than one SI suffix in the string"
+        if s[-1] not in self.all_suffixes and any(ch in self.all_suffixes for ch in s) and "." in s:
+            return "Suffix as decimal separator, but dot is also in string: {0}".format(s)
+        return "Remainder of string is not purely numeric: {0}".format(s)
 
     def split_unit(self, s):
         """
@@ -168,17 +424,11 @@ class Parser(object):
         # Fallback for strings which are too short
         if len(s) <= 1:
             return s, ""
-        if s[-3:] in self.all_units:
-            s, u = s[:-3], s[-3:]
-        elif s[-2:] in self.all_units:
-            s, u = s[:-2], s[-2:]
-        elif s[-1] in self.all_units:
-            s, u = s[:-1], s[-1]
-        else:
-            s, u = s, ''
-        # Remove unit prefix, if any (e.g. degrees symbol, delta symbol)
-        s = s.rstrip(self.strippable)
-        return s, u
+        for u in self.unit_tail_map.get(s[-1], ()):
+            if s.endswith(u):
+                # Remove unit prefix, if any (e.g. degrees symbol, delta symbol)
+                return s[:-len(u)].rstrip(self.strippable), u
+        return s.rstrip(self.strippable), ''
 
     def normalize(self, s, encoding="utf8"):
         """
@@ -190,42 +440,395 @@ class Parser(object):
         See splitSuffixSeparator() for further details on supported formats
         """
         # Scalars get returned directly
-        if isinstance(s, (int, float, np.generic)):
+        if isinstance(s, (int, float)) or (is_loaded('numpy') and isinstance(s, np.generic)):
             return s, ''
         # Make sure it's a decoded string
         if isinstance(s, bytes):
             s = s.decode(encoding)
         # Handle lists / array
-        if isinstance(s, (list, tuple, np.ndarray)):
+        if isinstance(s, (list, tuple)) or (is_loaded('numpy') and isinstance(s, np.ndarray)):
             return [self.normalize(elem) for elem in s]
+        cache = self.cache
+        if cache is not None:
+            res = cache.get(('normalize', s))
+            if res is not None:
+                return res
         # Perform splitting
         num, suffix, u = self.split_input(s.strip())
         mul = (10 ** self.suffix_exp_map[suffix]) if suffix else 1
-        return float(num) * mul, u
+        res = float(num) * mul, u
+        if cache is not None:
+            cache.put(('normalize', s), res)
+        return res
 
     def normalize_pyspice(self, s, encoding='utf8'):
+        cache = self.cache
+        if cache is not None and isinstance(s, str):
+            res = cache.get(('normalize_pyspice', s))
+            if res is not None:
+                return res
         num, u = self.normalize(s, encoding)
         pyspice_u = Parser.PYSPICE_UNIT_MAP.get(u, None)
         if pyspice_u is None:
             raise ValueError('Cannot find corresponding PySpice unit')
 
-        return num, pyspice_u(num)
+        res = num, pyspice_u(num)
+        if cache is not None and isinstance(s, str):
+            cache.put(('normalize_pyspice', s), res)
+        return res
+
+    def normalize_spice(self, s):
+        """
+        Converts a SPICE number (e.g. 21.910E-9, 1MEG, 10uF, 2.2k) to a pair
+        (number, unit). Scale factors follow SPICE: case insensitive, M and m
+        are milli, MEG is mega. The letters after the number and its scale
+        factor are ignored by SPICE; unit is their canonical unit if they are
+        one (e.g. 'F', 'Ω'), '' otherwise.
+        Raises ValueError if s is not a SPICE number.
+        """
+        cache = self.cache
+        if cache is not None:
+            res = cache.get(('normalize_spice', s))
+            if res is not None:
+                return res
+        match = Parser.SPICE_NUMBER.fullmatch(s.strip())
+        if match is None:
+            raise ValueError("Not a SPICE number: {0}".format(s))
+        num, exponent, scale, tail = match.groups()
+        scale = (scale or '').lower()
+        # The scale factor goes into the exponent so that e.g. 10u is exactly 10e-6
+        n = float('{0}e{1}'.format(num, int(exponent or 0) + Parser.SPICE_SCALE.get(scale, 0)))
+        unit = AllUnits.convert_to_canonical((None, tail))[1] if tail in self.all_units else ''
+        res = n * Parser.SPICE_MIL if scale == 'mil' else n, unit
+        if cache is not None:
+            cache.put(('normalize_spice', s), res)
+        return res
+
+    def parse_array(self, arr, encoding="utf8"):
+        """
+        Converts a sequence or NumPy array of engineer's inputs in one call.
+
+        Returns a tuple (values, codes, errors) where values is a float64
+        array and codes is a uint8 array of unit codes (see AllUnits.unit_code),
+        both of the input's shape. errors is a list of (index, message) pairs,
+        index being the position in the flattened input. Elements that could
+        not be parsed get NaN and AllUnits.INVALID_CODE.
+
+        Every distinct string is parsed only once and the distinct strings are
+        grouped by shape:
+            <number><suffix><unit>  e.g. 4.7kΩ, 1,234.56k, 3.3V
+            <int><suffix><frac><unit>  e.g. 4k7, 1R2, 2µ2F
+        Both groups are handled with vectorized string operations, each distinct
+        suffix/unit tail being resolved only once. Everything else
+        (and everything that fails there) goes through normalize().
+        """
+        arr = np.asarray(arr)
+        if arr.dtype.kind in "biuf":
+            return (arr.astype(np.float64),
+                    np.full(arr.shape, AllUnits.NO_UNIT_CODE, dtype=np.uint8), [])
+        if arr.dtype.kind == "S":
+            arr = np.char.decode(arr, encoding)
+        elif arr.dtype.kind == "O":
+            arr = np.array([elem.decode(encoding) if isinstance(elem, bytes) else str(elem)
+                            for elem in arr.ravel()], dtype=str).reshape(arr.shape)
+
+        uniq, inverse = np.unique(arr.ravel(), return_inverse=True)
+        inverse = inverse.ravel()
+        uniq = np.char.strip(uniq)
+        values = np.full(len(uniq), np.nan)
+        codes = np.full(len(uniq), AllUnits.INVALID_CODE, dtype=np.uint8)
+        pending = np.ones(len(uniq), dtype=bool)
+
+        self._parse_number_tail_shape(uniq, values, codes, pending)
+        self._parse_decimal_suffix_shape(uniq, values, codes, pending)
+
+        # Remaining shapes and errors are handled one distinct string at a time
+        uniq_errors = {}
+        for i in np.flatnonzero(pending):
+            try:
+                n, u = self.normalize(str(uniq[i]))
+            except ValueError as e:
+                uniq_errors[i] = str(e)
+                continue
+            values[i] = n
+            codes[i] = AllUnits.unit_code(u)
+
+        errors = []
+        if uniq_errors:
+            bad = np.flatnonzero(np.isin(inverse, list(uniq_errors)))
+            errors = [(int(i), uniq_errors[inverse[i]]) for i in bad]
+        return values[inverse].reshape(arr.shape), codes[inverse].reshape(arr.shape), errors
+
+    def quantity(self, s, encoding="utf8"):
+        """
+        normalize() result as a Quantity. Raises ValueError for units Quantity has no code for.
+        """
+        return Quantity(*self.normalize(s, encoding))
+
+    def parse_quantities(self, arr, encoding="utf8", dtype='float64'):
+        """
+        parse_array() results as a QuantityArray of dtype values (float64 or
+        float32); returns (quantities, errors).
+        """
+        values, codes, errors = self.parse_array(arr, encoding)
+        return QuantityArray(values, codes, dtype), errors
+
+    def _parse_number_tail_shape(self, uniq, values, codes, pending):
+        """
+        parse_array() helper for strings made of a number (with optional
+        thousands separators) followed by a suffix and/or unit.
+        Fills values and codes in place and clears pending for parsed entries.
+        """
+        tail = np.char.lstrip(uniq, self.number_chars)
+        body = np.char.rstrip(uniq, self.tail_chars)
+        body_len = np.char.str_len(body)
+        idx = np.flatnonzero(pending & (body_len > 0) &
+                             (body_len + np.char.str_len(tail) == np.char.str_len(uniq)))
+        if not len(idx):
+            return
+        body = body[idx]
+        # Vectorized _normalize_interpunctation()
+        comma_idx = np.char.find(body, ",")
+        has_comma = comma_idx >= 0
+        if has_comma.any():
+            comma_first = comma_idx < np.char.find(body, ".")
+            sel = has_comma & comma_first
+            if sel.any():
+                body[sel] = np.char.replace(body[sel], ",", "")
+            sel = has_comma & ~comma_first
+            if sel.any():
+                body[sel] = np.char.replace(np.char.replace(body[sel], ".", ""), ",", ".")
+        mul, tail_codes = self._resolve_tails(tail[idx])
+        self._store_numbers(idx, body, mul, tail_codes, values, codes, pending)
+
+    def _parse_decimal_suffix_shape(self, uniq, values, codes, pending):
+        """
+        parse_array() helper for strings using the suffix as decimal
+        separator (e.g. 4k7, 1R2), optionally followed by a unit.
+        Fills values and codes in place and clears pending for parsed entries.
+        """
+        digits = self.number_chars.replace(".", "").replace(",", "")
+        rest = np.char.lstrip(uniq, digits)
+        suffix = rest.astype("U1")
+        idx = np.flatnonzero(pending & (np.char.str_len(rest) < np.char.str_len(uniq)) &
+                             np.isin(suffix, list(self.all_suffixes - {""})))
+        if not len(idx):
+            return
+        suffix = suffix[idx]
+        parts = np.char.partition(uniq[idx], suffix)
+        int_part, after = parts[..., 0], parts[..., 2]
+        tail = np.char.lstrip(after, digits)
+        frac = np.char.rstrip(after, self.tail_chars)
+        frac_len = np.char.str_len(frac)
+        ok = (frac_len > 0) & (frac_len + np.char.str_len(tail) == np.char.str_len(after))
+        if not ok.any():
+            return
+        idx, suffix, tail = idx[ok], suffix[ok], tail[ok]
+        number = np.char.add(np.char.add(int_part[ok], "."), frac[ok])
+        # The tail must be a bare unit here, the scale comes from the suffix
+        bare, bare_inverse = np.unique(np.char.lstrip(np.char.replace(tail, " ", ""), self.strippable),
+                                       return_inverse=True)
+        bare_codes = np.array([AllUnits.unit_code(u) if u in self.all_units or not u
+                               else AllUnits.INVALID_CODE for u in bare], dtype=np.uint8)
+        tail_codes = bare_codes[bare_inverse.ravel()]
+        suffix_mul = np.array([10.0 ** self.suffix_exp_map[x] if x != 'R' else 1 for x in suffix])
+        # special case for R (R can be suffix, then the unit is implicitly R)
+        r_unit = (suffix == 'R') & (tail_codes == AllUnits.NO_UNIT_CODE)
+        tail_codes[r_unit] = AllUnits.unit_code('R')
+        self._store_numbers(idx, number, suffix_mul, tail_codes, values, codes, pending)
+
+    def _resolve_tails(self, tails):
+        """
+        Resolve an array of suffix/unit tails into (multipliers, unit codes),
+        normalizing every distinct tail only once.
+        Unresolvable tails get AllUnits.INVALID_CODE.
+        """
+        distinct, tail_inverse = np.unique(tails, return_inverse=True)
+        mul = np.ones(len(distinct))
+        tail_codes = np.full(len(distinct), AllUnits.INVALID_CODE, dtype=np.uint8)
+        for i, t in enumerate(distinct):
+            try:
+                m, u = self.normalize("1" + str(t))
+            except ValueError:
+                continue
+            mul[i] = m
+            tail_codes[i] = AllUnits.unit_code(u)
+        tail_inverse = tail_inverse.ravel()
+        return mul[tail_inverse], tail_codes[tail_inverse]
+
+    @staticmethod
+    def _store_numbers(idx, numbers, mul, num_codes, values, codes, pending):
+        """
+        Convert numeric strings and store number * mul into values[idx].
+        Entries with an invalid code or a malformed number are left pending.
+        """
+        ok = num_codes != AllUnits.INVALID_CODE
+        idx, numbers, mul, num_codes = idx[ok], numbers[ok], mul[ok], num_codes[ok]
+        try:
+            floats = numbers.astype(np.float64)
+        except ValueError:
+            # At least one malformed number, fall back to converting one by one
+            floats = np.full(len(numbers), np.nan)
+            for i, n in enumerate(numbers):
+                try:
+                    floats[i] = float(n)
+                except ValueError:
+                    pass
+            ok = ~np.isnan(floats)
+            idx, floats, mul, num_codes = idx[ok], floats[ok], mul[ok], num_codes[ok]
+        values[idx] = floats * mul
+        codes[idx] = num_codes
+        pending[idx] = False
 
     def format(self, v, unit_symbol=""):
         """
         Format v using SI suffices with optional units.
         Produces a string with 3 visible digits.
+        v may be a Quantity, its unit is used if unit_symbol is not given.
         """
+        if isinstance(v, Quantity):
+            v, unit_symbol = v.value, unit_symbol or v.unit
+        # Zero is not cached: 0.0 and -0.0 are the same key but format differently
+        cache = self.cache if v != 0. else None
+        if cache is not None:
+            res = cache.get(('format', v, unit_symbol))
+            if res is not None:
+                return res
         # Suffix map is indexed by one third of the decadic logarithm.
-        exp = 0 if v == 0. else math.log(abs(v), 10.)
+        exp = 0 if v == 0. else math.log10(abs(v))
         suffixMapIdx = int(math.floor(exp / 3.))
         # Ensure we're in range
         if not self.exp_map_min < suffixMapIdx < self.exp_map_max:
             raise ValueError("Value out of range: {0}".format(v))
         # Pre-multiply the value
-        v = v * (10.0 ** -(suffixMapIdx * 3))
+        scaled = v * (10.0 ** -(suffixMapIdx * 3))
         # Delegate the rest of the task to the helper
-        return Parser._format_with_suffix(v, self.exp_suffix_map[suffixMapIdx] + unit_symbol)
+        res = Parser._format_with_suffix(scaled, self.exp_suffix_map[suffixMapIdx] + unit_symbol)
+        if cache is not None:
+            cache.put(('format', v, unit_symbol), res)
+        return res
+
+    def format_array(self, arr, unit_symbol="", shared_suffix=False):
+        """
+        Format a whole array of values, see format().
+
+        If shared_suffix is False every element gets its own suffix (vectorized
+        equivalent of format()), otherwise all elements share the suffix chosen
+        by auto_suffix_1d().
+
+        Returns a tuple (strings, errors) where strings is a str array of the
+        input's shape and errors is a list of (index, message) pairs, index
+        being the position in the flattened input. Values which cannot be
+        formatted (out of range, NaN, inf) are reported there and left empty.
+
+        arr may be a QuantityArray: unless unit_symbol is given, its values
+        are formatted with their own units, one shared suffix per unit.
+        """
+        if isinstance(arr, QuantityArray):
+            if not unit_symbol:
+                return self._format_quantities(arr, shared_suffix)
+            arr = arr.values
+        arr = np.asarray(arr, dtype=np.float64)
+        strings, errors = [], []
+        for _, chunk_strings, chunk_errors in self.iter_format_array(arr, unit_symbol, shared_suffix,
+                                                                      chunk_size=max(arr.size, 1)):
+            strings.append(chunk_strings)
+            errors.extend(chunk_errors)
+        return np.concatenate(strings).reshape(arr.shape), errors
+
+    def iter_format_array(self, arr, unit_symbol="", shared_suffix=False, chunk_size=65536):
+        """
+        Streaming variant of format_array().
+        Yields tuples (offset, strings, errors) for consecutive chunks of the
+        flattened input; offset is the flat index of the first element of the
+        chunk and error indices are absolute.
+        A QuantityArray must hold values of a single unit.
+        """
+        if isinstance(arr, QuantityArray):
+            arr, unit_symbol = arr.values, unit_symbol or arr.unit
+        flat = np.asarray(arr, dtype=np.float64).ravel()
+        multiplier = suffix = None
+        if shared_suffix:
+            finite = flat[np.isfinite(flat)]
+            with np.errstate(divide='ignore'):
+                multiplier, suffix = self.auto_suffix_1d(finite) if finite.size else (1.0, "")
+        for offset in range(0, max(flat.size, 1), chunk_size):
+            chunk = flat[offset:offset + chunk_size]
+            strings, bad = self._format_chunk(chunk, unit_symbol, multiplier, suffix)
+            errors = [(offset + int(i), "Value out of range: {0}".format(chunk[i]))
+                      for i in np.flatnonzero(bad)]
+            yield offset, strings, errors
+
+    def _format_quantities(self, arr, shared_suffix):
+        """
+        format_array() of a QuantityArray, the values of every unit code formatted with that unit.
+        """
+        codes = arr.codes.ravel()
+        present = np.flatnonzero(np.bincount(codes, minlength=1))
+        if len(present) <= 1:
+            code = int(present[0]) if len(present) else AllUnits.NO_UNIT_CODE
+            unit = '' if code == AllUnits.INVALID_CODE else AllUnits.code_unit(code)
+            return self.format_array(arr.values, unit, shared_suffix)
+        values = arr.values.ravel()
+        parts, errors = [], []
+        for code in present.tolist():
+            idx = np.flatnonzero(codes == code)
+            unit = '' if code == AllUnits.INVALID_CODE else AllUnits.code_unit(code)
+            strings, part_errors = self.format_array(values[idx], unit, shared_suffix)
+            parts.append((idx, strings))
+            errors.extend((int(idx[i]), message) for i, message in part_errors)
+        res = np.empty(values.shape, dtype=max(strings.dtype for _, strings in parts))
+        for idx, strings in parts:
+            res[idx] = strings
+        return res.reshape(arr.shape), sorted(errors)
+
+    def _format_chunk(self, v, unit_symbol, multiplier=None, suffix=None):
+        """
+        format_array() helper, formats a 1-D float array.
+        Uses the given multiplier and suffix for all elements or, if they
+        are None, picks the suffix per element.
+        Returns the str array and a mask of the elements which could not be formatted.
+        """
+        bad = ~np.isfinite(v)
+        if multiplier is None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                exp = np.where(v == 0., 0., np.log10(np.abs(v)))
+            idx = np.floor(exp / 3.)
+            bad |= ~((self.exp_map_min < idx) & (idx < self.exp_map_max))
+            idx = np.where(bad, 0, idx).astype(np.intp) - self.exp_map_min
+            # Same factors and suffixes as format(), indexed by suffix map index
+            exps = range(self.exp_map_min, self.exp_map_max + 1)
+            factors = np.array([10.0 ** -(i * 3) for i in exps])
+            suffixes = np.array([" " + self.exp_suffix_map[i] + unit_symbol
+                                 if self.exp_suffix_map[i] + unit_symbol else "" for i in exps])
+            scaled = v * factors[idx]
+            tails = suffixes[idx]
+        else:
+            scaled = v * multiplier
+            tails = " " + suffix + unit_symbol if suffix + unit_symbol else ""
+        scaled[bad] = 0.
+        # Vectorized _format_with_suffix(): 3 visible digits
+        two = scaled < 10.0
+        one = ~two & (scaled < 100.0)
+        zero = ~two & ~one
+        parts = [(sel, Parser._format_fixed(scaled[sel], decimals))
+                 for decimals, sel in ((2, two), (1, one), (0, zero)) if sel.any()]
+        numbers = np.empty(v.shape, dtype=max([part.dtype for _, part in parts] or [np.dtype("U1")]))
+        for sel, part in parts:
+            numbers[sel] = part
+        strings = np.char.add(numbers, tails)
+        strings[bad] = ""
+        return strings, bad
+
+    def enable_cache(self, maxsize=4096, policy=LruCache.LRU):
+        """
+        Memoize normalize(), normalize_pyspice() and format() results
+        in a bounded cache (see LruCache). Inputs raising ValueError are never cached.
+        """
+        self.cache = LruCache(maxsize, policy)
+
+    def disable_cache(self):
+        self.cache = None
 
     def auto_suffix_1d(self, arr):
         """
@@ -275,6 +878,39 @@ class Parser(object):
         else:
             return s
 
+    @staticmethod
+    def _format_tables():
+        if Parser.FORMAT_DIGITS is None:
+            Parser.FORMAT_FRACTIONS = {1: np.array([str(i) for i in range(10)]),
+                                       2: np.array(["{:02d}".format(i) for i in range(100)])}
+            Parser.FORMAT_DIGITS = np.array([str(i) for i in range(1001)])
+        return Parser.FORMAT_DIGITS, Parser.FORMAT_FRACTIONS
+
+    @staticmethod
+    def _format_fixed(v, decimals):
+        """
+        Vectorized "{:.<decimals>f}".format(v) for an array of values.
+        Digits are looked up from precomputed string tables; values outside the
+        tables or whose scaled fraction is too close to a rounding tie are
+        formatted exactly with np.char.mod.
+        """
+        table, fractions = Parser._format_tables()
+        scale = 10 ** decimals
+        scaled = np.abs(v) * scale
+        exact = ~(scaled < (len(table) - 1) * scale)
+        if decimals:
+            exact |= np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+        digits = np.rint(np.where(exact, 0., scaled)).astype(np.int64)
+        res = table[digits // scale]
+        if decimals:
+            res = np.char.add(np.char.add(res, "."), fractions[decimals][digits % scale])
+        res = np.char.add(np.where(np.signbit(v), "-", ""), res)
+        if exact.any():
+            exact_res = np.char.mod("%.{0}f".format(decimals), v[exact])
+            res = res.astype(np.promote_types(res.dtype, exact_res.dtype))
+            res[exact] = exact_res
+        return res
+
     @staticmethod
     def _format_with_suffix(v, suffix=""):
         """
@@ -300,12 +936,84 @@ def parse(s, encoding="utf8"):
     return Parser.instance.normalize(s)
 
 
+def parse_spice(s):
+    return Parser.instance.normalize_spice(s)
+
+
+def parse_array(arr, encoding="utf8"):
+    return Parser.instance.parse_array(arr, encoding)
+
+
+def quantity(s, encoding="utf8"):
+    return Parser.instance.quantity(s, encoding)
+
+
+def parse_quantities(arr, encoding="utf8", dtype='float64'):
+    return Parser.instance.parse_quantities(arr, encoding, dtype)
+
+
+def grid(*quantities):
+    """
+    Spread 1-D (value, unit) quantities over separate axes so that the
+    calculators evaluate every combination of them (outer product), e.g.
+    50 voltages and 10 000 resistances give a 50x10 000 current matrix:
+        >>> v, r = grid((np.linspace(1, 5, 50), 'V'), (np.arange(1, 10001), 'Ω'))
+        >>> ohm_law.play(v, r)[0].shape
+        (50, 10000)
+
+    Scalar quantities are returned unchanged and do not take an axis.
+    Quantity and QuantityArray arguments are returned as (value, unit) pairs,
+    float arrays keep their precision.
+    """
+    quantities = [q.pair() if isinstance(q, (Quantity, QuantityArray)) else q for q in quantities]
+    values = [v if isinstance(v, np.ndarray) and v.dtype.kind == 'f' else
+              np.asarray(v, dtype=np.float64) if isinstance(v, (list, tuple, np.ndarray)) else v
+              for v, _ in quantities]
+    ndim = sum(1 for v in values if isinstance(v, np.ndarray))
+    res = []
+    axis = 0
+    for v, (_, u) in zip(values, quantities):
+        if isinstance(v, np.ndarray):
+            shape = [1] * ndim
+            shape[axis] = v.size
+            v = v.reshape(shape)
+            axis += 1
+        res.append((v, u))
+    return res
+
+
 def format_simple(v, unit_symbol=""):
     return Parser.instance.format(v, unit_symbol)
 
 
+def format_array(arr, unit_symbol="", shared_suffix=False):
+    return Parser.instance.format_array(arr, unit_symbol, shared_suffix)
+
+
 def format_verbose(v, unit_symbol=""):
+    if isinstance(v, Quantity):
+        v, unit_symbol = v.value, unit_symbol or v.unit
     return "{0} ({1} {2})".format(Parser.instance.format(v, unit_symbol),
                                   v, unit_symbol)
 
 
+def enable_cache(maxsize=4096, policy=LruCache.LRU):
+    Parser.instance.enable_cache(maxsize, policy)
+
+
+def disable_cache():
+    Parser.instance.disable_cache()
+
+
+def cache_info():
+    """
+    Returns CacheInfo(hits, misses, evictions, maxsize, currsize) or None if caching is disabled.
+    """
+    cache = Parser.instance.cache
+    return cache.info() if cache is not None else None
+
+
+def cache_clear():
+    cache = Parser.instance.cache
+    if cache is not None:
+        cache.clear()
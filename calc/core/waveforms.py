@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar storage of PySpice analyses.
+
+An analysis is described by a small JSON header (analysis class, abscissa,
+waveform names, groups and units) and one array per vector. The header and
+the columns are shared by the simulation cache (core.simcache, one .npz per
+simulation) and by the waveform store below.
+
+A waveform store is a directory holding meta.json and one .npy file per
+vector. Readers memory-map only the vectors they use, so multi-gigabyte
+transients can be sliced without loading them:
+
+    >>> save('rect.wf', analysis)
+    >>> store = WaveformStore('rect.wf')
+    >>> store.names
+    ['in', 'output', 'vinput']
+    >>> begin, end = store.window(0.01, 0.02)          # time range -> index range
+    >>> ripple = store['output'][begin:end].ptp()      # only these pages are read
+    >>> analysis = store.to_analysis(['output'])       # PySpice analysis, no copy
+
+Large vectors can also be written chunk by chunk with StoreWriter.
+"""
+import json
+import os
+import numpy as np
+
+# Waveform groups and abscissa properties of a PySpice analysis
+GROUPS = ('nodes', 'branches', 'elements', 'internal_parameters')
+ABSCISSAS = ('sweep', 'time', 'frequency')
+META_FILE = 'meta.json'
+
+
+def unit_names(waveform):
+    """
+    Returns [unit class name, power class name] of a PySpice waveform ('' if none).
+    """
+    prefixed_unit = getattr(waveform, 'prefixed_unit', None)
+    if prefixed_unit is None or prefixed_unit.unit is None:
+        return ['', '']
+    power = prefixed_unit.power
+    return [type(prefixed_unit.unit).__name__, type(power).__name__ if power is not None else '']
+
+
+def as_waveform(name, data, units, abscissa=None, copy=True):
+    """
+    Returns data as a PySpice WaveForm with the units given by unit_names().
+    If copy is False the waveform is a view of data (e.g. of a memory map).
+    """
+    from PySpice.Probe.WaveForm import WaveForm
+    from PySpice.Unit import SiUnits, Unit
+    unit, power = units
+    prefixed_unit = None
+    if unit:
+        # Units and powers are defined in SiUnits, the zero power in Unit
+        unit_class = lambda name: getattr(SiUnits, name, None) or getattr(Unit, name)
+        prefixed_unit = Unit.PrefixedUnit(unit_class(unit)(), unit_class(power)() if power else None)
+    if copy:
+        waveform = WaveForm(name, prefixed_unit, data.shape, dtype=data.dtype, abscissa=abscissa)
+        waveform[...] = data
+        return waveform
+    waveform = data.view(WaveForm)
+    waveform._prefixed_unit = prefixed_unit
+    waveform._name = str(name)
+    waveform._title = None
+    waveform._abscissa = abscissa
+    return waveform
+
+
+def describe(analysis):
+    """
+    Returns (meta, columns) of a PySpice analysis: the JSON serializable header
+    and a dict of column key -> array ('abscissa', '<group>_<index>').
+    """
+    columns = {}
+    meta = {'analysis': type(analysis).__name__, 'abscissa': None, 'groups': {}}
+    for abscissa in ABSCISSAS:
+        # Properties of the analysis class; other names are looked up as waveforms
+        if hasattr(type(analysis), abscissa):
+            waveform = getattr(analysis, abscissa)
+            meta['abscissa'] = [abscissa, unit_names(waveform)]
+            columns['abscissa'] = np.asarray(waveform).view(np.ndarray)
+    for group in GROUPS:
+        meta['groups'][group] = []
+        for i, (name, waveform) in enumerate(getattr(analysis, group, {}).items()):
+            meta['groups'][group].append([str(name), unit_names(waveform)])
+            columns['{0}_{1}'.format(group, i)] = np.asarray(waveform).view(np.ndarray)
+    return meta, columns
+
+
+def build_analysis(meta, column, simulation=None, names=None, copy=True):
+    """
+    Rebuilds the PySpice analysis described by meta; column(key) returns the
+    array of a column. Only the waveforms in names (default: all) are loaded.
+    """
+    from PySpice.Probe import WaveForm as analyses
+    cls = getattr(analyses, meta['analysis'])
+    analysis = cls.__new__(cls)
+    abscissa = None
+    if meta['abscissa'] is not None:
+        name, units = meta['abscissa']
+        abscissa = as_waveform(name, column('abscissa'), units, copy=copy)
+        setattr(analysis, '_' + name, abscissa)
+    groups = {}
+    for group in GROUPS:
+        groups[group] = [as_waveform(name, column('{0}_{1}'.format(group, i)), units,
+                                     abscissa if group in ('nodes', 'branches') else None, copy)
+                         for i, (name, units) in enumerate(meta['groups'].get(group, []))
+                         if names is None or name in names]
+    analyses.Analysis.__init__(analysis, simulation, **groups)
+    return analysis
+
+
+class StoreWriter(object):
+    """
+    Writes a waveform store column by column. Columns are memory-mapped .npy
+    files which can be filled in chunks:
+
+        >>> writer = StoreWriter('run.wf', 'TransientAnalysis', ('time', ['Second', '']), length=10**9)
+        >>> time = writer.column('abscissa')
+        >>> out = writer.add('nodes', 'out', ['Volt', ''])
+        >>> for begin, t, v in chunks:
+        ...     time[begin:begin + len(t)] = t
+        ...     out[begin:begin + len(v)] = v
+        >>> writer.close()
+
+    The store is readable once close() has written its header.
+    """
+    def __init__(self, path, analysis, abscissa=None, length=None, dtype=np.float64):
+        """
+        analysis is the PySpice analysis class name, abscissa a (name, units) pair.
+        length and dtype are the defaults of the columns.
+        """
+        self.path = path
+        self.length = length
+        self.dtype = dtype
+        self.meta = {'analysis': analysis, 'abscissa': list(abscissa) if abscissa else None,
+                     'groups': {group: [] for group in GROUPS}, 'columns': {}}
+        self._columns = {}
+        os.makedirs(path, exist_ok=True)
+        # A previous header would describe other columns
+        if os.path.exists(os.path.join(path, META_FILE)):
+            os.unlink(os.path.join(path, META_FILE))
+
+    def column(self, key, data=None, shape=None, dtype=None):
+        """
+        Returns the writable memory map of column key, created from data or
+        with the given shape (default: (length,)) and dtype.
+        """
+        if key in self._columns:
+            return self._columns[key]
+        if data is not None:
+            data = np.asarray(data)
+            shape, dtype = data.shape, data.dtype
+        shape = shape if shape is not None else (self.length,)
+        dtype = np.dtype(dtype if dtype is not None else self.dtype)
+        filename = key + '.npy'
+        column = np.lib.format.open_memmap(os.path.join(self.path, filename), mode='w+', dtype=dtype,
+                                           shape=shape)
+        if data is not None:
+            column[...] = data
+        self._columns[key] = column
+        self.meta['columns'][key] = {'file': filename, 'dtype': dtype.str, 'shape': list(shape)}
+        return column
+
+    def add(self, group, name, units, data=None, shape=None, dtype=None):
+        """
+        Adds the waveform name to group ('nodes', 'branches', ...) and returns its column.
+        """
+        waveforms = self.meta['groups'][group]
+        key = '{0}_{1}'.format(group, len(waveforms))
+        waveforms.append([str(name), list(units)])
+        return self.column(key, data, shape, dtype)
+
+    def close(self):
+        for column in self._columns.values():
+            column.flush()
+        self._columns = {}
+        tmp = os.path.join(self.path, META_FILE + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.meta, f, indent=1)
+        os.replace(tmp, os.path.join(self.path, META_FILE))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+
+
+def save(path, analysis):
+    """
+    Writes a PySpice analysis to a waveform store in directory path.
+    """
+    meta, columns = describe(analysis)
+    with StoreWriter(path, meta['analysis'], meta['abscissa']) as writer:
+        if 'abscissa' in columns:
+            writer.column('abscissa', columns['abscissa'])
+        for group in GROUPS:
+            for i, (name, units) in enumerate(meta['groups'][group]):
+                writer.add(group, name, units, columns['{0}_{1}'.format(group, i)])
+
+
+class WaveformStore(object):
+    """
+    Read-only view of a waveform store; columns are memory-mapped on first use.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        # name -> column key, nodes first like PySpice analyses
+        self._keys = {}
+        for group in GROUPS:
+            for i, (name, _) in enumerate(self.meta['groups'].get(group, [])):
+                self._keys.setdefault(name, '{0}_{1}'.format(group, i))
+        self._units = {key: units for group in GROUPS
+                       for key, (_, units) in (('{0}_{1}'.format(group, i), w)
+                                               for i, w in enumerate(self.meta['groups'].get(group, [])))}
+        self._maps = {}
+
+    @property
+    def analysis(self):
+        return self.meta['analysis']
+
+    @property
+    def names(self):
+        return list(self._keys)
+
+    def column(self, key):
+        """
+        Returns the read-only memory map of a column.
+        """
+        res = self._maps.get(key)
+        if res is None:
+            info = self.meta['columns'][key]
+            res = self._maps[key] = np.load(os.path.join(self.path, info['file']), mmap_mode='r')
+        return res
+
+    def _key(self, name):
+        key = self._keys.get(name)
+        if key is None:
+            # Same fallback as PySpice analyses
+            key = self._keys.get(name.lower())
+        if key is None:
+            raise KeyError(name)
+        return key
+
+    def __getitem__(self, name):
+        return self.column(self._key(name))
+
+    def __contains__(self, name):
+        return name in self._keys or name.lower() in self._keys
+
+    @property
+    def abscissa(self):
+        """
+        Memory map of the abscissa (time, frequency or sweep) or None.
+        """
+        return self.column('abscissa') if self.meta['abscissa'] is not None else None
+
+    def window(self, start=None, stop=None):
+        """
+        Returns the index range (begin, end) of the abscissa values in [start, stop).
+        The abscissa must be increasing (time, frequency, increasing sweeps).
+        """
+        abscissa = self.abscissa
+        begin = 0 if start is None else int(np.searchsorted(abscissa, start, 'left'))
+        end = len(abscissa) if stop is None else int(np.searchsorted(abscissa, stop, 'left'))
+        return begin, end
+
+    def waveform(self, name):
+        """
+        Returns a PySpice WaveForm viewing the mapped column (no copy).
+        """
+        key = self._key(name)
+        abscissa = None
+        if self.meta['abscissa'] is not None and not key.startswith(('elements', 'internal_parameters')):
+            abscissa = as_waveform(self.meta['abscissa'][0], self.abscissa, self.meta['abscissa'][1], copy=False)
+        return as_waveform(name, self.column(key), self._units[key], abscissa, copy=False)
+
+    def to_analysis(self, names=None, simulation=None):
+        """
+        Returns a PySpice analysis holding the waveforms in names (default: all),
+        viewing the mapped columns.
+        """
+        return build_analysis(self.meta, self.column, simulation, names, copy=False)
@@ -2,14 +2,19 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import sys
 import numpy as np
 from core import units
+from core import batch
+from core import instrument
 from core.units import AllUnits as U
 
 
 
 
 def play(u1, u2):
+    u1 = U.convert_to_canonical(u1)
+    u2 = U.convert_to_canonical(u2)
     reference = u1[0]
     measured = u2[0]
     power = 10.0 * np.log10(measured / reference)
@@ -17,14 +22,30 @@ def play(u1, u2):
     return power, amplitude
 
 
+def play_db(u1, u2):
+    """
+    play() results as (value, unit) pairs.
+    """
+    power, amplitude = play(u1, u2)
+    return (power, 'dB'), (amplitude, 'dB')
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.description = """
 Calculate ratio in decibels
     """
-    parser.add_argument("arg1", help='Reference numeric value (No units are expected)')
-    parser.add_argument("arg2", help='Measured numeric value (No units are expected)')
+    parser.add_argument("arg1", nargs='?', help='Reference numeric value (No units are expected)')
+    parser.add_argument("arg2", nargs='?', help='Measured numeric value (No units are expected)')
+    batch.add_arguments(parser)
+    instrument.add_arguments(parser)
     args = parser.parse_args()
+    instrument.start(args)
+
+    if args.batch:
+        sys.exit(batch.main(args, play_db, 2))
+    if args.arg1 is None or args.arg2 is None:
+        parser.error('2 arguments are required unless --batch is used')
 
     arg1 = units.parse(args.arg1)
     arg2 = units.parse(args.arg2)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import sys
+from core import impedance
+from core import units
+from core import instrument
+from core.units import AllUnits as U
+
+
+def parse_points(s):
+    # '1e6' as well as '1M'
+    try:
+        return int(float(s))
+    except ValueError:
+        return int(units.parse(s)[0])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.description = """
+Impedance of a network of R, L and C over a log-spaced frequency sweep, with its resonances,
+-3 dB bandwidths and Q. '+' connects in series, '|' (or '||') in parallel and binds tighter.
+For example: freq_response.py "10R + 1mH + 100nF"
+             freq_response.py "50R + (1mH | 100nF)" --start 10Hz --stop 10MHz --points 1e6 --table 20
+    """
+    parser.add_argument("network", help='Network, values with their unit, e.g. "1kR | (1mH + 10nF)"')
+    parser.add_argument("--start", default='10Hz', help='First frequency (default: 10Hz)')
+    parser.add_argument("--stop", default='10MHz', help='Last frequency (default: 10MHz)')
+    parser.add_argument("--points", type=parse_points, default=10**5, help='Number of points (default: 1e5)')
+    parser.add_argument("--table", type=int, default=0, metavar='ROWS', help='Print ROWS points of the response')
+    parser.add_argument("--level", action='append', default=[],
+                        help='Print the frequencies where |Z| crosses the level, e.g. 50R (repeatable)')
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    instrument.start(args)
+
+    try:
+        network = impedance.parse(args.network)
+        start, stop = [U.convert_to_canonical(units.parse(v)) for v in (args.start, args.stop)]
+        levels = [U.convert_to_canonical(units.parse(v if v[-1:].isalpha() else v + 'R')) for v in args.level]
+        if start[1] not in (U.Hz, '') or stop[1] not in (U.Hz, ''):
+            raise ValueError('--start and --stop are frequencies')
+        response = impedance.sweep(network, start[0], stop[0], args.points)
+    except (ValueError, KeyError) as e:
+        parser.error(str(e))
+    print(response.summary())
+    for value, unit in levels:
+        crossings = response.crossings(value)
+        print('|Z| = {0} at: {1}'.format(units.format_simple(value, U.R),
+                                         ', '.join(units.format_simple(f, U.Hz) for f in crossings) or 'none'))
+    if args.table:
+        print(response.table(args.table))
+    sys.exit(0)
@@ -2,8 +2,11 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import sys
 import numpy as np
 from core import units
+from core import batch
+from core import instrument
 from core.units import AllUnits as U
 
 
@@ -54,9 +57,17 @@ if __name__ == "__main__":
     parser.description = """
 Calculate a resonant frequency of LC circuit using the following formula: f=1/(2pi*sqrt(LC))
     """
-    parser.add_argument("arg1", help='It can be any of these three units: Hz, F or H')
-    parser.add_argument("arg2", help='It can be any of these three units: Hz, F or H')
+    parser.add_argument("arg1", nargs='?', help='It can be any of these three units: Hz, F or H')
+    parser.add_argument("arg2", nargs='?', help='It can be any of these three units: Hz, F or H')
+    batch.add_arguments(parser)
+    instrument.add_arguments(parser)
     args = parser.parse_args()
+    instrument.start(args)
+
+    if args.batch:
+        sys.exit(batch.main(args, lambda *args: [play(*args)], 2))
+    if args.arg1 is None or args.arg2 is None:
+        parser.error('2 arguments are required unless --batch is used')
 
     arg1 = units.parse(args.arg1)
     arg2 = units.parse(args.arg2)
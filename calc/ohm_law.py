@@ -2,7 +2,10 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import sys
 from core import units
+from core import batch
+from core import instrument
 from core.units import AllUnits as U
 
 
@@ -47,26 +50,47 @@ def play(u1, u2):
 
 
 def calc_power(*arg):
+    u = i = None
     for a in arg:
+        a = U.convert_to_canonical(a)
         if a[1] == U.A:
             i = a[0]
             continue
         if a[1] == U.V:
             u = a[0]
             continue
+    if u is None or i is None:
+        raise ValueError('Power requires a voltage [{0}] and a current [{1}]'.format(U.V, U.A))
     return u * i, U.W
 
 
+def play_with_power(u1, u2):
+    """
+    Returns the Ohm law result followed by the power dissipation.
+    """
+    res = play(u1, u2)
+    return res, calc_power(u1, u2, res)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.description = """
 Provide a pair of values of the following units: V, A or Ω and the program will calculate the result according
 to the Ohm law: I = V/R. The resistance unit Ω can be omitted.
 For example: ohm_law.py 10mA 4k7
+Many pairs can be computed at once from CSV/TSV rows: ohm_law.py --batch pairs.csv
     """
-    parser.add_argument("arg1", help='It can be any of these three units: V, A or Ω')
-    parser.add_argument("arg2", help='It can be any of these three units: V, A or Ω')
+    parser.add_argument("arg1", nargs='?', help='It can be any of these three units: V, A or Ω')
+    parser.add_argument("arg2", nargs='?', help='It can be any of these three units: V, A or Ω')
+    batch.add_arguments(parser)
+    instrument.add_arguments(parser)
     args = parser.parse_args()
+    instrument.start(args)
+
+    if args.batch:
+        sys.exit(batch.main(args, play_with_power, 2))
+    if args.arg1 is None or args.arg2 is None:
+        parser.error('2 arguments are required unless --batch is used')
 
     arg1 = units.parse(args.arg1)
     arg2 = units.parse(args.arg2)
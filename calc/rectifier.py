@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import itertools
+import sys
+import numpy as np
+from core import units
+from core import rectifier
+from core import instrument
+from core.units import AllUnits as U
+
+# Positional argument unit -> steady_state() argument
+PARAMETERS = {U.V: 'amplitude', U.Hz: 'frequency', U.R: 'load', U.F: 'capacitance'}
+
+
+def parse_values(s):
+    """
+    Returns (values, unit) of a comma separated list of values of one unit, e.g. '100R,1k'.
+    """
+    values, unit = [], None
+    for item in s.split(','):
+        v, u = U.convert_to_canonical(units.parse(item))
+        unit = unit or u
+        if u not in ('', unit):
+            raise ValueError('mixed units in {0}'.format(s))
+        values.append(v)
+    return values, unit
+
+
+def parameters(args):
+    res = {}
+    for arg in args:
+        values, unit = parse_values(arg)
+        if unit not in PARAMETERS:
+            raise ValueError('{0}: expected one of the units {1}'.format(arg, ', '.join(PARAMETERS)))
+        res[PARAMETERS[unit]] = values
+    return res
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.description = """
+Steady state of a capacitor-input rectifier (half-wave or full-wave bridge) from the source amplitude
+and frequency, the load and the filter capacitor, or the smallest capacitor for a ripple target.
+Values can be comma separated lists; every combination is computed.
+For example: rectifier.py half 10V 50Hz 100R 1mF
+             rectifier.py bridge 10V,20V 50Hz,60Hz 100R 470uF,1mF --drop 1V
+             rectifier.py bridge 10V 50Hz 100R --ripple 0.5V --series E6
+    """
+    parser.add_argument("kind", choices=list(rectifier.KINDS))
+    parser.add_argument("values", nargs='+', help='Source amplitude [V], frequency [Hz], load [Ω] and filter '
+                                                  'capacitance [F] (omitted with --ripple), in any order')
+    parser.add_argument("--drop", default='0.7V', help='Forward drop of one diode (default: 0.7V)')
+    parser.add_argument("--ripple", help='Ripple target: print the smallest capacitance reaching it')
+    parser.add_argument("--series", help='With --ripple, round up to a value of this E-series, e.g. E12')
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    instrument.start(args)
+
+    try:
+        params = parameters(args.values)
+        drop = units.parse(args.drop)[0]
+        ripple = parse_values(args.ripple)[0] if args.ripple else None
+    except (ValueError, KeyError) as e:
+        parser.error(str(e))
+    required = ['amplitude', 'frequency', 'load'] + ([] if ripple else ['capacitance'])
+    missing = [p for p in required if p not in params]
+    if missing:
+        parser.error('missing {0}'.format(', '.join(missing)))
+
+    names = sorted(params, key=required.index) + (['ripple'] if ripple else [])
+    grid = list(itertools.product(*[params[n] for n in names[:len(params)]] + ([ripple] if ripple else [])))
+    columns = [np.array(c) for c in zip(*grid)]
+    point = dict(zip(names, columns))
+    unit_of = dict((name, unit) for unit, name in PARAMETERS.items())
+    unit_of['ripple'] = U.V
+    labels = [' '.join(units.format_simple(v, unit_of[n]) for v, n in zip(values, names)) for values in grid]
+    if ripple:
+        c = rectifier.min_capacitance(args.kind, point['ripple'], point['amplitude'], point['frequency'],
+                                      point['load'], drop, args.series)
+        for label, value in zip(labels, np.atleast_1d(c)):
+            print('{0}: C >= {1}'.format(label, 'unreachable' if np.isnan(value) else
+                                         units.format_simple(value, U.F)))
+        sys.exit(0)
+    res = rectifier.steady_state(args.kind, point['amplitude'], point['frequency'], point['load'],
+                                 point['capacitance'], drop)
+    for i, label in enumerate(labels):
+        print('{0}: ripple {1}, V_dc {2} (V_max {3}, V_min {4}), conduction {5:.1f}°, diode current peak {6}, '
+              'average {7}'.format(label, *[units.format_simple(v[i], U.V) for v in res[:4]] +
+                                   [res.conduction[i]] +
+                                   [units.format_simple(v[i], U.A) for v in res[5:]]))
+    sys.exit(0)
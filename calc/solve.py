@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import sys
+from core import units
+from core import eseries
+from core import instrument
+from core.units import AllUnits as U
+
+COMMANDS = ('volt_divider', 'lc', 'c_reactance', 'l_reactance')
+NAMES = {
+    'volt_divider': ('R1', 'R2'),
+    'lc': ('L', 'C'),
+    'c_reactance': ('C',),
+    'l_reactance': ('L',),
+}
+
+
+def format_part(part, unit):
+    if part.b is None:
+        return units.format_simple(part.value, unit)
+    operator = ' + ' if part.connection == eseries.SERIES_CONNECTION else ' || '
+    return '{0}{1}{2} ({3})'.format(units.format_simple(part.a, unit), operator, units.format_simple(part.b, unit),
+                                    units.format_simple(part.value, unit))
+
+
+def solve(command, values, args):
+    """
+    Returns (candidates, part units, result unit) for the targets in values.
+    """
+    options = dict(n=args.n, pairs=args.pairs, max_error=args.max_error / 100)
+    values = [U.convert_to_canonical(units.parse(v)) for v in values]
+    by_unit = dict((u, v) for v, u in values)
+    if command == 'volt_divider':
+        if len(values) == 1:
+            return eseries.divider(values[0][0], args.series, impedance=args.impedance, **options), (U.R, U.R), ''
+        v_in, v_out = max(v for v, _ in values), min(v for v, _ in values)
+        return eseries.divider(v_out, args.series, v_in=v_in, impedance=args.impedance, **options), (U.R, U.R), U.V
+    if command == 'lc':
+        return eseries.lc(by_unit[U.Hz], args.series, impedance=args.impedance, **options), (U.H, U.F), U.Hz
+    unit = U.F if command == 'c_reactance' else U.H
+    return eseries.reactance(by_unit[U.R], by_unit[U.Hz], unit, args.series, **options), (unit,), U.R
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.description = """
+Select E-series components for a target. The candidates are ranked by their error.
+For example: solve.py volt_divider 12V 5V    (V_in and V_out, or a ratio: solve.py volt_divider 0.25)
+             solve.py lc 1MHz --impedance 50
+             solve.py c_reactance 100R 1kHz --pairs
+             solve.py l_reactance 50R 10MHz --series E12
+    """
+    parser.add_argument("command", choices=COMMANDS)
+    parser.add_argument("targets", nargs='+', help='Target values: V_in and V_out (or the ratio) for volt_divider, '
+                                                   'the frequency for lc, the reactance and the frequency for '
+                                                   'c_reactance and l_reactance')
+    parser.add_argument("--series", default='E24', choices=list(eseries.SERIES), help='Default: E24')
+    parser.add_argument("-n", type=int, default=10, help='Number of candidates (default: 10)')
+    parser.add_argument("--pairs", action='store_true', help='Also use pairs of components in series or parallel')
+    parser.add_argument("--max-error", type=float, default=0.0,
+                        help='Error in percent within which fewer components are preferred')
+    parser.add_argument("--impedance", type=float,
+                        help='Preferred R1 + R2 of a divider (default: 10k) or sqrt(L/C) of an LC circuit')
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    instrument.start(args)
+    if args.impedance is None and args.command == 'volt_divider':
+        args.impedance = 10e3
+
+    try:
+        candidates, part_units, unit = solve(args.command, args.targets, args)
+    except (ValueError, KeyError) as e:
+        parser.error('invalid targets for {0}: {1}'.format(args.command, e))
+    for c in candidates:
+        parts = ', '.join('{0} = {1}'.format(name, format_part(p, u))
+                          for name, p, u in zip(NAMES[args.command], c.parts, part_units))
+        result = units.format_simple(c.value, unit) if unit else '{0:.6g}'.format(c.value)
+        print('{0}  ->  {1} ({2:+.4f}%)'.format(parts, result, 100 * c.error))
+    sys.exit(0)
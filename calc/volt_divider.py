@@ -2,8 +2,10 @@
 # -*- coding: utf-8 -*-
 
 import argparse
-import os
+import sys
 from core import units
+from core import batch
+from core import instrument
 from core.units import AllUnits as U
 
 def play(v_in, r1, r2):
@@ -12,17 +14,14 @@ def play(v_in, r1, r2):
     r2 = U.convert_to_canonical(r2)
     
     if v_in[1] != U.V:
-        print('V_in is expected to be [{0}]'.format(U.V))
-        os.exit(-1)
-        
+        raise ValueError('V_in is expected to be [{0}]'.format(U.V))
+
     if r1[1] != U.R:
-        print('R1 is expected to be [{0}]'.format(U.R))
-        os.exit(-1)
-        
+        raise ValueError('R1 is expected to be [{0}]'.format(U.R))
+
     if r2[1] != U.R:
-        print('R2 is expected to be [{0}]'.format(U.R))
-        os.exit(-1)
-    
+        raise ValueError('R2 is expected to be [{0}]'.format(U.R))
+
     return v_in[0] * r2[0] / (r1[0] + r2[0]), U.V
 
 
@@ -33,11 +32,20 @@ Voltage divider. Provide input voltage [V], first resistance [Ω] and second re
 The resulting voltage will be calculated according to the formula:
 V_out = V_in * R2 / (R1 + R2)
 For example: volt_divider.py 10V 4k7 1k2
+Many dividers can be computed at once from CSV/TSV rows: volt_divider.py --batch dividers.csv
     """
-    parser.add_argument("arg1", help='Input voltage V_in [V]')
-    parser.add_argument("arg2", help='First resistor of the divider R1 [Ω]')
-    parser.add_argument("arg3", help='Second resistor of the divider R2 [Ω]')
+    parser.add_argument("arg1", nargs='?', help='Input voltage V_in [V]')
+    parser.add_argument("arg2", nargs='?', help='First resistor of the divider R1 [Ω]')
+    parser.add_argument("arg3", nargs='?', help='Second resistor of the divider R2 [Ω]')
+    batch.add_arguments(parser)
+    instrument.add_arguments(parser)
     args = parser.parse_args()
+    instrument.start(args)
+
+    if args.batch:
+        sys.exit(batch.main(args, lambda *args: [play(*args)], 3))
+    if args.arg1 is None or args.arg2 is None or args.arg3 is None:
+        parser.error('3 arguments are required unless --batch is used')
 
     arg1 = units.parse(args.arg1)
     arg2 = units.parse(args.arg2)
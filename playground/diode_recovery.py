@@ -1,6 +1,7 @@
 # https://pyspice.fabrice-salvaire.fr/examples/diode/diode-recovery-time.html
 
 import os
+import sys
 
 import numpy as np
 import matplotlib.pyplot as plt
@@ -12,13 +13,15 @@ logger = Logging.setup_logging()
 
 from PySpice.Doc.ExampleTools import find_libraries
 from PySpice.Probe.Plot import plot
-from PySpice.Spice.Library import SpiceLibrary
 from PySpice.Spice.Netlist import Circuit
 from PySpice.Unit import *
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'calc'))
+from core import libindex, simcache
+
 
 libraries_path = find_libraries()
-spice_library = SpiceLibrary(libraries_path)
+spice_library = libindex.LibraryIndex(libraries_path)
 
 dc_offset = 1@u_V
 ac_amplitude = 100@u_mV
@@ -33,7 +36,7 @@ circuit.D('1', 'out', circuit.gnd, model='BAV21')
 quiescent_points = []
 for voltage in (dc_offset - ac_amplitude, dc_offset, dc_offset + ac_amplitude):
     source.dc_value = voltage
-    simulator = circuit.simulator(temperature=25, nominal_temperature=25)
+    simulator = simcache.cached_simulator(circuit, temperature=25, nominal_temperature=25)
     analysis = simulator.operating_point()
     # Fixme: handle unit
     quiescent_voltage = float(analysis.out)
@@ -57,7 +60,7 @@ circuit.SinusoidalVoltageSource('input', 'in', circuit.gnd,
 R = circuit.R(1, 'in', 'out', 1@u_kΩ)
 circuit.D('1', 'out', circuit.gnd, model='BAV21')
 
-simulator = circuit.simulator(temperature=25, nominal_temperature=25)
+simulator = simcache.cached_simulator(circuit, temperature=25, nominal_temperature=25)
 analysis = simulator.ac(start_frequency=10@u_kHz, stop_frequency=1@u_GHz, number_of_points=10,  variation='dec')
 
 figure = plt.figure(1, (20, 10))
@@ -92,7 +95,7 @@ source = circuit.PulseVoltageSource('input', 'in', circuit.gnd,
 circuit.R(1, 'in', 'out', 1@u_kΩ)
 circuit.D('1', 'out', circuit.gnd, model='BAV21')
 
-simulator = circuit.simulator(temperature=25, nominal_temperature=25)
+simulator = simcache.cached_simulator(circuit, temperature=25, nominal_temperature=25)
 analysis = simulator.transient(step_time=source.period/1e3, end_time=source.period*4)
 
 axe = plt.subplot(313)
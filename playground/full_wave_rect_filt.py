@@ -1,5 +1,6 @@
 # https://pyspice.fabrice-salvaire.fr/examples/diode/rectification.html
 import os
+import sys
 
 import matplotlib.pyplot as plt
 
@@ -10,13 +11,14 @@ logger = Logging.setup_logging()
 
 from PySpice.Doc.ExampleTools import find_libraries
 from PySpice.Probe.Plot import plot
-from PySpice.Spice.Library import SpiceLibrary
 from PySpice.Spice.Netlist import Circuit
 from PySpice.Unit import *
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'calc'))
+from core import libindex
 
 libraries_path = find_libraries()
-spice_library = SpiceLibrary(libraries_path)
+spice_library = libindex.LibraryIndex(libraries_path)
 
 
 figure1 = plt.figure(1, (20, 10))
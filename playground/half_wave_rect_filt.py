@@ -1,5 +1,6 @@
 # https://pyspice.fabrice-salvaire.fr/examples/diode/rectification.html
 import os
+import sys
 
 import matplotlib.pyplot as plt
 
@@ -10,13 +11,15 @@ logger = Logging.setup_logging()
 
 from PySpice.Doc.ExampleTools import find_libraries
 from PySpice.Probe.Plot import plot
-from PySpice.Spice.Library import SpiceLibrary
 from PySpice.Spice.Netlist import Circuit
 from PySpice.Unit import *
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'calc'))
+from core import libindex, simcache
+
 
 libraries_path = find_libraries()
-spice_library = SpiceLibrary(libraries_path)
+spice_library = libindex.LibraryIndex(libraries_path)
 
 
 figure1 = plt.figure(1, (20, 10))
@@ -28,7 +31,7 @@ circuit.X('D1', '1N4148', 'in', 'output')
 circuit.R('load', 'output', circuit.gnd, 100@u_Ω)
 circuit.C('1', 'output', circuit.gnd, 1@u_mF)
 
-simulator = circuit.simulator(temperature=25, nominal_temperature=25)
+simulator = simcache.cached_simulator(circuit, temperature=25, nominal_temperature=25)
 analysis = simulator.transient(step_time=source.period/200, end_time=source.period*2)
 
 axe = plt.subplot(222)
@@ -51,7 +54,7 @@ circuit.X('D2', '1N4148', 'output_minus', circuit.gnd)
 circuit.X('D3', '1N4148', circuit.gnd, 'output_plus')
 circuit.X('D4', '1N4148', 'output_minus', 'in')
 
-simulator = circuit.simulator(temperature=25, nominal_temperature=25)
+simulator = simcache.cached_simulator(circuit, temperature=25, nominal_temperature=25)
 analysis = simulator.transient(step_time=source.period/200, end_time=source.period*2)
 
 axe = plt.subplot(223)
@@ -66,7 +69,7 @@ plt.ylim(float(-source.amplitude*1.1), float(source.amplitude*1.1))
 
 circuit.C('1', 'output_plus', 'output_minus', 1@u_mF)
 
-simulator = circuit.simulator(temperature=25, nominal_temperature=25)
+simulator = simcache.cached_simulator(circuit, temperature=25, nominal_temperature=25)
 analysis = simulator.transient(step_time=source.period/200, end_time=source.period*2)
 
 axe = plt.subplot(224)
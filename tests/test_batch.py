@@ -0,0 +1,52 @@
+import io
+import os
+import subprocess
+import sys
+import unittest
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'calc'))
+from calc.core import batch
+from calc import ohm_law
+from calc import volt_divider
+
+CALC_DIR = os.path.join(os.path.dirname(__file__), '..', 'calc')
+
+
+class BatchTestCase(unittest.TestCase):
+    def test1_read_rows(self):
+        stream = io.StringIO('# header\n\n10V\t4k7R\t1k2R\n5V\t1kR\t1kR\n')
+        delimiter, rows = batch.read_rows(stream)
+        self.assertEqual('\t', delimiter)
+        self.assertEqual([(3, ['10V', '4k7R', '1k2R']), (4, ['5V', '1kR', '1kR'])], list(rows))
+
+        delimiter, rows = batch.read_rows(io.StringIO('"1,234.56kR",1A\n'))
+        self.assertEqual(',', delimiter)
+        self.assertEqual([(1, ['1,234.56kR', '1A'])], list(rows))
+
+    def test2_run_reports_bad_rows(self):
+        _, rows = batch.read_rows(io.StringIO('3.3V,560R\nbad\n1V,1V\n1kR,1A\n'))
+        out, err = io.StringIO(), io.StringIO()
+        good, bad = batch.run(ohm_law.play_with_power, rows, 2, out, ',', err)
+        self.assertEqual((2, 2), (good, bad))
+        lines = out.getvalue().splitlines()
+        self.assertEqual('3.3V,560R,0.005892857142857142,A,0.01944642857142857,W', lines[0])
+        self.assertEqual('1kR,1A,1000.0,V,1000.0,W', lines[1])
+        self.assertEqual(['line 2', 'line 3'], [line.split(':')[0] for line in err.getvalue().splitlines()])
+
+        _, rows = batch.read_rows(io.StringIO('10V,1kR,1kR\n10V,1A,1kR\n'))
+        out, err = io.StringIO(), io.StringIO()
+        good, bad = batch.run(lambda *args: [volt_divider.play(*args)], rows, 3, out, ',', err)
+        self.assertEqual((1, 1), (good, bad))
+        self.assertEqual('10V,1kR,1kR,5.0,V', out.getvalue().strip())
+
+    def test3_cli(self):
+        proc = subprocess.run([sys.executable, os.path.join(CALC_DIR, 'lc.py'), '--batch'],
+                              input='1mH;1uF\n10mH;x\n', capture_output=True, text=True)
+        self.assertEqual(1, proc.returncode)
+        fields = proc.stdout.strip().split(';')
+        self.assertEqual(['1mH', '1uF', 'Hz'], fields[:2] + fields[3:])
+        self.assertAlmostEqual(5032.92, float(fields[2]), places=2)
+        self.assertTrue(proc.stderr.startswith('line 2:'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import threading
+import unittest
+from calc.core import units
+from calc.core.cache import LruCache
+
+
+class LruCacheTestCase(unittest.TestCase):
+    def test1_lru_eviction(self):
+        cache = LruCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(1, cache.get('a'))
+        cache.put('c', 3)
+        # 'b' was the least recently used entry
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(1, cache.get('a'))
+        self.assertEqual(3, cache.get('c'))
+        info = cache.info()
+        self.assertEqual((3, 1, 1, 2, 2), tuple(info))
+
+        cache.clear()
+        self.assertEqual((0, 0, 0, 2, 0), tuple(cache.info()))
+
+    def test2_fifo_eviction(self):
+        cache = LruCache(maxsize=2, policy=LruCache.FIFO)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(2, cache.get('b'))
+        self.assertRaises(ValueError, LruCache, 0)
+        self.assertRaises(ValueError, LruCache, 10, 'random')
+
+
+class ParserCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.p = units.Parser()
+        self.p.enable_cache(maxsize=16)
+
+    def test1_normalize_and_format(self):
+        p = self.p
+        self.assertEqual((10000.0, ''), p.normalize('10k'))
+        self.assertEqual((10000.0, ''), p.normalize('10k'))
+        self.assertEqual('4.70 kV', p.format(4700.0, 'V'))
+        self.assertEqual('4.70 kV', p.format(4700.0, 'V'))
+        # Signed zero bypasses the cache
+        self.assertEqual('0.00', p.format(0.0))
+        self.assertEqual('-0.00', p.format(-0.0))
+        info = p.cache.info()
+        self.assertEqual(2, info.hits)
+        self.assertEqual(2, info.currsize)
+
+        n, pyspice_u = p.normalize_pyspice('100nF')
+        self.assertIs(pyspice_u, p.normalize_pyspice('100nF')[1])
+        self.assertAlmostEqual(100e-9, n)
+
+    def test2_errors_not_cached(self):
+        p = self.p
+        self.assertRaises(ValueError, p.normalize, '1k2k')
+        self.assertRaises(ValueError, p.format, 1e30)
+        self.assertEqual(0, p.cache.info().currsize)
+
+    def test3_threads(self):
+        p = self.p
+        literals = ['{0}k'.format(i) for i in range(64)]
+        failures = []
+
+        def worker():
+            for _ in range(50):
+                for s in literals:
+                    if p.normalize(s)[0] != float(s[:-1]) * 1000:
+                        failures.append(s)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual([], failures)
+        self.assertEqual(16, p.cache.info().currsize)
+
+    def test4_module_functions(self):
+        units.enable_cache(maxsize=8)
+        try:
+            units.parse('3.3V')
+            units.parse('3.3V')
+            self.assertEqual(1, units.cache_info().hits)
+            units.cache_clear()
+            self.assertEqual(0, units.cache_info().currsize)
+        finally:
+            units.disable_cache()
+        self.assertIsNone(units.cache_info())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'calc'))
+from calc.core import units
+from calc.core.units import AllUnits as U
+from calc import c_reactance
+from calc import dB
+from calc import l_reactance
+from calc import lc
+from calc import ohm_law
+from calc import volt_divider
+
+
+class BroadcastTestCase(unittest.TestCase):
+    def assertMatchesScalar(self, play, *quantities):
+        """
+        Evaluate play on array quantities and compare every element
+        with the scalar evaluation.
+        """
+        res = play(*units.grid(*quantities))
+        values = res[0]
+        for idx in np.ndindex(values.shape):
+            scalar_args = [(q[0][i], q[1]) for q, i in zip(quantities, idx)]
+            expected = play(*scalar_args)
+            self.assertEqual(expected[0], values[idx])
+            self.assertEqual(expected[1], res[1])
+        return res
+
+    def test1_two_argument_calculators(self):
+        f = ([50.0, 1e3, 1e6], U.Hz)
+        c = ([1e-9, 4.7e-6], U.F)
+        l = ([1e-6, 10e-3], U.H)
+        r = ([10.0, 4.7e3], 'Ohm')
+        self.assertMatchesScalar(c_reactance.play, c, f)
+        self.assertMatchesScalar(c_reactance.play, r, f)
+        self.assertMatchesScalar(c_reactance.play, c, r)
+        self.assertMatchesScalar(l_reactance.play, l, f)
+        self.assertMatchesScalar(l_reactance.play, f, r)
+        self.assertMatchesScalar(l_reactance.play, r, l)
+        self.assertMatchesScalar(lc.play, l, c)
+        self.assertMatchesScalar(lc.play, f, l)
+        self.assertMatchesScalar(lc.play, c, f)
+
+    def test2_volt_divider(self):
+        res = self.assertMatchesScalar(volt_divider.play, ([5.0, 10.0], U.V),
+                                       ([1e3, 4.7e3, 10e3], U.R), ([1e3, 2.2e3], 'R'))
+        self.assertEqual((2, 3, 2), res[0].shape)
+
+    def test3_db(self):
+        power, amplitude = dB.play((1.0, ''), (np.array([1.0, 10.0, 100.0]), ''))
+        np.testing.assert_array_equal([0.0, 10.0, 20.0], power)
+        np.testing.assert_array_equal([0.0, 20.0, 40.0], amplitude)
+
+    def test4_grid(self):
+        v, t, r = units.grid(([1.0, 2.0], U.V), (25.0, U.K), (np.arange(1.0, 4.0), U.R))
+        self.assertEqual((2, 1), v[0].shape)
+        self.assertEqual((25.0, U.K), t)
+        self.assertEqual((1, 3), r[0].shape)
+        self.assertEqual(U.R, r[1])
+
+    def test5_quantities(self):
+        i = units.quantity('10mA')
+        r = units.QuantityArray([1e3, 4.7e3], 'Ohm', dtype='float32')
+        (v, unit), (p, _) = ohm_law.play_with_power(i, r)
+        self.assertEqual(U.V, unit)
+        np.testing.assert_allclose([10.0, 47.0], v, rtol=1e-6)
+        np.testing.assert_allclose([0.1, 0.47], p, rtol=1e-6)
+        f, c = units.grid(units.QuantityArray([50.0, 1e3], U.Hz), units.QuantityArray([1e-9, 4.7e-6], U.F))
+        self.assertEqual(c_reactance.play((1e3, U.Hz), (4.7e-6, U.F)), (c_reactance.play(f, c)[0][1, 1], U.R))
+        mixed = units.QuantityArray([1.0, 2.0], np.array([U.unit_code(U.V), U.unit_code(U.A)], dtype=np.uint8))
+        self.assertRaises(ValueError, ohm_law.play, mixed, r)
+
+
+if __name__ == '__main__':
+    unittest.main()
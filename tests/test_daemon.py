@@ -0,0 +1,119 @@
+import unittest
+import json
+import socket
+import sys
+import os
+import shutil
+import tempfile
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'calc'))
+from calc.core import client
+from calc.core import daemon
+from calc.core.units import AllUnits as U
+
+
+class DaemonTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'calc.sock')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def start_server(self):
+        server = daemon.Server(self.path)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+
+        def stop():
+            server.shutdown()
+            server.server_close()
+            thread.join()
+        self.addCleanup(stop)
+        return server
+
+    def test1_handle(self):
+        res = daemon.handle({'id': 7, 'args': ['10mA', '4k7R']})
+        self.assertEqual(7, res['id'])
+        self.assertTrue(res['ok'])
+        self.assertEqual('ohm_law', res['command'])
+        self.assertEqual([47.0, U.V], res['results'][0])
+        self.assertEqual('47.0 V (47.0 V)', res['text'][0])
+        res = daemon.handle({'args': [[1e-3, 'H'], '1kHz'], 'command': 'l_reactance'})
+        self.assertEqual(U.R, res['results'][0][1])
+
+    def test1_handle_errors(self):
+        self.assertFalse(daemon.handle({'args': ['1mH', '1kHz']})['ok'])
+        self.assertFalse(daemon.handle({'args': ['1V', 'V1V']})['ok'])
+        self.assertFalse(daemon.handle({'args': '10V'})['ok'])
+        self.assertFalse(daemon.handle([])['ok'])
+        self.assertIn(b'Malformed JSON', daemon.handle_line('{"args": '))
+
+    def test1_handle_unformattable(self):
+        # 1e-30 A is below the smallest SI suffix
+        res = daemon.handle({'id': 3, 'args': ['1V', '1e30R']})
+        self.assertEqual((3, False), (res['id'], res['ok']))
+        self.assertIn('out of range', res['error'])
+        for args in ([{'value': 1}, '1V'], [[[1, 2], 'V'], '1kR'], [[1, 'V', 2], '1kR'], [['1', 'V'], '1kR'],
+                     [[10 ** 400, 'V'], '1kR']):
+            self.assertFalse(daemon.handle({'args': args})['ok'], args)
+        self.assertIn(b'"ok": false', daemon.handle_line('{"args": ["1V", "1e30R"]}'))
+
+    def test2_client_fallback(self):
+        with client.Client(self.path) as c:
+            self.assertFalse(c.remote)
+            self.assertEqual([[5.0, U.V]], c.evaluate(['10V', '1kR', '1kR'])['results'])
+        with client.Client(self.path, fallback=False) as c:
+            self.assertRaises(ConnectionError, c.evaluate, ['10V', '1kR'])
+
+    def test3_server(self):
+        self.start_server()
+        with client.Client(self.path, fallback=False) as c:
+            self.assertTrue(c.remote)
+            res = c.evaluate(['1mH', '1uF'], 'lc')
+            self.assertTrue(res['ok'])
+            self.assertAlmostEqual(5032.921210448703, res['results'][0][0])
+            self.assertFalse(c.evaluate(['1V', '1V'])['ok'])
+            # The connection survives errors
+            self.assertTrue(c.evaluate(['10mA', '4k7R'])['ok'])
+        # Only one daemon per socket
+        self.assertRaises(OSError, daemon.Server, self.path)
+
+    def test3_server_invalid_utf8(self):
+        self.start_server()
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            s.connect(self.path)
+            f = s.makefile('rwb')
+            f.write(b'\xff\n')
+            f.flush()
+            res = json.loads(f.readline())
+            self.assertFalse(res['ok'])
+            self.assertIn('UTF-8', res['error'])
+            f.write(b'{"args": ["10mA", "4k7R"]}\n')
+            f.flush()
+            self.assertTrue(json.loads(f.readline())['ok'])
+            f.close()
+        finally:
+            s.close()
+
+    def test3_concurrent_clients(self):
+        self.start_server()
+        failures = []
+
+        def worker(n):
+            with client.Client(self.path, fallback=False) as c:
+                for i in range(1, 51):
+                    res = c.evaluate(['{0}V'.format(n), '{0}kR'.format(i)])
+                    if res['results'][0] != [n / (i * 1e3), U.A]:
+                        failures.append((n, i, res))
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(1, 9)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual([], failures)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'calc'))
+from calc.core import dimensions
+from calc.core import units
+from calc.core.dimensions import Measure
+from calc.core.units import AllUnits as U
+from calc import ohm_law
+
+
+class DimensionsTestCase(unittest.TestCase):
+    def test1_derived_units(self):
+        v, r, i = Measure(5.0, 'V'), Measure(4.7e3, 'Ohm'), Measure(10e-3, 'A')
+        self.assertEqual(U.A, (v / r).unit)
+        self.assertEqual(U.W, (v * i).unit)
+        self.assertEqual(U.V, (i * r).unit)
+        self.assertEqual(U.S, (1 / r).unit)
+        self.assertEqual(U.J, (v * i / Measure(1.0, 'Hz')).unit)
+        self.assertEqual(U.Hz, (1 / dimensions.sqrt(Measure(1e-3, 'H') * Measure(1e-6, 'F'))).unit)
+        self.assertEqual('', (v / v).unit)
+        self.assertEqual('m²·kg·s⁻⁴', (v * i * Measure(1.0, 'Hz')).unit)
+        self.assertAlmostEqual(5.0 / 4.7e3, (v / r).to('A'))
+        self.assertRaises(ValueError, (v / r).to, 'V')
+        self.assertRaises(ValueError, Measure, 1.0, 'dB')
+
+    def test2_consistency(self):
+        v = Measure(1.0, 'V')
+        self.assertRaises(ValueError, lambda: v + Measure(1.0, 'A'))
+        self.assertRaises(ValueError, lambda: v - 1.0)
+        self.assertRaises(ValueError, lambda: v < Measure(1.0, 'W'))
+        self.assertRaises(ValueError, lambda: Measure(1.0, 'H') ** 0.5)
+        self.assertRaises(ValueError, dimensions.log10, v)
+        self.assertEqual(U.V, (v + Measure(2.0, 'V')).unit)
+        self.assertEqual(2.0, (1.0 + v / v).value)
+
+    def test2_equality_and_powers(self):
+        self.assertTrue(Measure(5.0, 'V') == Measure(5.0, 'V'))
+        self.assertFalse(Measure(5.0, 'V') != Measure(5.0, 'V'))
+        self.assertTrue(Measure(5.0, 'V') != Measure(4.0, 'V'))
+        np.testing.assert_array_equal([True, False], Measure([1.0, 2.0], 'V') == Measure(1.0, 'V'))
+        self.assertFalse(Measure(5.0, 'V') == Measure(5.0, 'A'))
+        self.assertTrue(Measure(5.0, 'V') != Measure(5.0, 'A'))
+        self.assertNotIn(Measure(5.0, 'V'), [Measure(1.0, 'A'), Measure(5.0, 'W')])
+        self.assertIn(Measure(5.0, 'V'), [Measure(1.0, 'A'), Measure(5.0, 'V')])
+        self.assertRaises(TypeError, hash, Measure(5.0, 'V'))
+        self.assertEqual(8.0, (2 ** Measure(3.0)).value)
+        self.assertRaises(ValueError, lambda: 2 ** Measure(3.0, 'V'))
+        self.assertRaises(ValueError, lambda: Measure(-1.0) ** 0.5)
+        self.assertRaises(ValueError, lambda: Measure(np.array([4.0, -1.0])) ** 0.5)
+        np.testing.assert_array_equal([4.0, 1.0], (Measure(np.array([-2.0, 1.0])) ** 2).value)
+
+    def test3_arrays(self):
+        v = Measure(np.linspace(1.0, 5.0, 5)[:, None], 'V')
+        r = Measure([1e3, 4.7e3, 10e3], U.R)
+        p = v * v / r
+        self.assertEqual(U.W, p.unit)
+        self.assertEqual((5, 3), p.value.shape)
+        np.testing.assert_allclose(np.linspace(1.0, 5.0, 5)[:, None] ** 2 / [1e3, 4.7e3, 10e3], p.value)
+        scaled = np.array([1.0, 2.0]) * Measure(1.0, 'A')
+        self.assertIsInstance(scaled, Measure)
+        np.testing.assert_array_equal([False, True, True], (r > Measure(2e3, 'R')))
+        # Accepted by the calculators and convertible from the compact types
+        self.assertEqual(U.A, ohm_law.play(Measure(5.0, 'V'), r)[1])
+        quantities, _ = units.parse_quantities(['1k', '2k'])
+        self.assertEqual('', Measure.of(quantities).unit)
+        self.assertEqual(U.R, Measure.of((1.0, 'Ohm')).unit)
+
+    def test4_evaluate(self):
+        f = dimensions.evaluate('1 / (2 * pi * sqrt(L * C))', {'L': (1e-3, 'H'), 'C': Measure(1e-6, 'F')})
+        self.assertEqual(U.Hz, f.unit)
+        self.assertAlmostEqual(1 / (2 * np.pi * np.sqrt(1e-9)), f.value)
+        p = dimensions.evaluate('V ** 2 / (R1 + R2)', {'V': (12.0, 'V'), 'R1': (4.7e3, 'R'), 'R2': (1.2e3, 'R')})
+        self.assertEqual((12.0 ** 2 / 5.9e3, U.W), p.pair())
+        self.assertEqual('', dimensions.evaluate('20 * log10(V2 / V1)', {'V1': (1.0, 'V'), 'V2': (10.0, 'V')}).unit)
+        for expr in ('V + R1', '__import__("os")', 'V.real', 'X', 'V ** R1', '(V'):
+            self.assertRaises(ValueError, dimensions.evaluate, expr, {'V': (1.0, 'V'), 'R1': (1.0, 'R')})
+
+    def test4_evaluate_arithmetic_errors(self):
+        variables = {'V': (1.0, 'V'), 'R': (0.0, 'R'), 'N': (-1.0, ''), 'A': (np.array([1.0, 0.0]), 'R')}
+        for expr in ('V / R', 'V / A', 'N ** 0.5', 'sqrt(N)', '9 ** 9 ** 9 ** 9', 'V * 1e308 * 10', 'log10(0 * N)',
+                     '1' + '0' * 400, 'True'):
+            self.assertRaises(ValueError, dimensions.evaluate, expr, variables)
+
+
+if __name__ == '__main__':
+    unittest.main()
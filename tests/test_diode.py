@@ -0,0 +1,60 @@
+import unittest
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'calc'))
+from calc.core import diode
+
+D1N4148 = diode.model(IS=4.352e-9, N=1.906, RS=0.6458, BV=110, IBV=1e-4)
+
+
+class DiodeTestCase(unittest.TestCase):
+    def test1_model(self):
+        d = diode.model(Is=1e-15, n=2)
+        self.assertEqual((1e-15, 2, 0.0), (d.IS, d.N, d.RS))
+        self.assertRaises(ValueError, diode.model, IS=1e-15, CJ0=1e-12)
+        self.assertAlmostEqual(0.025693, float(diode.thermal_voltage(25)), places=6)
+        self.assertAlmostEqual(1e-15, float(diode.saturation_current(d, diode.NOMINAL_TEMPERATURE)))
+        # IS roughly doubles every 10 °C (N=1, XTI=3, EG=1.11)
+        ratio = diode.saturation_current(diode.DEFAULTS, 37) / diode.saturation_current(diode.DEFAULTS, 27)
+        self.assertTrue(2 < ratio < 5)
+
+    def test2_forward(self):
+        d = diode.DEFAULTS
+        s = diode.solve(d, 5.0, 1e3, 27)
+        # Shockley equation and KVL
+        self.assertAlmostEqual(float(s.current), float(d.IS * np.expm1(s.voltage / diode.thermal_voltage(27))
+                                                       + diode.GMIN * s.voltage), places=15)
+        self.assertAlmostEqual(5.0, float(s.voltage + 1e3 * s.current), places=12)
+        # RS in series with the junction
+        s = diode.solve(d._replace(RS=10.0), 5.0, 1e3, 27)
+        self.assertAlmostEqual(float(s.voltage), float(s.junction + 10.0 * s.current), places=12)
+
+    def test3_grid(self):
+        temperature = np.array([-40.0, 25.0, 125.0])[:, None, None]
+        voltage = np.linspace(-150, 50, 201)[:, None]
+        resistance = np.geomspace(1e-3, 1e6, 19)
+        s = diode.solve(D1N4148, voltage, resistance, temperature, r_parallel=5.827e9)
+        self.assertEqual((3, 201, 19), s.current.shape)
+        self.assertTrue(np.all(s.iterations < diode.MAX_ITERATIONS))
+        np.testing.assert_allclose(np.broadcast_to(voltage, s.voltage.shape), s.voltage + resistance * s.current,
+                                   rtol=1e-12, atol=1e-12)
+        # The current rises with the source voltage
+        self.assertTrue(np.all(np.diff(s.current, axis=1) > 0))
+        # Reverse current ~ -IS, breakdown clamps near -BV
+        s = diode.solve(D1N4148, [-10.0, -150.0], 1e3, 27)
+        self.assertAlmostEqual(1.0, float(-s.current[0] / D1N4148.IS), places=2)
+        self.assertTrue(-112 < s.voltage[1] < -110)
+
+    def test4_breakdown(self):
+        # IBV flows at -BV
+        s = diode.solve(D1N4148, -110 - 1e-4 * 1e3, 1e3, 27)
+        self.assertAlmostEqual(1.0, float(-s.current / 1e-4), places=2)
+        # The breakdown current rises by e every N Vt, like SPICE
+        s = diode.solve(D1N4148, [-150.0, -160.0], 1e3, 27)
+        slope = (s.junction[0] - s.junction[1]) / np.log(s.current[1] / s.current[0])
+        self.assertAlmostEqual(1.0, float(slope / (D1N4148.N * diode.thermal_voltage(27))), places=6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import itertools
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'calc'))
+from calc.core import eseries
+from calc.core.units import AllUnits as U
+
+
+class ESeriesTestCase(unittest.TestCase):
+    def test1_values(self):
+        self.assertEqual(96, len(eseries.SERIES['E96']))
+        self.assertIn(9.76, eseries.SERIES['E96'])
+        self.assertEqual((1.0, 2.2, 4.7), eseries.SERIES['E3'])
+        v = eseries.values('E12', U.R, (2, 4))
+        self.assertEqual(24, len(v))
+        self.assertEqual([100.0, 120.0], list(v[:2]))
+        self.assertAlmostEqual(8200.0, v[-1])
+        self.assertRaises(ValueError, eseries.values, 'E7')
+
+    def test2_table(self):
+        t = eseries.table('E12', U.R, (3, 4), pairs=True)
+        self.assertTrue(np.all(np.diff(t.value) > 0))
+        # 1k + 1k: 2 kΩ is not an E12 value
+        p = t.part(int(t.nearest(2000.0)))
+        self.assertEqual((2000.0, 1000.0, 1000.0, 'series'), p)
+        # Equal values keep the single component: 2k2 || 2k2 = 1k1 is not, 1k2 is
+        p = t.part(int(t.nearest(1200.0)))
+        self.assertEqual((1200.0, 1200.0, None, 'single'), p)
+        c = eseries.table('E12', U.F, (-9, -8), pairs=True)
+        p = c.part(int(c.nearest(2e-9)))
+        self.assertEqual('parallel', p.connection)
+
+    def test3_divider(self):
+        ratio = 5.0 / 12
+        res = eseries.divider(ratio, 'E12', n=5, decades=(2, 5))
+        values = eseries.values('E12', U.R, (2, 5))
+        # Brute force over all pairs
+        best = min(abs(r2 / (r1 + r2) / ratio - 1) for r1, r2 in itertools.product(values, values))
+        self.assertAlmostEqual(best, abs(res[0].error))
+        self.assertEqual(5, len(res))
+        self.assertTrue(all(abs(a.error) <= abs(b.error) + 1e-12 for a, b in zip(res, res[1:])))
+        # One divider per ratio
+        self.assertEqual(5, len(set(round(c.value, 9) for c in res)))
+        res = eseries.divider(5, 'E96', n=1, v_in=12)
+        self.assertAlmostEqual(5.0, res[0].value)
+        self.assertEqual((6650.0, 4750.0), tuple(p.value for p in res[0].parts))
+        self.assertRaises(ValueError, eseries.divider, 1.5)
+
+    def test4_pairs(self):
+        single = eseries.divider(0.4137, 'E96', n=1)[0]
+        paired = eseries.divider(0.4137, 'E96', n=1, pairs=True)[0]
+        self.assertLess(abs(paired.error), abs(single.error))
+        # Within 1% a single component is enough
+        res = eseries.divider(0.4137, 'E96', n=1, pairs=True, max_error=0.01)[0]
+        self.assertEqual([None, None], [p.b for p in res.parts])
+
+    def test5_lc(self):
+        res = eseries.lc(1e6, 'E12', n=3, impedance=50)
+        for c in res:
+            l, c_ = (p.value for p in c.parts)
+            self.assertAlmostEqual(c.value, 1 / (2 * np.pi * np.sqrt(l * c_)))
+        self.assertAlmostEqual(-0.018981518, res[0].error)
+        self.assertEqual((5.6e-6, 4.7e-9), tuple(round(p.value, 15) for p in res[0].parts))
+
+    def test6_reactance(self):
+        res = eseries.reactance(100, 1e3, U.F, 'E12', n=3)
+        self.assertEqual([1.5e-6, 1.8e-6, 1.2e-6], [round(c.parts[0].value, 12) for c in res])
+        self.assertAlmostEqual(1 / (2 * np.pi * 1e3 * 1.5e-6), res[0].value)
+        res = eseries.reactance(100, 1e3, U.H, 'E24', n=1)
+        self.assertAlmostEqual(0.016, res[0].parts[0].value)
+        self.assertRaises(ValueError, eseries.reactance, 100, 1e3, U.V)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'calc'))
+from calc.core import impedance
+from calc.core.units import AllUnits as U
+
+
+class ImpedanceTestCase(unittest.TestCase):
+    def test1_parse(self):
+        n = impedance.parse('10R + 1mH || 100nF')
+        self.assertIsInstance(n, impedance.Series)
+        self.assertIsInstance(n.parts[1], impedance.Parallel)
+        self.assertEqual((1e-3, U.H), (n.parts[1].parts[0].value, n.parts[1].parts[0].unit))
+        n = impedance.parse('1kΩ | (1mH + 10nF)')
+        self.assertIsInstance(n, impedance.Parallel)
+        self.assertIsInstance(n.parts[1], impedance.Series)
+        self.assertEqual('1.00kΩ | (1.00mH + 10.0nF)', str(n))
+        for s in ('', '1R +', '(1R', '1R)', '1R 2R', '1V', '4k7'):
+            self.assertRaises(ValueError, impedance.parse, s)
+
+    def test2_impedance(self):
+        omega = 2 * np.pi * np.array([1e3, 1e6])
+        z = impedance.parse('50R + 1mH | 100nF').impedance(omega)
+        zl, zc = 1j * omega * 1e-3, 1 / (1j * omega * 100e-9)
+        np.testing.assert_allclose(50 + zl * zc / (zl + zc), z)
+        # No division warnings at DC
+        self.assertTrue(np.isinf(impedance.parse('1uF').impedance(np.zeros(1))).all())
+
+    def test3_series_resonance(self):
+        r, l, c = 10.0, 1e-3, 100e-9
+        response = impedance.sweep('10R + 1mH + 100nF', '10Hz', '10MHz', 10**5)
+        self.assertEqual(10**5, response.frequency.size)
+        self.assertAlmostEqual(10.0, response.frequency[0])
+        f0 = 1 / (2 * np.pi * np.sqrt(l * c))
+        q = np.sqrt(l / c) / r
+        res, = response.resonances()
+        self.assertEqual(impedance.SERIES, res.kind)
+        self.assertAlmostEqual(1.0, res.frequency / f0, places=9)
+        self.assertAlmostEqual(r, res.magnitude, places=6)
+        self.assertAlmostEqual(1.0, res.q / q, places=6)
+        self.assertAlmostEqual(1.0, (res.high - res.low) / (f0 / q), places=6)
+        self.assertAlmostEqual(-45.0, response.phase[response.frequency < res.low][-1], delta=0.1)
+
+    def test4_parallel_resonance(self):
+        r, l, c = 10e3, 1e-3, 100e-9
+        # Coarse grid: the resonance is refined on the network, not interpolated
+        response = impedance.sweep('1mH | 100nF | 10kR', 10, 1e7, 100)
+        res, = response.resonances()
+        self.assertEqual(impedance.PARALLEL, res.kind)
+        self.assertAlmostEqual(1.0, res.frequency * 2 * np.pi * np.sqrt(l * c), places=9)
+        self.assertAlmostEqual(r, res.magnitude, places=3)
+        self.assertAlmostEqual(1.0, res.q / (r * np.sqrt(c / l)), places=6)
+
+    def test5_crossings_and_table(self):
+        response = impedance.sweep('1mH', 1, 1e6, 1000)
+        self.assertEqual([], response.resonances())
+        f, = response.crossings(100)
+        self.assertAlmostEqual(100 / (2 * np.pi * 1e-3), f, places=6)
+        lines = response.table(5).splitlines()
+        self.assertEqual(6, len(lines))
+        self.assertIn('f [kHz]', lines[0])
+
+    def test6_invalid_sweep(self):
+        for start, stop, points in ((0, 1e6, 100), (1e6, 1e3, 100), (1, 1e6, 1)):
+            self.assertRaises(ValueError, impedance.sweep, '1mH', start, stop, points)
+
+
+if __name__ == '__main__':
+    unittest.main()
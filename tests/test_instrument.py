@@ -0,0 +1,71 @@
+import argparse
+import unittest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'calc'))
+from calc.core import instrument
+from calc.core import registry
+from calc.core import units
+
+
+class InstrumentTestCase(unittest.TestCase):
+    def tearDown(self):
+        instrument.disable()
+
+    def test1_timers(self):
+        normalize = units.Parser.normalize
+        recorder = instrument.enable(at_exit=False)
+        self.assertIsNot(normalize, units.Parser.normalize)
+        with instrument.span('outer'):
+            units.parse('4k7R')
+            with instrument.span('inner', 'test'):
+                units.format_simple(4700.0, 'Ω')
+            registry.evaluate([units.parse('10mA'), units.parse('1kR')])
+        stats = recorder.stats
+        self.assertEqual(3, stats[('units.parse', 'units')][0])
+        self.assertEqual(1, stats[('calc ohm_law.play_with_power', 'calc')][0])
+        calls, total, own, longest, _ = stats[('outer', 'user')]
+        self.assertEqual(1, calls)
+        self.assertTrue(0 < own < total == longest)
+        self.assertIn('units.parse [units]', instrument.summary())
+        instrument.disable()
+        self.assertIs(normalize, units.Parser.normalize)
+        # Disabled: spans are no-ops
+        with instrument.span('ignored'):
+            units.parse('1k')
+        self.assertFalse(instrument.enabled())
+
+    def test2_chrome_trace(self):
+        recorder = instrument.enable(at_exit=False)
+        with instrument.span('outer'):
+            units.parse('1k')
+        trace = recorder.chrome_trace()
+        events = [e for e in trace['traceEvents'] if e['ph'] == 'X']
+        self.assertEqual(['units.parse', 'outer'], [e['name'] for e in events])
+        inner, outer = events
+        self.assertTrue(outer['ts'] <= inner['ts'] and inner['ts'] + inner['dur'] <= outer['ts'] + outer['dur'])
+
+    def test3_memory(self):
+        recorder = instrument.enable(memory=True, at_exit=False)
+        with instrument.span('allocate'):
+            data = bytearray(4 << 20)
+            with instrument.span('small'):
+                units.parse('1k')
+            del data
+        self.assertTrue(recorder.stats[('allocate', 'user')][4] >= 4 << 20)
+        self.assertTrue(recorder.stats[('small', 'user')][4] < 1 << 20)
+        self.assertIn('peak MB', instrument.summary())
+
+    def test4_command_line(self):
+        parser = argparse.ArgumentParser()
+        instrument.add_arguments(parser)
+        self.assertIsNone(instrument.start(parser.parse_args([])))
+        self.assertFalse(instrument.enabled())
+        args = parser.parse_args(['--profile'])
+        self.assertEqual('', args.profile)
+        self.assertIsNotNone(instrument.start(args))
+        self.assertTrue(instrument.enabled())
+
+
+if __name__ == '__main__':
+    unittest.main()
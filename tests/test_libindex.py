@@ -0,0 +1,111 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import zipfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'calc'))
+from calc.core import libindex
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'libraries')
+
+MODEL = """* test model
+.MODEL DTEST D (IS=1E-14
++ N=1.5)
+R1 1 2 1k
+"""
+SUBCKT = """.SUBCKT OPTEST 1 2 3
+.MODEL DLOCAL D
+.SUBCKT INNER 1 2
+.ENDS INNER
+.ENDS OPTEST
+"""
+
+
+class LibraryIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.root = os.path.join(self.tmp, 'libraries')
+        os.makedirs(os.path.join(self.root, 'diode'))
+        with open(os.path.join(self.root, 'diode', 'dtest.lib'), 'w') as f:
+            f.write(MODEL)
+        with zipfile.ZipFile(os.path.join(self.root, 'vendor.zip'), 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('VENDOR/OPTEST.LIB', SUBCKT)
+            archive.writestr('VENDOR/readme.txt', '.MODEL NOTINDEXED D')
+        self.directory = os.path.join(self.tmp, 'index')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def index(self):
+        return libindex.LibraryIndex(self.root, self.directory)
+
+    def test1_scan(self):
+        self.assertEqual([['DTEST', 'model', 13, False]], libindex.scan(MODEL.encode()))
+        # Nested definitions are local to the sub-circuit
+        self.assertEqual([['OPTEST', 'subckt', 0, False]], libindex.scan(SUBCKT.encode()))
+        self.assertEqual([['DTEST@xyce', 'model', 13, False]], libindex.scan(MODEL.encode(), 'd.lib@xyce'))
+
+    def test2_lookup(self):
+        index = self.index()
+        self.assertEqual(['DTEST', 'OPTEST'], index.names)
+        d = index.lookup('dtest')
+        self.assertEqual(('model', os.path.join(self.root, 'diode', 'dtest.lib'), None, 13),
+                         (d.kind, d.path, d.member, d.offset))
+        self.assertEqual(d.path, index['DTEST'])
+        self.assertEqual('.MODEL DTEST D (IS=1E-14\n+ N=1.5)\n', index.read('DTEST'))
+        self.assertRaises(KeyError, index.lookup, 'DLOCAL')
+
+    def test3_zip_member(self):
+        index = self.index()
+        d = index.lookup('OPTEST')
+        self.assertEqual(('subckt', 'VENDOR/OPTEST.LIB'), (d.kind, d.member))
+        self.assertEqual(SUBCKT, index.read('OPTEST'))
+        path = index['OPTEST']
+        self.assertTrue(path.endswith('OPTEST.LIB'))
+        with open(path) as f:
+            self.assertEqual(SUBCKT, f.read())
+        # A failed extraction leaves no temporary file behind
+        index = libindex.LibraryIndex(self.root, os.path.join(self.tmp, 'index2'), check=False)
+        with open(os.path.join(self.root, 'vendor.zip'), 'wb') as f:
+            f.write(b'not a zip file')
+        self.assertRaises(zipfile.BadZipFile, index.__getitem__, 'OPTEST')
+        members = os.path.join(self.tmp, 'index2', 'members')
+        self.assertEqual([], [name for _, _, names in os.walk(members) for name in names])
+
+    def test4_persistent(self):
+        self.index()
+        index = self.index()
+        # Loaded from the index file: no file is parsed
+        index._index_file = None
+        self.assertEqual(0, index.update())
+        self.assertEqual('OPTEST', index.lookup('optest').name)
+
+    def test5_incremental(self):
+        index = self.index()
+        path = os.path.join(self.root, 'diode', 'dtest.lib')
+        with open(path, 'w') as f:
+            f.write('\n' + MODEL.replace('DTEST', 'DTEST2'))
+        os.utime(path, ns=(1, 1))
+        # The definition's file is checked on lookup
+        self.assertRaises(KeyError, index.lookup, 'DTEST')
+        self.assertEqual(14, index.lookup('DTEST2').offset)
+        with open(os.path.join(self.root, 'new.lib'), 'w') as f:
+            f.write('.model DNEW D\n')
+        # Unknown names rescan the tree
+        self.assertEqual('DNEW', index.lookup('dnew').name)
+        os.unlink(os.path.join(self.root, 'vendor.zip'))
+        self.assertEqual(1, index.update())
+        self.assertNotIn('OPTEST', index)
+
+    def test6_libraries(self):
+        index = libindex.LibraryIndex(ROOT, self.directory)
+        for name in ('1N4148', 'BAV21', 'irf150', '2N2222A', 'LMV981', 'ATL432A_TRANS'):
+            self.assertIn(name, index)
+        self.assertEqual('subckt', index.lookup('1N4148').kind)
+        # The unencrypted vendor model is preferred
+        self.assertFalse(index.lookup('ATL432B_TRANS').encrypted)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import zipfile
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'calc'))
+from calc.core import diode
+from calc.core import modelcards
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'libraries')
+
+MODEL = """* test model
+.MODEL DTEST D (IS=1E-14 ; saturation current
+* comment between continuation lines
++ N = 1.5 RS=10m
++ BV=1MEG)
+R1 1 2 1k
+"""
+SUBCKT = """.SUBCKT OPTEST in out PARAMS: GAIN=2.2k OFFSET={GAIN/10}
+.MODEL DLOCAL D IS=2.5p
+.ENDS OPTEST
+"""
+
+
+class ModelCardsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.root = os.path.join(self.tmp, 'libraries')
+        os.makedirs(self.root)
+        with open(os.path.join(self.root, 'dtest.lib'), 'w') as f:
+            f.write(MODEL)
+        with zipfile.ZipFile(os.path.join(self.root, 'vendor.zip'), 'w') as archive:
+            archive.writestr('VENDOR/OPTEST.LIB', SUBCKT)
+        self.directory = os.path.join(self.tmp, 'index')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test1_parse(self):
+        models, subckts = modelcards.parse(MODEL)
+        self.assertEqual([modelcards.Model('DTEST', 'D', {'IS': 1e-14, 'N': 1.5, 'RS': 0.01, 'BV': 1e6}, None, None,
+                                           None)], models)
+        self.assertEqual([], subckts)
+        models, subckts = modelcards.parse(SUBCKT, 'optest.lib@xyce')
+        self.assertEqual(('DLOCAL', 2.5e-12, 'OPTEST@xyce'), (models[0].name, models[0].params['IS'],
+                                                              models[0].subckt))
+        self.assertEqual(('OPTEST@xyce', ('in', 'out'), {'GAIN': 2200.0, 'OFFSET': '{GAIN/10}'}, ('DLOCAL',)),
+                         subckts[0][:4])
+
+    def test2_store(self):
+        store = modelcards.ModelStore(self.root, self.directory)
+        self.assertEqual(['DTEST', 'OPTEST'], store.names)
+        self.assertEqual(1e6, store.model('dtest').params['BV'])
+        subckt = store.subckt('optest')
+        self.assertEqual(('VENDOR/OPTEST.LIB', ('DLOCAL',), '{GAIN/10}'),
+                         (subckt.member, subckt.models, subckt.params['OFFSET']))
+        self.assertRaises(KeyError, store.model, 'OPTEST')
+        models, values = store.table(['is', 'N', 'CJO'], type='D')
+        self.assertEqual(['DTEST', 'DLOCAL'], [m.name for m in models])
+        np.testing.assert_array_equal([[1e-14, 1.5, np.nan], [2.5e-12, np.nan, np.nan]], values)
+        self.assertRaises(KeyError, store.table, ['IS'], ['DTEST', 'NONE'])
+
+    def test3_cache(self):
+        store = modelcards.ModelStore(self.root, self.directory)
+        self.assertTrue(os.path.exists(store.path))
+        loaded = modelcards.ModelStore(self.root, self.directory)
+        self.assertEqual(store.model('DLOCAL'), loaded.model('DLOCAL'))
+        self.assertEqual(store.subckt('OPTEST'), loaded.subckt('OPTEST'))
+        # Changed files are parsed again
+        with open(os.path.join(self.root, 'dtest.lib'), 'a') as f:
+            f.write('.model DNEW d is=3f\n')
+        self.assertEqual(3e-15, modelcards.ModelStore(self.root, self.directory).model('DNEW').params['IS'])
+        # Truncated and empty caches are rebuilt
+        for size in (100, 0):
+            with open(store.path, 'r+b') as f:
+                f.truncate(size)
+            self.assertEqual(store.model('DLOCAL'), modelcards.ModelStore(self.root, self.directory).model('DLOCAL'))
+
+    def test4_libraries(self):
+        store = modelcards.ModelStore(ROOT, self.directory)
+        self.assertAlmostEqual(19.230e-3, store.model('BAV21').params['IKF'])
+        self.assertEqual('NPN', store.model('2N2222A').type)
+        self.assertEqual(('MM', 'MD', 'MD1', 'MD2', 'MD3'), store.subckt('IRF150').models)
+        d = diode.model(**store.parameters('1N4148', diode.DiodeModel._fields))
+        self.assertEqual((4.352e-9, 1.906, 0.6458, 110.0, 1e-4), d[:5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'calc'))
+from calc.core import montecarlo as mc
+from calc.core.units import AllUnits as U
+
+
+class MonteCarloTestCase(unittest.TestCase):
+    def test1_nominal(self):
+        res = mc.run([mc.component(10, U.V), mc.component(1000, U.R), mc.component(1000, U.R)], 1000)
+        d = res.outputs[0]
+        self.assertEqual(('volt_divider', U.V, 1000), (res.formula.command, d.unit, d.count))
+        self.assertAlmostEqual(5.0, d.nominal)
+        self.assertAlmostEqual(5.0, d.mean)
+        self.assertAlmostEqual(5.0, d.percentile(50))
+
+    def test2_uniform(self):
+        # Arguments in any order, R2 is the second resistor: V_out = 10 * R2 / (1k + R2)
+        res = mc.run([mc.component(1000, U.R), mc.component(1000, U.R, 0.1), mc.component(10, U.V)],
+                     10**6, command='volt_divider', seed=1, chunk_size=10**5)
+        d = res.outputs[0]
+        r2 = np.array([900.0, 1000.0, 1100.0])
+        low, median, high = 10 * r2 / (1000 + r2)
+        self.assertAlmostEqual(median, d.percentile(50), places=2)
+        self.assertTrue(low <= d.min < d.max <= high)
+        self.assertAlmostEqual(high, d.percentile(100), places=3)
+        counts, edges = d.histogram(20)
+        self.assertEqual(10**6, counts.sum() + d.underflow + d.overflow)
+        self.assertEqual(len(counts) + 1, len(edges))
+        self.assertLessEqual(len(counts), 20)
+
+    def test3_normal(self):
+        res = mc.run([mc.component(1e-6, U.F, 0.03, mc.NORMAL), mc.component(1e3, U.Hz)], 10**6,
+                     command='c_reactance', seed=2, chunk_size=10**5)
+        d = res.outputs[0]
+        # X_C = 1 / (2 pi f C), relative std ~ 1%
+        self.assertEqual(U.R, d.unit)
+        self.assertAlmostEqual(0.01, d.std / d.nominal, places=3)
+        x = 1 / (2 * np.pi * 1e3 * 1e-6 * (1 + 0.01 * np.array([-2.3263, 2.3263])))
+        np.testing.assert_allclose(x[::-1], d.percentile([1, 99]), rtol=1e-3)
+
+    def test4_yield(self):
+        components = [mc.component(1e-3, U.H, 0.05), mc.component(1e-6, U.F, 0.05)]
+        res = mc.run(components, 10**5, command='lc', spec={'Hz': (None, None)}, seed=3)
+        self.assertEqual(1.0, res.yield_)
+        nominal = res.outputs[0].nominal
+        res = mc.run(components, 10**5, command='lc', spec={'Hz': (nominal, None)}, seed=3)
+        self.assertAlmostEqual(0.5, res.yield_, places=1)
+        self.assertIn('yield', res.summary(histogram=True))
+        self.assertRaises(ValueError, mc.run, components, 10, 'lc', {'V': (0, 1)})
+
+    def test5_temperature(self):
+        components = [mc.component(10, U.V), mc.component(1000, U.R, tempco=1000), mc.component(1000, U.R)]
+        res = mc.run(components, 1000, temperature=125)
+        # R1 is 10% higher at 125 °C
+        self.assertAlmostEqual(10 / 2.1, res.outputs[0].mean)
+        res = mc.run(components, 10**5, temperature=(-75, 125), seed=4)
+        self.assertAlmostEqual(10 / 2.1, res.outputs[0].min, places=3)
+        self.assertAlmostEqual(10 / 1.9, res.outputs[0].max, places=3)
+
+    def test6_chunks(self):
+        components = [mc.component(10, U.V, 0.05), mc.component(1000, U.R, 0.05), mc.component(1000, U.R, 0.05)]
+        a = mc.run(components, 10**5, seed=5, chunk_size=10**5).outputs[0]
+        b = mc.run(components, 10**5, seed=5, chunk_size=7919).outputs[0]
+        self.assertAlmostEqual(a.mean, b.mean, places=2)
+        np.testing.assert_allclose(a.percentile([5, 50, 95]), b.percentile([5, 50, 95]), rtol=1e-3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,10 @@
 import unittest
 import sys
 import os
+import numpy as np
 sys.path.append(os.path.join(os.getcwd(), '..', 'calc'))
 from calc.core import units
+from calc.core.units import AllUnits as U
 from calc import ohm_law
 
 
@@ -22,6 +24,21 @@ class OhmLawTestCase(unittest.TestCase):
         self.assertAlmostEqual(0.005892857142857142, v[0])
         self.assertEqual('A', v[1])
 
+    def test2_broadcasting(self):
+        v = (np.linspace(0.5, 25.0, 50), U.V)
+        r = (np.geomspace(1.0, 1e6, 10000), U.R)
+        i = ohm_law.play(*units.grid(v, r))
+        self.assertEqual(U.A, i[1])
+        self.assertEqual((50, 10000), i[0].shape)
+        for row, col in ((0, 0), (17, 4321), (49, 9999)):
+            expected = ohm_law.play((v[0][row], U.V), (r[0][col], U.R))
+            self.assertEqual(expected[0], i[0][row, col])
+
+        p = ohm_law.calc_power(*units.grid(v, r), i)
+        self.assertEqual(U.W, p[1])
+        self.assertEqual(v[0][3] * i[0][3, 7], p[0][3, 7])
+        self.assertRaises(ValueError, ohm_law.calc_power, v, r)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'calc'))
+from calc.core import rectifier
+
+
+def simulate(kind, amplitude, frequency, load, capacitance, drop, periods=30, steps=4000):
+    """
+    Time steps an ideal diode rectifier; returns the ripple, mean and peak diode current of its last period.
+    """
+    diodes = rectifier.KINDS[kind][0]
+    dt = 1.0 / frequency / steps
+    source = amplitude * np.sin(2 * np.pi * frequency * dt * np.arange(periods * steps))
+    rectified = (np.maximum(source, 0) if kind == rectifier.HALF_WAVE else np.abs(source)) - diodes * drop
+    decay = np.exp(-dt / (load * capacitance))
+    v = 0.0
+    out, current = np.empty(steps), np.empty(steps)
+    for k, r in enumerate(rectified.tolist()):
+        i = 0.0
+        if r >= v * decay:
+            i = capacitance * (r - v) / dt + r / load
+            v = r
+        else:
+            v *= decay
+        if k >= rectified.size - steps:
+            out[k - rectified.size + steps], current[k - rectified.size + steps] = v, i
+    return out.max() - out.min(), out.mean(), current.max()
+
+
+class RectifierTestCase(unittest.TestCase):
+    def test1_no_filter(self):
+        res = rectifier.steady_state(rectifier.HALF_WAVE, 10, 50, 100, 0, 0.7)
+        on = np.arcsin(0.07)
+        self.assertAlmostEqual((20 * np.cos(on) - 0.7 * (np.pi - 2 * on)) / (2 * np.pi), float(res.v_dc))
+        self.assertAlmostEqual(9.3, float(res.ripple))
+        self.assertAlmostEqual(180.0 - 2 * np.degrees(on), float(res.conduction))
+        res = rectifier.steady_state(rectifier.BRIDGE, 10, 50, 100, 0, 0.7)
+        self.assertAlmostEqual(0.086, float(res.peak_current))
+        # Below the diode drops
+        res = rectifier.steady_state(rectifier.BRIDGE, 1, 50, 100, 1e-3, 0.7)
+        self.assertEqual((0.0, 0.0), (float(res.v_dc), float(res.ripple)))
+
+    def test2_time_stepping(self):
+        for kind, c in ((rectifier.HALF_WAVE, 1e-3), (rectifier.HALF_WAVE, 100e-6), (rectifier.BRIDGE, 22e-6)):
+            ripple, mean, peak = simulate(kind, 10, 50, 100, c, 0.7)
+            res = rectifier.steady_state(kind, 10, 50, 100, c, 0.7)
+            self.assertAlmostEqual(1.0, float(res.ripple) / ripple, places=2)
+            self.assertAlmostEqual(1.0, float(res.v_dc) / mean, places=3)
+            self.assertAlmostEqual(1.0, float(res.peak_current) / peak, places=2)
+
+    def test3_grid(self):
+        amplitude, capacitance = np.meshgrid([5.0, 10.0, 20.0], [0.0, 1e-6, 1e-4, 1e-2])
+        res = rectifier.steady_state(rectifier.BRIDGE, amplitude, 50, 100, capacitance, 1.0)
+        self.assertEqual((4, 3), res.ripple.shape)
+        self.assertTrue(np.all(np.diff(res.ripple, axis=0) < 0))
+        # Large C: ripple ~ I / (2 f C)
+        self.assertAlmostEqual(1.0, res.ripple[-1, 1] / (8.0 / 100 / (2 * 50 * 1e-2)), places=1)
+        self.assertRaises(ValueError, rectifier.steady_state, 'center-tap', 10, 50, 100, 1e-3)
+
+    def test4_min_capacitance(self):
+        c = rectifier.min_capacitance(rectifier.HALF_WAVE, np.array([0.1, 1.0]), 10, 50, 100)
+        ripple = rectifier.steady_state(rectifier.HALF_WAVE, 10, 50, 100, c).ripple
+        np.testing.assert_allclose([0.1, 1.0], ripple, rtol=1e-6)
+        self.assertAlmostEqual(0.022, rectifier.min_capacitance(rectifier.HALF_WAVE, 0.1, 10, 50, 100, series='E6'))
+        self.assertEqual(0.0, rectifier.min_capacitance(rectifier.HALF_WAVE, 20, 10, 50, 100))
+        self.assertTrue(np.isnan(rectifier.min_capacitance(rectifier.HALF_WAVE, 0, 10, 50, 100)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import subprocess
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'calc'))
+from calc.core import registry
+from calc.core import units
+from calc.core.units import AllUnits as U
+
+CALC_DIR = os.path.join(os.path.dirname(__file__), '..', 'calc')
+
+
+class RegistryTestCase(unittest.TestCase):
+    def test1_find(self):
+        f = registry.find([U.A, U.R])
+        self.assertEqual('ohm_law', f.command)
+        self.assertEqual((U.V, U.W), f.outputs)
+        self.assertEqual(f, registry.find([U.R, U.A]))
+        self.assertEqual('volt_divider', registry.find([U.R, U.V, U.R]).command)
+        self.assertEqual('lc', registry.find([U.H, U.Hz], 'lc').command)
+        self.assertEqual('l_reactance', registry.find([U.H, U.Hz], 'l_reactance').command)
+
+    def test1_find_errors(self):
+        # lc and l_reactance accept the same units
+        self.assertRaises(ValueError, registry.find, [U.H, U.Hz])
+        self.assertRaises(ValueError, registry.find, [U.V, U.V])
+        self.assertRaises(ValueError, registry.find, [U.V, U.R], 'lc')
+
+    def test2_evaluate(self):
+        res = registry.evaluate([units.parse('4k7R'), units.parse('10mA')])
+        self.assertEqual((47.0, U.V), res[0])
+        self.assertAlmostEqual(0.47, res[1][0])
+        self.assertEqual(U.W, res[1][1])
+        # Non-canonical units are accepted
+        res = registry.evaluate([units.parse('1V'), units.parse('1kOhm')])
+        self.assertAlmostEqual(0.001, res[0][0])
+        self.assertEqual(U.A, res[0][1])
+        res = registry.evaluate([units.parse('1mH'), units.parse('1kHz')], 'l_reactance')
+        self.assertAlmostEqual(6.283185307, res[0][0])
+
+    def test2_evaluate_order(self):
+        # R1 and R2 of the voltage divider keep their order
+        res = registry.evaluate([units.parse('1kR'), units.parse('10V'), units.parse('4kR')])
+        self.assertEqual([(8.0, U.V)], res)
+        res = registry.evaluate([units.parse('4kR'), units.parse('1kR'), units.parse('10V')])
+        self.assertEqual([(2.0, U.V)], res)
+
+    def test3_every_formula_loads(self):
+        for f in registry.FORMULAS:
+            self.assertTrue(callable(registry.load(f)), f)
+
+
+    def test4_cli_errors(self):
+        for args in (['10V', '0R'], ['10mA', 'abc'], ['1V', '1e30R']):
+            proc = subprocess.run([sys.executable, os.path.join(CALC_DIR, 'calc.py')] + args,
+                                  capture_output=True, text=True)
+            self.assertEqual(2, proc.returncode, args)
+            self.assertIn('calc.py: error:', proc.stderr)
+            self.assertNotIn('Traceback', proc.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
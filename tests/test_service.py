@@ -0,0 +1,126 @@
+import unittest
+import sys
+import os
+import asyncio
+import json
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'calc'))
+from calc.core import registry
+from calc.core import service
+from calc.core import units
+from calc.core.units import AllUnits as U
+
+
+async def post(port, path, payload, method='POST'):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    body = json.dumps(payload).encode('utf8')
+    writer.write('{0} {1} HTTP/1.1\r\nContent-Length: {2}\r\nConnection: close\r\n\r\n'.format(
+        method, path, len(body)).encode('latin-1') + body)
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(body.decode('utf8'))
+
+
+class ServiceTestCase(unittest.TestCase):
+    def run_service(self, test, **kwargs):
+        async def run():
+            s = service.Service(**kwargs)
+            server = await s.start('127.0.0.1', 0)
+            try:
+                return await test(s)
+            finally:
+                server.close()
+                await server.wait_closed()
+        return asyncio.run(run())
+
+    def test1_evaluate_calc(self):
+        items = [(0.01, 4700.0), (1.0, 0.0), (2.0, 1e3)]
+        res = service.evaluate_calc(('ohm_law', (U.A, U.R)), items)
+        for item, r in zip(items, res):
+            expected = registry.evaluate([(item[0], U.A), (item[1], U.R)])
+            self.assertEqual([[v, u] for v, u in expected], r['results'])
+        res = service.evaluate_calc(('ohm_law', (U.V, U.R)), [(1.0, 0.0), (1.0, 2.0)])
+        self.assertFalse(res[0]['ok'])
+        self.assertEqual([0.5, U.A], res[1]['results'][0])
+
+    def test1_evaluate_parse_format(self):
+        res = service.evaluate_parse(None, [['1k', 'x'], [], ['2mV']])
+        self.assertEqual({'values': [1000.0, None], 'units': ['', None], 'errors': res[0]['errors']}, res[0])
+        self.assertEqual(1, res[0]['errors'][0][0])
+        self.assertEqual({'values': [], 'units': [], 'errors': []}, res[1])
+        self.assertEqual({'values': [0.002], 'units': [U.V], 'errors': []}, res[2])
+        res = service.evaluate_format('V', [[1e3], [1e40, 0.5]])
+        self.assertEqual(['1.00 kV'], res[0]['strings'])
+        self.assertEqual([None, units.format_simple(0.5, 'V')], res[1]['strings'])
+        self.assertEqual(0, res[1]['errors'][0][0])
+
+    def test2_endpoints(self):
+        async def test(s):
+            return [await post(s.port, '/calc', {'args': ['10mA', '4k7R']}),
+                    await post(s.port, '/calc/lc', {'args': ['1mH', [1e-6, 'F']]}),
+                    await post(s.port, '/calc', {'args': ['1mH', '1kHz']}),
+                    await post(s.port, '/parse', {'values': ['4µA']}),
+                    await post(s.port, '/format', {'values': [4.7e3], 'unit': 'Ω'}),
+                    await post(s.port, '/parse', {'values': [1]}),
+                    await post(s.port, '/nope', {}),
+                    await post(s.port, '/stats', {}, 'GET')]
+        calc, lc, ambiguous, parse, fmt, bad, missing, stats = self.run_service(test)
+        self.assertEqual((200, {'ok': True, 'command': 'ohm_law', 'results': [[47.0, U.V], [0.47000000000000003, U.W]]}),
+                         calc)
+        self.assertAlmostEqual(5032.921210448703, lc[1]['results'][0][0])
+        self.assertFalse(ambiguous[1]['ok'])
+        self.assertEqual([4e-06], parse[1]['values'])
+        self.assertEqual(['4.70 k' + U.R], fmt[1]['strings'])
+        self.assertEqual(400, bad[0])
+        self.assertEqual(404, missing[0])
+        self.assertEqual(200, stats[0])
+        self.assertEqual(2, stats[1]['latency']['parse']['count'])
+        self.assertEqual(3, stats[1]['latency']['calc']['count'])
+
+    def test3_batching(self):
+        async def test(s):
+            responses = await asyncio.gather(*[post(s.port, '/calc', {'args': ['{0}V'.format(i), '1kR']})
+                                               for i in range(1, 21)])
+            return responses, s.stats()
+        responses, stats = self.run_service(test, window=0.2)
+        for i, (status, res) in enumerate(responses, 1):
+            self.assertEqual([i / 1e3, U.A], res['results'][0])
+        self.assertLess(stats['batches'], 20)
+        self.assertEqual(20, stats['batched_requests'])
+
+    def test3_backpressure(self):
+        async def test(s):
+            return await asyncio.gather(*[post(s.port, '/calc', {'args': ['1V', '1kR']}) for _ in range(10)])
+        responses = self.run_service(test, window=0.2, max_pending=4)
+        statuses = [status for status, _ in responses]
+        self.assertEqual(4, statuses.count(200))
+        self.assertEqual(6, statuses.count(503))
+
+    def test4_invalid_numbers(self):
+        async def test(s):
+            res = [await post(s.port, '/calc', {'args': [[10 ** 400, 'V'], '1kR']}),
+                   await post(s.port, '/calc', {'args': [[float('inf'), 'V'], '1kR']}),
+                   await post(s.port, '/calc', {'args': ['1e400V', '1kR']}),
+                   await post(s.port, '/format', {'values': [10 ** 400]}),
+                   await post(s.port, '/format', {'values': [float('inf'), 1.0]}),
+                   await post(s.port, '/parse', {'values': ['1e400', '2k', '-1e400V']})]
+
+            def fail(key, items):
+                raise RuntimeError('evaluation failed')
+            s.batchers['calc'].evaluate = fail
+            return res + [await post(s.port, '/calc', {'args': ['1V', '1kR']})]
+        huge, inf, parsed_inf, huge_format, inf_format, parse_inf, failed = self.run_service(test)
+        for status, res in (huge, inf, parsed_inf, huge_format):
+            self.assertEqual(400, status)
+            self.assertFalse(res['ok'])
+        self.assertEqual([None, '1.00'], inf_format[1]['strings'])
+        self.assertEqual(200, parse_inf[0])
+        self.assertEqual([None, 2000.0, None], parse_inf[1]['values'])
+        self.assertEqual([None, '', None], parse_inf[1]['units'])
+        self.assertEqual([0, 2], [i for i, _ in parse_inf[1]['errors']])
+        self.assertEqual(500, failed[0])
+        self.assertIn('evaluation failed', failed[1]['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
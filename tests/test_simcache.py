@@ -0,0 +1,132 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'calc'))
+from calc.core import simcache
+from PySpice.Probe.WaveForm import TransientAnalysis, WaveForm
+from PySpice.Spice.Netlist import Circuit
+from PySpice.Spice.Simulation import CircuitSimulator
+from PySpice.Unit import u_V, u_A, u_s, u_kOhm, u_uF
+
+
+class FakeSimulator(CircuitSimulator):
+    """
+    Computes the RC charge analytically instead of running ngspice.
+    """
+    SIMULATOR = 'ngspice'
+    runs = 0
+
+    def transient(self, step_time, end_time, **kwargs):
+        self._run('transient', step_time=step_time, end_time=end_time, **kwargs)
+        FakeSimulator.runs += 1
+        t = np.arange(0, end_time, step_time)
+        time_wave = WaveForm.from_unit_values('time', u_s(t))
+        out = WaveForm.from_unit_values('out', u_V(10 * (1 - np.exp(-t / 1e-3))), abscissa=time_wave)
+        current = WaveForm.from_unit_values('vinput', u_A(-10e-3 * np.exp(-t / 1e-3)), abscissa=time_wave)
+        return TransientAnalysis(simulation=self, time=time_wave, nodes=[out], branches=[current],
+                                 internal_parameters=[])
+
+
+class SimulationCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.lib = os.path.join(self.tmp, 'models.lib')
+        with open(self.lib, 'w') as f:
+            f.write('.model D1N4148 D (IS=4.352E-9 N=1.906)\n')
+        self.cache = simcache.SimulationCache(os.path.join(self.tmp, 'cache'))
+        FakeSimulator.runs = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def simulator(self, r=1):
+        circuit = Circuit('rc')
+        circuit.include(self.lib)
+        circuit.V('input', 'inp', circuit.gnd, 10@u_V)
+        circuit.R(1, 'inp', 'out', r@u_kOhm)
+        circuit.C(1, 'out', circuit.gnd, 1@u_uF)
+        return simcache.CachedSimulator(self.cache, FakeSimulator(circuit, temperature=25, nominal_temperature=25))
+
+    def test1_hit(self):
+        a = self.simulator().transient(step_time=1e-4, end_time=1e-2)
+        b = self.simulator().transient(step_time=1e-4, end_time=1e-2)
+        self.assertEqual(1, FakeSimulator.runs)
+        self.assertEqual((1, 1, 0), self.cache.info()[:3])
+        self.assertIsInstance(b, TransientAnalysis)
+        np.testing.assert_array_equal(np.array(a.out), np.array(b.out))
+        np.testing.assert_array_equal(np.array(a.time), np.array(b.time))
+        np.testing.assert_array_equal(np.array(a['vinput']), np.array(b.Vinput))
+        self.assertEqual(a.out.prefixed_unit, b.out.prefixed_unit)
+        self.assertEqual(a.vinput.prefixed_unit, b.vinput.prefixed_unit)
+        self.assertEqual(['out'], list(b.nodes))
+        np.testing.assert_array_equal(np.array(b.time), np.array(b.out.abscissa))
+
+    def test2_key(self):
+        sim = self.simulator()
+        key = self.cache.key(sim.simulator, 'transient', step_time=1e-4, end_time=1e-2)
+        self.assertEqual(key, self.cache.key(self.simulator().simulator, 'transient', step_time=1e-4, end_time=1e-2))
+        self.assertNotEqual(key, self.cache.key(sim.simulator, 'transient', step_time=1e-4, end_time=2e-2))
+        self.assertNotEqual(key, self.cache.key(self.simulator(2).simulator, 'transient', step_time=1e-4,
+                                                end_time=1e-2))
+        sim.simulator.temperature = 100
+        self.assertNotEqual(key, self.cache.key(sim.simulator, 'transient', step_time=1e-4, end_time=1e-2))
+
+    def test2_library_change(self):
+        self.simulator().transient(step_time=1e-4, end_time=1e-2)
+        # mtime resolution of some file systems
+        time.sleep(0.01)
+        with open(self.lib, 'a') as f:
+            f.write('.model D1N4001 D (IS=14.11E-9 N=1.984)\n')
+        self.simulator().transient(step_time=1e-4, end_time=1e-2)
+        self.simulator().transient(step_time=1e-4, end_time=1e-2)
+        self.assertEqual(2, FakeSimulator.runs)
+
+    def test3_same_key(self):
+        sim = self.simulator()
+        analysis = sim.transient(step_time=1e-4, end_time=1e-2)
+        size = self.cache.info().currsize
+        key = self.cache.key(sim.simulator, 'transient', step_time=1e-4, end_time=1e-2)
+        self.cache.put(key, analysis)
+        self.cache.put(key, analysis)
+        self.assertEqual(size, self.cache.info().currsize)
+        self.assertEqual(1, len(os.listdir(self.cache.directory)))
+
+    def test3_corrupt_entry(self):
+        sim = self.simulator()
+        sim.transient(step_time=1e-4, end_time=1e-2)
+        path = self.cache._path(self.cache.key(sim.simulator, 'transient', step_time=1e-4, end_time=1e-2))
+        for size in (100, 0):
+            with open(path, 'r+b') as f:
+                f.truncate(size)
+            self.assertIsInstance(self.simulator().transient(step_time=1e-4, end_time=1e-2), TransientAnalysis)
+        self.assertEqual(3, FakeSimulator.runs)
+        self.assertEqual((0, 3), self.cache.info()[:2])
+
+    def test3_eviction(self):
+        self.simulator().transient(step_time=1e-4, end_time=1e-2)
+        size = self.cache.info().currsize
+        self.cache.max_bytes = int(size * 2.5)
+        self.simulator(2).transient(step_time=1e-4, end_time=1e-2)
+        # Make the first entry the most recently used
+        time.sleep(0.01)
+        self.simulator().transient(step_time=1e-4, end_time=1e-2)
+        self.simulator(3).transient(step_time=1e-4, end_time=1e-2)
+        info = self.cache.info()
+        self.assertEqual(1, info.evictions)
+        self.assertLessEqual(info.currsize, info.maxsize)
+        runs = FakeSimulator.runs
+        self.simulator().transient(step_time=1e-4, end_time=1e-2)
+        self.assertEqual(runs, FakeSimulator.runs)
+        self.simulator(2).transient(step_time=1e-4, end_time=1e-2)
+        self.assertEqual(runs + 1, FakeSimulator.runs)
+        self.cache.clear()
+        self.assertEqual((0, 0, 0), self.cache.info()[:3])
+        self.assertEqual(0, self.cache.info().currsize)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import sys
+import os
+import tempfile
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'calc'))
+from calc.core import spectrum
+
+
+class SpectrumTestCase(unittest.TestCase):
+    def setUp(self):
+        # 50 Hz and 80 Hz on bins, as in playground/fft.py
+        self.dt = 1. / 500
+        t = np.arange(100000) * self.dt
+        self.y = np.sin(2 * np.pi * 50 * t) + .5 * np.sin(2 * np.pi * 80 * t)
+
+    def test1_amplitude(self):
+        f, a = spectrum.amplitude(self.y[:1000], self.dt)
+        self.assertEqual(501, f.size)
+        self.assertAlmostEqual(1.0, a[f == 50][0])
+        self.assertAlmostEqual(0.5, a[f == 80][0])
+        self.assertAlmostEqual(0.0, a[f == 60][0])
+        f, a = spectrum.amplitude(self.y[:1000], self.dt, 'hann')
+        self.assertAlmostEqual(1.0, a[f == 50][0], places=2)
+
+    def test2_frames(self):
+        for chunk_size in (7, 100, 10**6):
+            batches = list(spectrum.frames(np.arange(1000.0), 64, 48, chunk_size))
+            starts = np.concatenate([start + 48 * np.arange(b.shape[0]) for start, b in batches])
+            first = np.concatenate([b[:, 0] for _, b in batches])
+            np.testing.assert_array_equal(np.arange(0, 1000 - 63, 48), starts)
+            np.testing.assert_array_equal(starts, first)
+        self.assertRaises(ValueError, spectrum.welch, self.y, self.dt, 64, 64)
+        self.assertRaises(ValueError, spectrum.welch, self.y[:10], self.dt, 64)
+        self.assertRaises(ValueError, spectrum.welch, self.y, self.dt, 64, window='kaiser')
+
+    def test3_welch(self):
+        s = spectrum.welch(self.y, self.dt, n=1000, window='rectangular')
+        self.assertEqual(199, s.frames)
+        self.assertAlmostEqual(1.0, s.amplitude[s.frequency == 50][0])
+        self.assertAlmostEqual(0.5, s.amplitude[s.frequency == 80][0])
+        # Parseval: the PSD integrates to the mean square
+        self.assertAlmostEqual(np.mean(np.square(self.y)), s.psd.sum() * (s.frequency[1] - s.frequency[0]))
+        # Generators of blocks, of samples and memory-mapped arrays give the same result
+        blocks = (self.y[i:i + 999] for i in range(0, self.y.size, 999))
+        np.testing.assert_allclose(s.power, spectrum.welch(blocks, self.dt, 1000, window='rectangular').power)
+        samples = iter(self.y[:20000].tolist())
+        np.testing.assert_allclose(spectrum.welch(self.y[:20000], self.dt, 1000).power,
+                                   spectrum.welch(samples, self.dt, 1000, chunk_size=3000).power)
+        with tempfile.TemporaryDirectory() as d:
+            np.save(os.path.join(d, 'y.npy'), self.y)
+            y = np.load(os.path.join(d, 'y.npy'), mmap_mode='r')
+            np.testing.assert_allclose(s.power, spectrum.welch(y, self.dt, 1000, window='rectangular',
+                                                               chunk_size=4096).power)
+            del y
+
+    def test4_stft(self):
+        times, f, a = spectrum.spectrogram(self.y[:10000], self.dt, n=500, overlap=250, chunk_size=1234)
+        self.assertEqual((39, 251), a.shape)
+        self.assertEqual(np.float32, a.dtype)
+        np.testing.assert_allclose((250 + 250 * np.arange(39)) * self.dt, times)
+        w = np.hanning(500)
+        frame = self.y[250 * 7:250 * 7 + 500]
+        np.testing.assert_allclose(2 / w.sum() * np.abs(np.fft.rfft(frame * w)), a[7], rtol=1e-5, atol=1e-6)
+
+    def test5_uniform(self):
+        rng = np.random.default_rng(1)
+        t = np.concatenate([[0.0], np.sort(rng.uniform(0, 1, 5000)), [1.0]])
+        y = np.concatenate(list(spectrum.uniform(t, 3 * t + 1, 1e-3, chunk_size=77)))
+        self.assertEqual(1001, y.size)
+        np.testing.assert_allclose(3 * np.arange(1001) * 1e-3 + 1, y)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+import subprocess
+import sys
+import os
+
+CALC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'calc')
+
+
+def loaded_modules(code):
+    """
+    Run code in a fresh interpreter (from the calc directory) and return the names of the modules it loaded.
+    """
+    code = code + '\nimport sys\nprint(" ".join(sys.modules))'
+    out = subprocess.check_output([sys.executable, '-c', code], cwd=CALC, universal_newlines=True)
+    return set(out.split())
+
+
+class StartupTestCase(unittest.TestCase):
+    def test1_scalar_calculators_skip_heavy_imports(self):
+        modules = loaded_modules('import ohm_law, volt_divider\n'
+                                 'from core import units, registry\n'
+                                 'ohm_law.play(units.parse("10mA"), units.parse("4k7R"))\n'
+                                 'registry.evaluate([units.parse("10V"), units.parse("1kR"), units.parse("1kR")])\n'
+                                 'units.format_verbose(1e3, "V")')
+        self.assertNotIn('numpy', modules)
+        self.assertNotIn('PySpice', modules)
+
+    def test2_heavy_imports_on_demand(self):
+        modules = loaded_modules('from core import units\n'
+                                 'units.Parser.instance.normalize_pyspice("1kR")')
+        self.assertIn('PySpice.Unit', modules)
+        modules = loaded_modules('from core import units\n'
+                                 'units.format_array([1.0, 2.0], "V")')
+        self.assertIn('numpy', modules)
+        self.assertNotIn('PySpice', modules)
+
+
+if __name__ == '__main__':
+    unittest.main()
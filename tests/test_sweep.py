@@ -0,0 +1,105 @@
+import unittest
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'calc'))
+from calc.core import sweep
+
+
+def rc_step(point):
+    if point['r'] < 0:
+        raise ValueError('Negative resistance')
+    if point['r'] == 666:
+        # Simulates a crashing ngspice
+        os._exit(1)
+    # Longer transients for larger time constants, like adaptive steps
+    t = np.linspace(0, 1, 10 + int(point['r'] * point['c'] * 10))
+    return {'time': t, 'out': point['v'] * (1 - np.exp(-t / (point['r'] * point['c']))), 'tau': point['r'] * point['c']}
+
+
+class FakeDcAnalysis(object):
+    def __init__(self, temperature):
+        self.nodes = {'out': np.linspace(0, 1, 5) * temperature}
+        self.branches = {'vinput': -np.linspace(0, 1, 5)}
+
+    @property
+    def sweep(self):
+        return np.linspace(0, 1, 5)
+
+    def __getitem__(self, name):
+        return self.nodes.get(name, self.branches.get(name))
+
+
+class FakeSimulator(object):
+    def __init__(self, temperature, nominal_temperature):
+        self.temperature = temperature
+        self.nominal_temperature = nominal_temperature
+
+    def dc(self, **kwargs):
+        return FakeDcAnalysis(self.temperature)
+
+
+class FakeCircuit(object):
+    def __init__(self, r):
+        self.r = r
+
+    def simulator(self, **kwargs):
+        return FakeSimulator(**kwargs)
+
+
+class SweepTestCase(unittest.TestCase):
+    PARAMS = {'v': [1.0, 5.0], 'r': [1.0, 2.0, 4.0], 'c': [0.1, 1.0]}
+
+    def check_rc(self, res):
+        self.assertEqual((2, 3, 2), res.shape)
+        self.assertEqual((2, 3, 2), res['tau'].shape)
+        self.assertEqual((2, 3, 2, 50), res['out'].shape)
+        self.assertTrue(res.ok.all())
+        point = res.point(v=5.0, r=2.0, c=1.0)
+        self.assertEqual(30, len(point['time']))
+        expected = rc_step({'v': 5.0, 'r': 2.0, 'c': 1.0})
+        np.testing.assert_array_equal(expected['out'], point['out'])
+        # Padding of shorter outputs
+        self.assertEqual(12, res.lengths[res.index(v=1.0, r=2.0, c=0.1)])
+        self.assertTrue(np.isnan(res['out'][0, 1, 0, 12:]).all())
+        self.assertEqual(0.4, res['tau'][1, 2, 0])
+
+    def test1_in_process(self):
+        self.check_rc(sweep.run(rc_step, self.PARAMS, processes=0))
+
+    def test2_process_pool(self):
+        res = sweep.run(rc_step, self.PARAMS, processes=2, chunksize=3)
+        self.check_rc(res)
+        self.assertFalse(np.isnan(res.timings).any())
+        self.assertIn('12 points', res.summary())
+
+    def test3_failures(self):
+        res = sweep.run(rc_step, {'v': [1.0], 'r': [-1.0, 1.0, 666, 2.0], 'c': [1.0]}, processes=2, chunksize=2)
+        self.assertEqual([False, True, False, True], res.ok.ravel().tolist())
+        self.assertEqual([(0, 0, 0), (0, 2, 0)], [f.index for f in res.failures])
+        self.assertIn('Negative resistance', res.failures[0].message)
+        self.assertEqual('Worker process died', res.failures[1].message)
+        self.assertTrue(np.isnan(res['tau'][0, 2, 0]))
+
+    def test3_mixed_shapes(self):
+        # A failed fit returns a scalar, the others a (n,) array
+        res = sweep.run(lambda p: {'fit': np.arange(p['n']) if p['n'] else np.nan}, {'n': [3, 0, 2]}, processes=0)
+        self.assertEqual((3, 3), res['fit'].shape)
+        np.testing.assert_array_equal([[0, 1, 2], [np.nan, np.nan, np.nan], [0, 1, np.nan]], res['fit'])
+        self.assertEqual([3, 1, 2], res.lengths.tolist())
+        self.assertRaisesRegex(ValueError, 'Output fit', sweep.run,
+                               lambda p: {'fit': np.ones((p['n'],) * p['n'])}, {'n': [1, 2]}, processes=0)
+
+    def test4_pyspice_simulation(self):
+        simulation = sweep.PySpiceSimulation(FakeCircuit, 'dc', {'Vinput': slice(0, 1, .25)})
+        res = sweep.run(simulation, {'temperature': [0, 25, 100], 'r': [1]}, processes=0)
+        self.assertEqual(['out', 'sweep', 'vinput'], sorted(res.data))
+        self.assertEqual((3, 1, 5), res['out'].shape)
+        self.assertEqual(100.0, res['out'][2, 0, -1])
+        simulation = sweep.PySpiceSimulation(FakeCircuit, 'dc', probes=['out'])
+        res = sweep.run(simulation, {'temperature': [25], 'r': [1]}, processes=0)
+        self.assertEqual(['out', 'sweep'], sorted(res.data))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,7 @@
 import unittest
+import numpy as np
 from calc.core import units
+from calc.core.units import AllUnits as U
 
 
 class UnitsTestCase(unittest.TestCase):
@@ -26,6 +28,13 @@ class UnitsTestCase(unittest.TestCase):
         self.assertEqual('m', suffix)
         self.assertEqual('V', u)
 
+        self.assertEqual(('1.234', 'k', ''), p.split_input("1k234"))
+        self.assertEqual(('1234.56', 'k', 'Ohm'), p.split_input("1,234.56 kOhm"))
+        self.assertEqual(('25', '', 'C'), p.split_input("25°C"))
+        self.assertEqual(('4', 'µ', 'A'), p.split_input("4µA"))
+        for s in ("1.2k3", "k1", "1k2k", "1Δ2", ""):
+            self.assertRaises(ValueError, p.split_input, s)
+
     def test2_parser_normalize(self):
         p = units.Parser.instance
 
@@ -68,6 +77,94 @@ class UnitsTestCase(unittest.TestCase):
         self.assertEqual('V', pyspice_u.unit.unit_suffix)
         self.assertEqual(0.002, pyspice_u.value)
 
+    def test2_parse_spice(self):
+        self.assertEqual((2.191e-8, ''), units.parse_spice('21.910E-9'))
+        self.assertEqual((1e6, ''), units.parse_spice('1MEG'))
+        self.assertEqual((1e-3, ''), units.parse_spice('1M'))
+        self.assertEqual((2.2e3, 'Ω'), units.parse_spice('2.2kOhm'))
+        self.assertEqual((-3.5e-3, 'V'), units.parse_spice('-3.5mV'))
+        self.assertEqual((0.75, ''), units.parse_spice('.75'))
+        self.assertAlmostEqual(25.4e-6, units.parse_spice('1mil')[0])
+        for s in ("", "k1", "1.2.3", "{GAIN/10}"):
+            self.assertRaises(ValueError, units.parse_spice, s)
+
+    def test3_parse_array(self):
+        p = units.Parser.instance
+
+        inputs = ['4k7', '1,234.56k' + U.R, '4µA', '10k', '3.3V', '1R2', '2mV', '4k7']
+        values, codes, errors = p.parse_array(inputs)
+        self.assertEqual([], errors)
+        self.assertEqual(np.float64, values.dtype)
+        self.assertEqual(np.uint8, codes.dtype)
+        for s, n, c in zip(inputs, values, codes):
+            expected = p.normalize(s)
+            self.assertEqual(expected[0], n)
+            self.assertEqual(U.unit_code(expected[1]), c)
+        self.assertEqual(U.R, U.code_unit(codes[5]))
+        self.assertEqual(U.NO_UNIT_CODE, codes[0])
+
+    def test3_parse_array_errors(self):
+        p = units.Parser.instance
+
+        values, codes, errors = p.parse_array(np.array([['1k', 'k1'], ['1.2k3', b'5V'.decode()]]))
+        self.assertEqual((2, 2), values.shape)
+        self.assertEqual([1, 2], [i for i, msg in errors])
+        self.assertTrue(np.isnan(values[0, 1]))
+        self.assertEqual(U.INVALID_CODE, codes[1, 0])
+        self.assertEqual(5.0, values[1, 1])
+        self.assertEqual(U.V, U.code_unit(codes[1, 1]))
+
+    def test4_format(self):
+        p = units.Parser.instance
+
+        self.assertEqual('4.70 kΩ', p.format(4700, U.R))
+        self.assertEqual('1.00 kV', p.format(1000, 'V'))
+        self.assertEqual('1.00 M', p.format(1e6))
+        self.assertEqual('22.0 m', p.format(0.022))
+        self.assertEqual('330 nF', p.format(330e-9, 'F'))
+
+    def test4_format_array(self):
+        p = units.Parser.instance
+
+        values = np.array([4700, 1000, 1e6, 0.022, 330e-9, -47e3, 0.0, 999.9996, 1.005, 2.675])
+        strings, errors = p.format_array(values, 'V')
+        self.assertEqual([], errors)
+        self.assertEqual([p.format(v, 'V') for v in values], list(strings))
+
+        strings, errors = p.format_array([[1.0, 1e30], [np.nan, 2e-3]])
+        self.assertEqual([1, 2], [i for i, msg in errors])
+        self.assertEqual([['1.00', ''], ['', '2.00 m']], strings.tolist())
+
+        strings, errors = p.format_array([1e3, 4.7e3, 22e3, 330e3], U.R, shared_suffix=True)
+        self.assertEqual(['1.00 kΩ', '4.70 kΩ', '22.0 kΩ', '330 kΩ'], list(strings))
+
+        chunks = list(p.iter_format_array(np.arange(1, 6) * 1e3, chunk_size=2))
+        self.assertEqual([0, 2, 4], [offset for offset, _, _ in chunks])
+        self.assertEqual(['5.00 k'], list(chunks[-1][1]))
+
+    def test5_quantities(self):
+        q = units.quantity('4k7Ohm')
+        self.assertEqual((4700.0, U.R), tuple(q))
+        self.assertEqual(U.R, q[1])
+        self.assertEqual(q, (4700.0, 'R'))
+        self.assertEqual('4.70 kΩ', units.format_simple(q))
+        self.assertRaises(ValueError, units.Quantity, 1.0, 'dB')
+
+        quantities, errors = units.parse_quantities(['1k', '22mA', '2.2V', 'k1'], dtype='float32')
+        self.assertEqual([(3, errors[0][1])], errors)
+        self.assertEqual(5 * 4, quantities.nbytes)
+        self.assertEqual(np.float32, quantities.values.dtype)
+        self.assertEqual(units.Quantity(np.float32(0.022), U.A), quantities[1])
+        self.assertEqual(U.V, quantities[2:3].unit)
+        self.assertRaises(ValueError, lambda: quantities.unit)
+        self.assertEqual(9 * 4, quantities.astype('float64').nbytes)
+
+        strings, errors = units.format_array(quantities)
+        self.assertEqual(['1.00 k', '22.0 mA', '2.20 V', ''], list(strings))
+        self.assertEqual([3], [i for i, msg in errors])
+        strings, _ = units.format_array(units.QuantityArray([1e3, 4.7e3], U.R), shared_suffix=True)
+        self.assertEqual(['1.00 kΩ', '4.70 kΩ'], list(strings))
+
     def test99_basic_units(self):
         r = units.parse('1k')
         self.assertEqual(r[0], 1000)
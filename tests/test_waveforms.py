@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'calc'))
+from calc.core import waveforms
+from PySpice.Probe.WaveForm import TransientAnalysis, WaveForm
+from PySpice.Unit import u_V, u_A, u_s
+
+
+def transient(n=1000):
+    t = np.linspace(0, 1e-2, n)
+    time_wave = WaveForm.from_unit_values('time', u_s(t))
+    out = WaveForm.from_unit_values('out', u_V(10 * (1 - np.exp(-t / 1e-3))), abscissa=time_wave)
+    current = WaveForm.from_unit_values('vinput', u_A(-10e-3 * np.exp(-t / 1e-3)), abscissa=time_wave)
+    return TransientAnalysis(simulation=None, time=time_wave, nodes=[out], branches=[current],
+                             internal_parameters=[])
+
+
+class WaveformStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'rc.wf')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test1_round_trip(self):
+        analysis = transient()
+        waveforms.save(self.path, analysis)
+        store = waveforms.WaveformStore(self.path)
+        self.assertEqual('TransientAnalysis', store.analysis)
+        self.assertEqual(['out', 'vinput'], store.names)
+        self.assertIsInstance(store['out'], np.memmap)
+        np.testing.assert_array_equal(np.array(analysis.out), store['out'])
+        np.testing.assert_array_equal(np.array(analysis.time), store.abscissa)
+        res = store.to_analysis()
+        self.assertIsInstance(res, TransientAnalysis)
+        np.testing.assert_array_equal(np.array(analysis.vinput), np.array(res.vinput))
+        self.assertEqual(str(analysis.out.prefixed_unit), str(res.out.prefixed_unit))
+        self.assertEqual(str(analysis.time.prefixed_unit), str(res.time.prefixed_unit))
+
+    def test2_lazy(self):
+        waveforms.save(self.path, transient())
+        store = waveforms.WaveformStore(self.path)
+        analysis = store.to_analysis(['out'])
+        self.assertEqual(['out'], list(analysis.nodes))
+        self.assertEqual([], list(analysis.branches))
+        # Only the requested vector and the abscissa are mapped
+        self.assertEqual({'abscissa', 'nodes_0'}, set(store._maps))
+        self.assertIn('OUT', store)
+        waveform = store.waveform('out')
+        self.assertTrue(np.shares_memory(waveform, store['out']))
+        self.assertEqual('V', str(waveform.prefixed_unit))
+
+    def test3_window(self):
+        waveforms.save(self.path, transient(1001))
+        store = waveforms.WaveformStore(self.path)
+        begin, end = store.window(2e-3, 3e-3)
+        self.assertEqual((200, 300), (begin, end))
+        self.assertEqual((0, 1001), store.window())
+        self.assertTrue(np.all(store.abscissa[begin:end] < 3e-3))
+
+    def test4_chunked_writer(self):
+        n, chunk = 10000, 3000
+        with waveforms.StoreWriter(self.path, 'TransientAnalysis', ('time', ['Second', '']), length=n) as writer:
+            time = writer.column('abscissa')
+            out = writer.add('nodes', 'out', ['Volt', ''], dtype=np.float32)
+            self.assertFalse(os.path.exists(os.path.join(self.path, waveforms.META_FILE)))
+            for begin in range(0, n, chunk):
+                t = np.arange(begin, min(begin + chunk, n)) * 1e-6
+                time[begin:begin + len(t)] = t
+                out[begin:begin + len(t)] = np.sin(t * 1e3)
+        store = waveforms.WaveformStore(self.path)
+        self.assertEqual(np.float32, store['out'].dtype)
+        self.assertEqual((n,), store['out'].shape)
+        self.assertAlmostEqual(np.sin(9999e-3), store['out'][-1], places=6)
+        self.assertEqual('V', str(store.to_analysis().out.prefixed_unit))
+        self.assertRaises(KeyError, store.__getitem__, 'missing')
+
+
+if __name__ == '__main__':
+    unittest.main()